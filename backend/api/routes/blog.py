@@ -0,0 +1,52 @@
+"""
+Blog API routes (server-rendered markdown posts).
+"""
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from fastapi.responses import JSONResponse
+import structlog
+
+from models.schemas import BlogPostResponse, ErrorResponse
+from services.blog_service import blog_service
+from utils.http_cache import etag_matches
+
+logger = structlog.get_logger()
+router = APIRouter()
+
+# Clients may keep the post but must revalidate it (a cheap 304 while unchanged)
+BLOG_CACHE_CONTROL = "public, no-cache"
+
+
+@router.get(
+    "/blog/{slug}",
+    response_model=BlogPostResponse,
+    responses={304: {"description": "Not modified"}, 404: {"model": ErrorResponse}},
+    summary="Get blog post",
+    description="Blog post rendered from markdown, with frontmatter metadata and table of contents.",
+)
+async def get_blog_post(
+    slug: str,
+    request: Request,
+    lang: str = Query("en", pattern="^(en|ar)$", description="Content language"),
+):
+    """
+    Return a rendered blog post.
+    
+    - Renders markdown and builds the TOC on the server
+    - Caches the result until the source file changes
+    - Supports conditional requests (ETag / If-None-Match -> 304)
+    """
+    post = await blog_service.get_post(slug, lang)
+    if post is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "success": False,
+                "message": "Blog post not found.",
+            },
+        )
+    
+    headers = {"ETag": post.etag, "Cache-Control": BLOG_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, post.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return JSONResponse(content=post.data, headers=headers)
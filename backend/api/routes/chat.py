@@ -1,18 +1,44 @@
 """
 Chat API routes for AI conversation.
 """
-from fastapi import APIRouter, HTTPException, status, Request
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, status, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import ValidationError
 from datetime import datetime
+from typing import AsyncIterator, Optional
+import asyncio
+import json
+import math
+import time
 import structlog
 
+from config import settings
+from middleware.rate_limit import get_client_id, get_rate_limit_backend, is_exempt, record_rejection
 from models.schemas import ChatMessageRequest, ChatMessageResponse, ErrorResponse
 from services.ai_service import ai_service
+from services.content_service import SUPPORTED_LANGUAGES
 from services.session_manager import session_manager
+from utils.metrics import chat_websocket_closed_total, chat_websocket_connections
 
 logger = structlog.get_logger()
 router = APIRouter()
 
+# Open chat WebSocket connections in this worker
+_open_sockets = 0
+
+
+async def _resolve_session(request: ChatMessageRequest) -> str:
+    """Return a live session ID for the request, creating one if needed."""
+    if request.session_id and await session_manager.get_session(request.session_id):
+        return request.session_id
+    # No session or session expired, create new one
+    return await session_manager.create_session()
+
+
+def _sse_event(event: str, data: dict) -> str:
+    """Format a single Server-Sent Events frame."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
 
 @router.post(
     "/chat",
@@ -35,42 +61,19 @@ async def send_chat_message(
     """
     try:
         # Get or create session
-        if not request.session_id:
-            session_id = session_manager.create_session()
-        else:
-            session = session_manager.get_session(request.session_id)
-            if not session:
-                # Session expired, create new one
-                session_id = session_manager.create_session()
-            else:
-                session_id = request.session_id
+        session_id = await _resolve_session(request)
         
         # Set language preference
         if request.language:
-            session_manager.set_session_language(session_id, request.language)
-        
-        # Add user message to session
-        session_manager.add_message_to_session(
-            session_id=session_id,
-            role="user",
-            content=request.message,
-        )
+            await session_manager.set_session_language(session_id, request.language)
         
-        # Get conversation history
-        conversation_history = session_manager.get_conversation_history(session_id)
+        await session_manager.update_session_activity(session_id)
         
-        # Get AI response
+        # Get AI response (prior turns come from the session's conversation state)
         ai_response = await ai_service.get_chat_response(
             user_message=request.message,
-            conversation_history=conversation_history,
-            language=request.language or "en",
-        )
-        
-        # Add AI response to session
-        session_manager.add_message_to_session(
             session_id=session_id,
-            role="assistant",
-            content=ai_response,
+            language=request.language or "en",
         )
         
         logger.info(
@@ -114,17 +117,257 @@ async def send_chat_message(
         )
 
 
+@router.post(
+    "/chat/stream",
+    status_code=status.HTTP_200_OK,
+    summary="Stream chat message",
+    description="Send a message to the AI persona and stream the response as Server-Sent Events.",
+)
+async def stream_chat_message(
+    request: ChatMessageRequest,
+    http_request: Request,
+):
+    """
+    Handle chat message and stream the AI response token by token.
+    
+    Emits a `session` event first, then `token` events as the LLM produces
+    output, and a final `done` event. Both sides of the turn are kept in the
+    session's conversation state by the AI service.
+    """
+    session_id = await _resolve_session(request)
+    
+    if request.language:
+        await session_manager.set_session_language(session_id, request.language)
+    
+    await session_manager.update_session_activity(session_id)
+    client_ip = http_request.client.host if http_request.client else None
+    
+    async def event_stream() -> AsyncIterator[str]:
+        parts = []
+        try:
+            yield _sse_event("session", {"session_id": session_id})
+            
+            async for token in ai_service.stream_chat_response(
+                user_message=request.message,
+                session_id=session_id,
+                language=request.language or "en",
+            ):
+                parts.append(token)
+                yield _sse_event("token", {"token": token})
+            
+            yield _sse_event("done", {
+                "session_id": session_id,
+                "timestamp": datetime.now().isoformat(),
+            })
+        finally:
+            ai_response = "".join(parts).strip()
+            logger.info(
+                "chat_stream_processed",
+                session_id=session_id,
+                message_length=len(request.message),
+                response_length=len(ai_response),
+                client_ip=client_ip,
+            )
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # Disable proxy buffering (nginx)
+        },
+    )
+
+
+def _origin_allowed(websocket: WebSocket) -> bool:
+    """WebSocket handshakes are not subject to CORS, so the page origin is checked here."""
+    origin = websocket.headers.get("origin")
+    return settings.debug or not origin or origin in settings.cors_origins_list
+
+
+async def _send_frame(websocket: WebSocket, frame_type: str, **data):
+    """Send one JSON frame of the chat WebSocket protocol."""
+    await websocket.send_text(json.dumps({"type": frame_type, **data}, ensure_ascii=False))
+
+
+async def _bind_session(session_id: Optional[str], language: str) -> str:
+    """Resume a live session or create one, with the connection's language."""
+    if not session_id or not await session_manager.get_session(session_id):
+        session_id = await session_manager.create_session()
+    await session_manager.set_session_language(session_id, language)
+    return session_id
+
+
+@router.websocket("/chat/ws")
+async def chat_websocket(
+    websocket: WebSocket,
+    session_id: Optional[str] = None,
+    language: str = "en",
+):
+    """
+    Chat over one persistent connection per page.
+    
+    The session (query `session_id`, created if missing or expired) is bound
+    once, and announced in a `session` frame. Each turn is then a single
+    `{"type": "message", "message": ..., "language"?: ...}` frame, answered
+    by `token` frames as the LLM produces output and a final `done` frame.
+    Failures are reported as `error` frames and leave the connection open.
+    
+    - Every message is rate limited against the same client budget as HTTP
+    - `ping` frames are sent to silent clients, which answer `pong` (and may
+      send `ping` themselves); two unanswered pings close the connection
+    - Connections without a chat message for chat_ws_idle_timeout_seconds are closed
+    - At most chat_ws_max_connections per worker; extra ones are closed with 1013
+    """
+    global _open_sockets
+    if not _origin_allowed(websocket):
+        logger.warning("chat_ws_origin_rejected", origin=websocket.headers.get("origin"))
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    if _open_sockets >= settings.chat_ws_max_connections:
+        await websocket.accept()
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason="Too many connections")
+        chat_websocket_closed_total.labels("capacity").inc()
+        logger.warning("chat_ws_capacity_reached", max_connections=settings.chat_ws_max_connections)
+        return
+    
+    _open_sockets += 1
+    chat_websocket_connections.set(_open_sockets)
+    reason = "client"
+    try:
+        await websocket.accept()
+        reason = await _serve_chat_socket(
+            websocket,
+            session_id,
+            language if language in SUPPORTED_LANGUAGES else "en",
+        )
+    except WebSocketDisconnect:
+        reason = "client"
+    except Exception as e:
+        reason = "error"
+        logger.error("chat_ws_error", error=str(e), error_type=type(e).__name__, exc_info=True)
+    finally:
+        _open_sockets -= 1
+        chat_websocket_connections.set(_open_sockets)
+        chat_websocket_closed_total.labels(reason).inc()
+
+
+async def _serve_chat_socket(websocket: WebSocket, session_id: Optional[str], language: str) -> str:
+    """Run the connection's receive loop; returns why the server closed it."""
+    client_id = get_client_id(websocket.headers, websocket.scope)
+    rate_limited = not is_exempt(websocket.headers)
+    limiter = get_rate_limit_backend()
+    heartbeat = settings.chat_ws_heartbeat_seconds
+    
+    session_id = await _bind_session(session_id, language)
+    await _send_frame(websocket, "session", session_id=session_id)
+    last_message = last_frame = time.monotonic()
+    
+    while True:
+        idle_left = settings.chat_ws_idle_timeout_seconds - (time.monotonic() - last_message)
+        if idle_left <= 0:
+            await websocket.close(code=status.WS_1000_NORMAL_CLOSURE, reason="Idle timeout")
+            return "idle"
+        try:
+            message = await asyncio.wait_for(websocket.receive(), timeout=min(heartbeat, idle_left))
+        except asyncio.TimeoutError:
+            silent = time.monotonic() - last_frame
+            if silent >= 3 * heartbeat:
+                await websocket.close(code=status.WS_1001_GOING_AWAY, reason="Heartbeat timeout")
+                return "heartbeat"
+            if silent >= heartbeat:
+                await _send_frame(websocket, "ping")
+            continue
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", status.WS_1000_NORMAL_CLOSURE))
+        last_frame = time.monotonic()
+        
+        try:
+            frame = json.loads(message.get("text") or "")
+            frame_type = frame.get("type")
+        except (ValueError, AttributeError):
+            await _send_frame(websocket, "error", message="Frames must be JSON objects.")
+            continue
+        if frame_type == "ping":
+            await _send_frame(websocket, "pong")
+            continue
+        if frame_type == "pong":
+            continue
+        if frame_type != "message":
+            await _send_frame(websocket, "error", message=f"Unknown frame type: {frame_type}")
+            continue
+        
+        try:
+            request = ChatMessageRequest(message=frame.get("message", ""), language=frame.get("language") or language)
+        except ValidationError as e:
+            await _send_frame(
+                websocket, "error",
+                message="Validation error",
+                errors=[error["msg"] for error in e.errors()],
+            )
+            continue
+        
+        if rate_limited:
+            is_limited, limit_message, retry_after = limiter.check(client_id)
+            if is_limited:
+                record_rejection(limit_message, client_id, websocket.url.path)
+                await _send_frame(
+                    websocket, "error",
+                    message=limit_message,
+                    retry_after=max(1, math.ceil(retry_after)),
+                )
+                continue
+        
+        # The session outlives the connection's idle timeout by default; rebind if it expired anyway
+        if not await session_manager.get_session(session_id):
+            session_id = await _bind_session(None, request.language)
+            await _send_frame(websocket, "session", session_id=session_id)
+        elif request.language != language:
+            await session_manager.set_session_language(session_id, request.language)
+        language = request.language
+        
+        await _chat_turn(websocket, session_id, request.message, language, client_id)
+        # Time spent answering does not count as client silence
+        last_message = last_frame = time.monotonic()
+
+
+async def _chat_turn(websocket: WebSocket, session_id: str, user_message: str, language: str, client_id: str):
+    """Answer one message with token frames and a done frame."""
+    await session_manager.update_session_activity(session_id)
+    parts = []
+    try:
+        async for token in ai_service.stream_chat_response(
+            user_message=user_message,
+            session_id=session_id,
+            language=language,
+        ):
+            parts.append(token)
+            await _send_frame(websocket, "token", token=token)
+        await _send_frame(websocket, "done", session_id=session_id, timestamp=datetime.now().isoformat())
+    finally:
+        ai_response = "".join(parts).strip()
+        logger.info(
+            "chat_ws_turn_processed",
+            session_id=session_id,
+            message_length=len(user_message),
+            response_length=len(ai_response),
+            client_ip=client_id,
+        )
+
+
 @router.get(
     "/chat/history/{session_id}",
     summary="Get chat history",
-    description="Retrieve conversation history for a session (optional, for future use).",
+    description="Retrieve the conversation of a session, as the AI continues it.",
 )
 async def get_chat_history(session_id: str):
     """
     Get chat history for a session.
-    Currently returns basic info. Can be extended to return full history.
+    Messages come from the session's conversation state, so turns already
+    folded into the rolling summary are not listed.
     """
-    session = session_manager.get_session(session_id)
+    session = await session_manager.get_session(session_id)
     
     if not session:
         raise HTTPException(
@@ -135,10 +378,12 @@ async def get_chat_history(session_id: str):
             },
         )
     
+    messages = await ai_service.get_conversation(session_id)
     return {
         "success": True,
         "session_id": session_id,
-        "message_count": len(session["messages"]),
+        "message_count": len(messages),
+        "messages": messages,
         "created_at": session["created_at"].isoformat(),
         "last_activity": session["last_activity"].isoformat(),
     }
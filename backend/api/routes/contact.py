@@ -6,6 +6,7 @@ from fastapi.responses import JSONResponse
 import structlog
 
 from models.schemas import ContactFormRequest, ContactFormResponse, ErrorResponse
+from services.contact_service import build_submission, contact_pipeline
 from config import settings
 
 logger = structlog.get_logger()
@@ -17,7 +18,7 @@ router = APIRouter()
     response_model=ContactFormResponse,
     status_code=status.HTTP_200_OK,
     summary="Submit contact form",
-    description="Submit a contact form message. Logs the submission.",
+    description="Submit a contact form message. The submission is queued for storage and webhook delivery.",
 )
 async def submit_contact_form(
     request: ContactFormRequest,
@@ -28,10 +29,13 @@ async def submit_contact_form(
     
     - Validates input data
     - Logs the submission
-    - Returns success/error response
+    - Queues it for background storage and webhook delivery
+    - Returns success/error response (503 when the queue is full)
     
-    Note: Email notifications are disabled. Contact form submissions are only logged.
+    Note: Email notifications are disabled.
     """
+    client_ip = http_request.client.host if http_request.client else None
+    
     try:
         # Log submission
         logger.info(
@@ -40,20 +44,36 @@ async def submit_contact_form(
             email=request.email,
             subject=request.subject,
             message_preview=request.message[:100] if len(request.message) > 100 else request.message,
-            client_ip=http_request.client.host if http_request.client else None,
+            client_ip=client_ip,
         )
         
-        # In a production environment, you might want to:
-        # - Store submissions in a database
-        # - Send to a webhook
-        # - Queue for processing
-        # For now, we just log the submission
+        # Hand off to background workers; never wait on storage or webhook I/O here
+        queued = contact_pipeline.enqueue(build_submission(
+            name=request.name,
+            email=request.email,
+            subject=request.subject,
+            message=request.message,
+            client_ip=client_ip,
+        ))
+        if not queued:
+            logger.warning("contact_queue_full", client_ip=client_ip)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail={
+                    "success": False,
+                    "message": "We're receiving a lot of messages right now. Please try again in a minute.",
+                },
+                headers={"Retry-After": "60"},
+            )
         
         return ContactFormResponse(
             success=True,
             message="Thank you for your message! I'll get back to you as soon as possible.",
         )
         
+    except HTTPException:
+        raise
+    
     except ValueError as e:
         # Validation errors
         logger.warning("contact_form_validation_error", error=str(e))
@@ -0,0 +1,74 @@
+"""
+Site content API routes (content.{lang}.json).
+"""
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Path, Query, Request, Response, status
+import structlog
+
+from models.schemas import ErrorResponse
+from services.content_service import UnknownSection, content_service
+from utils.compression import choose_encoding
+from utils.http_cache import etag_matches
+
+logger = structlog.get_logger()
+router = APIRouter()
+
+# Clients may keep the content but must revalidate it (a cheap 304 while unchanged)
+CONTENT_CACHE_CONTROL = "public, no-cache"
+
+
+@router.get(
+    "/content/{lang}",
+    responses={
+        200: {"content": {"application/json": {}}, "description": "Site content"},
+        304: {"description": "Not modified"},
+        404: {"model": ErrorResponse},
+    },
+    summary="Get site content",
+    description="Translated site content; use ?section=hero,about to fetch only some top-level sections.",
+)
+async def get_content(
+    request: Request,
+    lang: str = Path(..., pattern="^(en|ar)$", description="Content language"),
+    section: Optional[str] = Query(None, description="Comma-separated top-level sections"),
+):
+    """
+    Return the content document for a language.
+    
+    - Served from memory; reloaded when the file changes
+    - Strong ETag per representation; If-None-Match -> 304
+    - Precompressed gzip/brotli bodies chosen from Accept-Encoding
+    """
+    sections = tuple(name.strip() for name in section.split(",") if name.strip()) if section else ()
+    try:
+        content = await content_service.get_body(lang, sections)
+    except UnknownSection as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "success": False,
+                "message": f"Unknown content section: {e.args[0]}",
+            },
+        )
+    if content is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "success": False,
+                "message": "Content not found.",
+            },
+        )
+    
+    encoding = choose_encoding(request.headers.get("accept-encoding", ""))
+    # Compressed bytes differ from the identity body, so each encoding has its own strong ETag
+    etag = f'{content.etag[:-1]}-{encoding}"' if encoding else content.etag
+    headers = {"ETag": etag, "Cache-Control": CONTENT_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (etag_matches(if_none_match, etag) or etag_matches(if_none_match, content.etag)):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    if encoding:
+        headers["Content-Encoding"] = encoding
+        return Response(content=content.encode(encoding), media_type="application/json", headers=headers)
+    return Response(content=content.body, media_type="application/json", headers=headers)
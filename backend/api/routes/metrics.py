@@ -0,0 +1,50 @@
+"""
+Metrics API route (Prometheus text exposition format).
+"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from services.ai_service import ai_service
+from services.contact_service import contact_pipeline
+from services.llm_pool import CircuitBreaker, LLMPool
+from services.response_cache import response_cache
+from services.session_manager import session_manager
+from utils import metrics
+from utils.logging_config import get_log_stats
+
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _collect_service_stats():
+    """Copy service-owned counters into gauges at scrape time."""
+    concurrency = ai_service.get_concurrency_stats()
+    metrics.llm_in_flight.set(concurrency["in_flight"])
+    metrics.llm_waiting.set(concurrency["waiting"])
+    if isinstance(ai_service.llm, LLMPool):
+        for backend in ai_service.llm.get_stats():
+            state = CircuitBreaker.STATE_CODES[backend["circuit"]]
+            metrics.llm_backend_circuit_state.labels(backend["backend"]).set(state)
+
+    metrics.ai_cache_hits_total.labels().set(response_cache.hits)
+    metrics.ai_cache_misses_total.labels().set(response_cache.misses)
+    metrics.ai_cache_hit_ratio.set(response_cache.hit_ratio)
+
+    metrics.contact_queue_depth.set(contact_pipeline.get_queue_depth())
+    metrics.log_events_dropped_total.labels().set(get_log_stats()["dropped"])
+
+
+metrics.registry.add_collector(_collect_service_stats)
+
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    summary="Prometheus metrics",
+    description="Request, LLM, session, rate-limit and cache metrics in Prometheus text format.",
+)
+async def get_metrics():
+    """Render all registered metrics."""
+    metrics.chat_active_sessions.set(await session_manager.get_session_count())
+    return PlainTextResponse(metrics.registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,79 @@
+"""
+Site search API routes.
+"""
+import hashlib
+import time
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from fastapi.responses import JSONResponse
+import structlog
+
+from models.schemas import ErrorResponse, SearchResponse
+from services.search_service import search_service
+from utils.http_cache import etag_matches
+
+logger = structlog.get_logger()
+router = APIRouter()
+
+# Results only change with the index, which the ETag tracks
+SEARCH_CACHE_CONTROL = "public, no-cache"
+
+
+@router.get(
+    "/search",
+    response_model=SearchResponse,
+    responses={304: {"description": "Not modified"}, 503: {"model": ErrorResponse}},
+    summary="Search the site",
+    description="Full-text search over blog posts and projects, ranked with BM25.",
+)
+async def search(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200, description="Search query"),
+    lang: str = Query("en", pattern="^(en|ar)$", description="Content language"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of results"),
+):
+    """
+    Search blog posts and projects.
+
+    - Served from a precomputed, memory-mapped BM25 index (no file scans per query)
+    - Arabic-aware tokenization (normalization and light stemming)
+    - Snippets with matches highlighted in <mark>
+    - ETag per index version and query; If-None-Match -> 304
+    """
+    started = time.perf_counter()
+    index = await search_service.get_index(lang)
+    if index is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                "success": False,
+                "message": "Search is temporarily unavailable.",
+            },
+        )
+
+    query = " ".join(q.split())
+    key = hashlib.sha256(f"{lang}\0{limit}\0{query}".encode("utf-8")).hexdigest()[:16]
+    etag = f'"{index.digest}-{key}"'
+    headers = {"ETag": etag, "Cache-Control": SEARCH_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    total, hits = index.search(query, limit)
+    results = [
+        {
+            "id": hit.document["id"],
+            "type": hit.document["type"],
+            "title": hit.document["title"],
+            "url": hit.document["url"],
+            "date": hit.document["date"],
+            "score": round(hit.score, 4),
+            "snippet": index.snippet(hit),
+        }
+        for hit in hits
+    ]
+    took_ms = round((time.perf_counter() - started) * 1000, 3)
+    logger.info("search_completed", lang=lang, terms=len(query.split()), total=total, took_ms=took_ms)
+    return JSONResponse(
+        content={"query": query, "lang": lang, "total": total, "took_ms": took_ms, "results": results},
+        headers=headers,
+    )
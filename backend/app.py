@@ -6,13 +6,20 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 import structlog
-import time
 
 from config import settings
-from api.routes import contact, chat
+from api.routes import blog, contact, content, chat, metrics, search
+from middleware.access_log import AccessLogMiddleware
+from middleware.compression import CompressionMiddleware
 from middleware.rate_limit import RateLimitMiddleware
 from middleware.security import SecurityMiddleware
-from utils.logging_config import setup_logging
+from services.ai_service import ai_service
+from services.session_manager import session_manager
+from services.contact_service import contact_pipeline
+from services.database import dispose_engines
+from services.knowledge_service import knowledge_service
+from services.search_service import search_service
+from utils.logging_config import setup_logging, shutdown_logging
 
 # Setup structured logging
 setup_logging()
@@ -24,9 +31,22 @@ async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown events."""
     # Startup
     logger.info("application_starting", environment=settings.environment)
+    await ai_service.start()
+    await session_manager.start()
+    await contact_pipeline.start()
+    await search_service.start()
+    if settings.ai_retrieval_enabled:
+        await knowledge_service.start()
     yield
     # Shutdown
     logger.info("application_shutting_down")
+    await knowledge_service.close()
+    await search_service.close()
+    await contact_pipeline.close()
+    await session_manager.close()
+    await ai_service.close()
+    await dispose_engines()
+    shutdown_logging()
 
 
 # Create FastAPI app
@@ -67,40 +87,26 @@ app.add_middleware(SecurityMiddleware)
 if settings.rate_limit_enabled:
     app.add_middleware(RateLimitMiddleware)
 
+# Compression Middleware (wraps every response, including rate-limit and error responses)
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        level=settings.compression_level,
+        min_size=settings.compression_min_size,
+        skip_types=settings.compression_skip_types_list,
+    )
+
+# Access Logging Middleware (outermost, so it times the whole stack)
+app.add_middleware(AccessLogMiddleware)
+
 # Include routers
 app.include_router(contact.router, prefix="/api", tags=["contact"])
 app.include_router(chat.router, prefix="/api", tags=["chat"])
-
-
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log all HTTP requests with timing information."""
-    start_time = time.time()
-    
-    # Log request
-    logger.info(
-        "request_received",
-        method=request.method,
-        path=request.url.path,
-        client_ip=request.client.host if request.client else None,
-    )
-    
-    # Process request
-    response = await call_next(request)
-    
-    # Calculate duration
-    duration = time.time() - start_time
-    
-    # Log response
-    logger.info(
-        "request_completed",
-        method=request.method,
-        path=request.url.path,
-        status_code=response.status_code,
-        duration_ms=round(duration * 1000, 2),
-    )
-    
-    return response
+app.include_router(blog.router, prefix="/api", tags=["blog"])
+app.include_router(content.router, prefix="/api", tags=["content"])
+app.include_router(search.router, prefix="/api", tags=["search"])
+if settings.metrics_enabled:
+    app.include_router(metrics.router, prefix="/api", tags=["metrics"])
 
 
 @app.get("/")
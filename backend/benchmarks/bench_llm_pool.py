@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+"""
+Offline latency benchmark for the LLM backend pool.
+Runs the pool against fake backends with a slow tail and a failing
+backend, with and without hedging, so routing, failover and hedging can be
+compared without network calls or API keys.
+
+Usage (from backend/):
+    python benchmarks/bench_llm_pool.py [--calls 500] [--concurrency 10] [--tail 0.02]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep log output from dominating the measurement
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+from langchain_core.messages import HumanMessage  # noqa: E402
+
+from services.fake_llm import FakeChatModel  # noqa: E402
+from services.llm_pool import LLMBackend, LLMPool  # noqa: E402
+
+
+def build_pool(args, hedge: bool) -> LLMPool:
+    """Two healthy backends with a slow tail plus one that always fails."""
+    backends = [
+        LLMBackend(
+            f"fake-{index}",
+            FakeChatModel(
+                latency_seconds=args.latency_ms / 1000,
+                tail_probability=args.tail,
+                tail_latency_seconds=args.tail_latency_ms / 1000,
+                seed=index,
+            ),
+        )
+        for index in range(2)
+    ]
+    backends.append(LLMBackend("failing", FakeChatModel(latency_seconds=0.01, error_rate=1.0)))
+    return LLMPool(backends=backends, hedge_enabled=hedge, hedge_min_delay=args.latency_ms / 1000)
+
+
+async def run(pool: LLMPool, calls: int, concurrency: int, stream: bool):
+    """Make `calls` LLM calls with bounded concurrency; return sorted latencies (to first token when streaming)."""
+    latencies = []
+    counter = iter(range(calls))
+    messages = [HumanMessage(content="What services do you offer?")]
+
+    async def worker():
+        for _ in counter:
+            start = time.perf_counter()
+            if stream:
+                async for _ in pool.astream(messages):
+                    break
+            else:
+                await pool.ainvoke(messages)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return sorted(latencies)
+
+
+def percentile(latencies, q: float) -> float:
+    return latencies[min(len(latencies) - 1, int(len(latencies) * q / 100))] * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--tail", type=float, default=0.02, help="Probability of a slow call")
+    parser.add_argument("--tail-latency-ms", type=float, default=500)
+    args = parser.parse_args()
+
+    for stream in (False, True):
+        for hedge in (False, True):
+            pool = build_pool(args, hedge)
+            latencies = await run(pool, args.calls, args.concurrency, stream)
+            label = f"{'stream (first token)' if stream else 'invoke':<21} hedging {'on ' if hedge else 'off'}"
+            print(
+                f"{label}: p50 {percentile(latencies, 50):7.1f} ms  "
+                f"p95 {percentile(latencies, 95):7.1f} ms  p99 {percentile(latencies, 99):7.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
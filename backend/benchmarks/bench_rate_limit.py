@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+"""
+Microbenchmark for the GCRA rate limiter backends.
+Reports per-check cost and retained memory for many distinct clients.
+
+Usage (from backend/):
+    python benchmarks/bench_rate_limit.py [--clients 100000] [--rounds 3] [--backend memory|sqlite]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from middleware.rate_limit import GCRARateLimiter, SQLiteRateLimitBackend  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--per-minute", type=int, default=10)
+    parser.add_argument("--per-hour", type=int, default=60)
+    parser.add_argument("--backend", choices=["memory", "sqlite"], default="memory")
+    args = parser.parse_args()
+
+    client_ids = [f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(args.clients)]
+    if args.backend == "sqlite":
+        tmpdir = tempfile.mkdtemp()
+        limiter = SQLiteRateLimitBackend(
+            per_minute=args.per_minute,
+            per_hour=args.per_hour,
+            path=os.path.join(tmpdir, "bench_rate_limit.sqlite3"),
+        )
+    else:
+        limiter = GCRARateLimiter(per_minute=args.per_minute, per_hour=args.per_hour)
+
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        for client_id in client_ids:
+            limiter.check(client_id)
+    elapsed = time.perf_counter() - start
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    checks = args.clients * args.rounds
+    retained -= baseline
+    limiter.close()
+
+    print(f"backend:          {args.backend}")
+    print(f"clients:          {args.clients}")
+    print(f"checks:           {checks}")
+    print(f"per check:        {elapsed / checks * 1e6:.2f} us")
+    print(f"retained memory:  {retained / 1e6:.1f} MB ({retained / args.clients:.0f} B/client)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+"""
+Latency benchmark for the site search index.
+Builds the BM25 index from data/ (optionally replicated to simulate a larger
+site) and times index builds and queries, including snippet generation.
+
+Usage (from backend/):
+    python benchmarks/bench_search.py [--scale 50] [--queries 2000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep log output from dominating the measurement
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+from services.search_index import IndexBuilder, SearchDocument, SearchIndex, document_terms  # noqa: E402
+from services.search_service import SearchService  # noqa: E402
+
+QUERIES = {
+    "en": ["rag systems", "vector database", "llm infrastructure gpu", "test automation career", "neo4j"],
+    "ar": ["أنظمة RAG", "الذكاء الاصطناعي", "بنية LLM", "الأتمتة", "قواعد البيانات"],
+}
+
+
+def percentile(latencies, q: float) -> float:
+    return latencies[min(len(latencies) - 1, int(len(latencies) * q / 100))] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=int, default=50, help="Copies of each document")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    service = SearchService()
+    with tempfile.TemporaryDirectory() as index_dir:
+        for lang, queries in QUERIES.items():
+            documents = [
+                SearchDocument(
+                    id=f"{d.id}#{copy}", type=d.type, title=d.title, url=d.url, date=d.date,
+                    text=f"{d.text} copy{copy}",
+                )
+                for copy in range(args.scale)
+                for d in service._documents(lang)
+            ]
+            path = os.path.join(index_dir, f"search-{lang}.idx")
+
+            start = time.perf_counter()
+            builder = IndexBuilder()
+            for document in documents:
+                builder.add(document)
+            builder.write(path, {})
+            full_ms = (time.perf_counter() - start) * 1000
+
+            # Incremental: one changed document, the rest reuse their term frequencies
+            index = SearchIndex(path)
+            start = time.perf_counter()
+            frequencies = index.term_frequencies()
+            builder = IndexBuilder()
+            for doc, document in enumerate(documents):
+                builder.add(document, frequencies[doc] if doc else document_terms(document))
+            builder.write(path, {})
+            incremental_ms = (time.perf_counter() - start) * 1000
+            index.close()
+
+            index = SearchIndex(path)
+            latencies = []
+            for i in range(args.queries):
+                start = time.perf_counter()
+                _, hits = index.search(queries[i % len(queries)], args.limit)
+                for hit in hits:
+                    index.snippet(hit)
+                latencies.append(time.perf_counter() - start)
+            latencies.sort()
+            print(
+                f"{lang}: {index.n_docs} docs, {index.n_terms} terms, {os.path.getsize(path) // 1024} KB  "
+                f"build {full_ms:6.0f} ms (incremental {incremental_ms:6.0f} ms)  "
+                f"query p50 {percentile(latencies, 50):5.2f} ms  p95 {percentile(latencies, 95):5.2f} ms  "
+                f"p99 {percentile(latencies, 99):5.2f} ms"
+            )
+            index.close()
+
+
+if __name__ == "__main__":
+    main()
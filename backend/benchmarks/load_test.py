@@ -0,0 +1,361 @@
+#!/usr/bin/env python
+"""
+Open-loop load test for the chat, contact and health endpoints.
+Requests arrive at a fixed target rate regardless of how fast the server
+answers, so queueing shows up in the latency percentiles. Chat traffic is
+multi-turn: each virtual user continues its session for several turns.
+Results (throughput, p50/p95/p99 latency per endpoint) are printed as JSON.
+
+Runs fully offline: the app uses the fake LLM provider (AI_PROVIDER=fake,
+tuned with the FAKE_LLM_* settings) unless the environment says otherwise.
+Time to first token for chat_stream is only reported over real HTTP
+(--target uvicorn or --url).
+
+Usage (from backend/):
+    python benchmarks/load_test.py [--rate 50] [--duration 30] [--mix chat=0.5,contact=0.2,health=0.3]
+    python benchmarks/load_test.py --target uvicorn [--workers 2]
+    python benchmarks/load_test.py --url http://127.0.0.1:8000   # already running, started with AI_PROVIDER=fake
+"""
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict, deque
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import httpx  # noqa: E402
+
+OPENING_QUESTIONS = [
+    "What services do you offer?",
+    "Can you tell me about your experience?",
+    "What technologies do you work with?",
+    "How can I contact you for a project?",
+    "What kind of projects have you built?",
+]
+
+CONTACT_PAYLOAD = {
+    "name": "Load Test",
+    "email": "load@example.com",
+    "subject": "Load test",
+    "message": "This is a load test message with enough characters.",
+}
+
+
+class Recorder:
+    """Collects per-request outcomes and latencies by endpoint."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.first_token = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.started = time.perf_counter()
+        self.finished = self.started
+
+    def record(self, endpoint: str, status, latency: float, first_token: float = None):
+        self.statuses[endpoint][str(status)] += 1
+        if status == 200:
+            self.latencies[endpoint].append(latency)
+            if first_token is not None:
+                self.first_token[endpoint].append(first_token)
+        self.finished = time.perf_counter()
+
+    def report(self) -> dict:
+        elapsed = max(self.finished - self.started, 1e-9)
+        endpoints = {}
+        for endpoint, statuses in sorted(self.statuses.items()):
+            requests = sum(statuses.values())
+            succeeded = len(self.latencies[endpoint])
+            endpoints[endpoint] = {
+                "requests": requests,
+                "errors": requests - succeeded,
+                "status_codes": dict(statuses),
+                "throughput_rps": round(succeeded / elapsed, 2),
+                "latency_ms": summarize(self.latencies[endpoint]),
+            }
+            if self.first_token[endpoint]:
+                endpoints[endpoint]["first_token_ms"] = summarize(self.first_token[endpoint])
+        every = [latency for latencies in self.latencies.values() for latency in latencies]
+        requests = sum(sum(statuses.values()) for statuses in self.statuses.values())
+        return {
+            "elapsed_seconds": round(elapsed, 2),
+            "total": {
+                "requests": requests,
+                "errors": requests - len(every),
+                "throughput_rps": round(len(every) / elapsed, 2),
+                "latency_ms": summarize(every),
+            },
+            "endpoints": endpoints,
+        }
+
+
+def summarize(latencies) -> dict:
+    """Latency percentiles in milliseconds (nearest rank)."""
+    if not latencies:
+        return {}
+    ordered = sorted(latencies)
+
+    def percentile(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))] * 1000, 1)
+
+    return {
+        "p50": percentile(50),
+        "p95": percentile(95),
+        "p99": percentile(99),
+        "mean": round(sum(ordered) / len(ordered) * 1000, 1),
+        "max": round(ordered[-1] * 1000, 1),
+    }
+
+
+class LoadGenerator:
+    """Issues requests at the target rate and tracks virtual chat users."""
+
+    def __init__(self, client: httpx.AsyncClient, args, measure_first_token: bool = True):
+        self.client = client
+        self.args = args
+        self.measure_first_token = measure_first_token
+        self.recorder = Recorder()
+        self.random = random.Random(args.seed)
+        self.mix = parse_mix(args.mix)
+        # Chat users waiting for their next turn: (session_id, turns_done, client_ip)
+        self.idle_users = deque()
+        self.addresses = itertools.count(1)
+        self.skipped = 0
+
+    def _new_ip(self) -> str:
+        # One address per virtual user, so the per-IP rate limiter sees realistic clients
+        n = next(self.addresses)
+        return f"10.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}"
+
+    async def _timed(self, endpoint: str, method: str, path: str, ip: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, headers={"X-Forwarded-For": ip}, **kwargs)
+        except httpx.HTTPError as e:
+            self.recorder.record(endpoint, type(e).__name__, time.perf_counter() - start)
+            return None
+        self.recorder.record(endpoint, response.status_code, time.perf_counter() - start)
+        return response
+
+    async def health(self):
+        await self._timed("health", "GET", "/api/health", self._new_ip())
+
+    async def contact(self):
+        await self._timed("contact", "POST", "/api/contact", self._new_ip(), json=CONTACT_PAYLOAD)
+
+    def _next_turn(self):
+        """Continue an idle user's session, or start a new user."""
+        if self.idle_users:
+            session_id, turns, ip = self.idle_users.popleft()
+            return session_id, turns, ip, f"Thanks. Follow-up question {turns}: can you tell me more?"
+        return None, 0, self._new_ip(), self.random.choice(OPENING_QUESTIONS)
+
+    def _finish_turn(self, session_id, turns: int, ip: str):
+        if session_id and turns + 1 < self.args.chat_turns:
+            self.idle_users.append((session_id, turns + 1, ip))
+
+    async def chat(self):
+        session_id, turns, ip, message = self._next_turn()
+        payload = {"message": message, "session_id": session_id, "language": "en"}
+        response = await self._timed("chat", "POST", "/api/chat", ip, json=payload)
+        if response is not None and response.status_code == 200:
+            self._finish_turn(response.json()["session_id"], turns, ip)
+
+    async def chat_stream(self):
+        session_id, turns, ip, message = self._next_turn()
+        payload = {"message": message, "session_id": session_id, "language": "en"}
+        start = time.perf_counter()
+        first_token = None
+        status = None
+        try:
+            async with self.client.stream(
+                "POST", "/api/chat/stream", json=payload, headers={"X-Forwarded-For": ip}
+            ) as response:
+                status = response.status_code
+                async for line in response.aiter_lines():
+                    if line.startswith("data:") and session_id is None:
+                        session_id = json.loads(line[5:]).get("session_id")
+                    if line == "event: token" and first_token is None and self.measure_first_token:
+                        first_token = time.perf_counter() - start
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        self.recorder.record("chat_stream", status, time.perf_counter() - start, first_token)
+        if status == 200:
+            self._finish_turn(session_id, turns, ip)
+
+    async def run(self, duration: float) -> dict:
+        scenarios = {name: getattr(self, name) for name in self.mix}
+        names, weights = list(self.mix), list(self.mix.values())
+        interval = 1 / self.args.rate
+        tasks = set()
+        self.recorder = Recorder()
+        start = time.perf_counter()
+        sent = 0
+        for i in itertools.count():
+            due = start + i * interval
+            if due - start >= duration:
+                break
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if len(tasks) >= self.args.max_in_flight:
+                # Client-side cap so a stalled server cannot exhaust the load generator
+                self.skipped += 1
+                continue
+            task = asyncio.create_task(scenarios[self.random.choices(names, weights)[0]]())
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            sent += 1
+        send_window = time.perf_counter() - start
+        if tasks:
+            await asyncio.gather(*tasks)
+
+        report = self.recorder.report()
+        report.update(
+            target_rate_rps=self.args.rate,
+            achieved_rate_rps=round(sent / send_window, 2),
+            skipped=self.skipped,
+        )
+        return report
+
+
+def parse_mix(value: str) -> dict:
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in ("chat", "chat_stream", "contact", "health"):
+            raise SystemExit(f"Unknown endpoint in --mix: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.asynccontextmanager
+async def in_process_client(args):
+    """Client wired straight to the ASGI app, with its startup and shutdown run."""
+    from app import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=args.timeout) as client:
+            yield client
+
+
+@contextlib.asynccontextmanager
+async def uvicorn_client(args):
+    """Start the app under uvicorn in a subprocess and connect over HTTP."""
+    port = _free_port()
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(args.workers), "--log-level", "warning",
+        ],
+        cwd=BACKEND_DIR,
+        env=os.environ.copy(),
+    )
+    try:
+        async with remote_client(args, f"http://127.0.0.1:{port}") as client:
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    if (await client.get("/api/health")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if server.poll() is not None or time.monotonic() > deadline:
+                    raise SystemExit("uvicorn did not start")
+                await asyncio.sleep(0.2)
+            yield client
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+@contextlib.asynccontextmanager
+async def remote_client(args, base_url: str):
+    limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        yield client
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--target", choices=("inprocess", "uvicorn"), default="inprocess")
+    parser.add_argument("--url", help="Load an already running server instead of starting one")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers (--target uvicorn)")
+    parser.add_argument("--rate", type=float, default=50, help="Target requests per second")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of load")
+    parser.add_argument("--warmup", type=float, default=2, help="Seconds of load before measuring")
+    parser.add_argument(
+        "--mix",
+        default="chat=0.5,contact=0.2,health=0.3",
+        help="Endpoint weights: chat, chat_stream, contact, health",
+    )
+    parser.add_argument("--chat-turns", type=int, default=3, help="Turns per chat session")
+    parser.add_argument("--max-in-flight", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    # Offline by default; explicit environment settings win
+    os.environ.setdefault("AI_PROVIDER", "fake")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    if args.url:
+        client_context = remote_client(args, args.url.rstrip("/"))
+    elif args.target == "uvicorn":
+        client_context = uvicorn_client(args)
+    else:
+        client_context = in_process_client(args)
+
+    async with client_context as client:
+        # httpx's ASGI transport buffers whole responses, so in-process streams have no first-token timing
+        generator = LoadGenerator(client, args, measure_first_token=bool(args.url) or args.target == "uvicorn")
+        if args.warmup > 0:
+            await generator.run(args.warmup)
+            generator.idle_users.clear()
+            generator.skipped = 0
+        report = await generator.run(args.duration)
+
+    report.update(
+        target=args.url or args.target,
+        duration_seconds=args.duration,
+        mix=parse_mix(args.mix),
+        chat_turns=args.chat_turns,
+    )
+    if not args.url:
+        # Same environment as the server under test, so this is its LLM configuration
+        from config import settings
+
+        report["llm"] = {"provider": settings.ai_provider}
+        if settings.ai_provider == "fake":
+            report["llm"].update(
+                (name[len("fake_llm_"):], value)
+                for name, value in settings.model_dump().items()
+                if name.startswith("fake_llm_")
+            )
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -19,33 +19,139 @@ class Settings(BaseSettings):
     port: int = 8000
     cors_origins: str = "http://localhost:3000,http://localhost:8080,http://127.0.0.1:5500,http://127.0.0.1:8080,file://"
     
+    # AI provider
+    ai_provider: str = "gemini"  # "gemini" or "fake" (offline simulated model for load tests; no API key needed)
+    
     # AI/Google Gemini
     gemini_api_key: str = ""  # Can also be set via GEMINI_API_KEY env var
     gemini_model: str = "gemini-2.0-flash-exp"  # Use "gemini-2.0-flash-exp" or "gemini-1.5-flash" for stable models
     # Note: For gemini-2.5-flash, use "gemini-2.0-flash-exp" or check latest model names
     ai_temperature: float = 0.7
     ai_max_tokens: int = 500
+    ai_max_concurrency: int = 16  # Max concurrent LLM calls; extra chats queue
+    ai_sync_executor_workers: int = 4  # Threads for providers without native async
+    
+    # LLM backend pool (every key is paired with every model; primary first)
+    gemini_extra_api_keys: str = ""  # Comma-separated additional keys
+    gemini_fallback_models: str = ""  # Comma-separated, e.g. "gemini-1.5-flash"
+    ai_circuit_failure_threshold: int = 5  # Consecutive failures before a backend is skipped
+    ai_circuit_reset_seconds: float = 30.0  # Wait before probing a failed backend again
+    ai_hedge_enabled: bool = False  # Race a second backend when the first is slow
+    ai_hedge_percentile: float = 95.0  # Hedge after this percentile of the backend's recent latency
+    ai_hedge_min_delay_ms: int = 500
+    ai_hedge_max_delay_ms: int = 5000  # Also used until a backend has latency history
+    
+    # Fake LLM provider (ai_provider="fake")
+    fake_llm_backends: int = 1  # Pool size, to exercise failover and hedging
+    fake_llm_latency_ms: float = 300  # Typical time to first token
+    fake_llm_latency_distribution: str = "lognormal"  # "fixed", "uniform", "exponential" or "lognormal"
+    fake_llm_latency_spread: float = 0.5  # uniform: +/- fraction of latency; lognormal: sigma
+    fake_llm_tokens_per_second: float = 50  # Output rate after the first token (0 = instant)
+    fake_llm_error_rate: float = 0.0  # Fraction of calls that fail
+    
+    # AI response cache
+    ai_cache_enabled: bool = True
+    ai_cache_max_entries: int = 512
+    ai_cache_ttl_seconds: int = 3600
     
     # Rate Limiting
     rate_limit_enabled: bool = True
     rate_limit_per_minute: int = 10
     rate_limit_per_hour: int = 60
+    rate_limit_backend: str = "memory"  # "memory" (per process) or "sqlite" (shared by all workers on the host)
+    rate_limit_sqlite_path: str = "rate_limit.sqlite3"
+    
+    # Site content (blog posts and content JSON served by the API)
+    content_dir: str = ""  # Defaults to the site's data/ directory
+    
+    # Site search (BM25 index over blog posts and the blog/projects content)
+    search_index_dir: str = "search_index"  # One index file per language
+    search_refresh_seconds: float = 5.0  # How often searches check the source files for changes
     
     # Database (Optional)
     database_url: str = ""
     
+    # Contact submissions (queued, then stored/delivered in the background)
+    contact_queue_size: int = 1000  # Full queue -> 503
+    contact_workers: int = 2
+    contact_batch_size: int = 50
+    contact_batch_linger_ms: int = 500  # Max wait to fill a batch
+    contact_persist_enabled: bool = True  # Store in contact_submissions via database_url (SQLite by default)
+    contact_store_max_retries: int = 3  # A batch is dropped only after this many failed retries
+    contact_webhook_url: str = ""  # Optional; each submission is POSTed as JSON
+    contact_webhook_timeout_seconds: float = 10.0
+    contact_webhook_max_retries: int = 3
+    
+    # Chat sessions
+    session_store: str = "memory"  # "memory" or "sql" (uses database_url, SQLite by default)
+    session_timeout_minutes: int = 30
+    session_max_messages: int = 20  # Messages retained per conversation checkpoint; prompts are bounded by the history budget below
+    session_max_count: int = 0  # Hard cap on stored sessions (0 = unlimited); oldest evicted first
+    session_sweep_interval_seconds: int = 60  # Background expiry sweep (0 disables)
+    session_write_batch_size: int = 50  # SQL store: flush once this many writes are pending
+    session_flush_interval_ms: int = 200  # SQL store: max delay before buffered writes hit the DB
+    session_cache_size: int = 1000  # SQL store: hot sessions kept in process
+    session_cache_ttl_seconds: float = 5.0  # SQL store: staleness bound across workers
+    
+    # Chat WebSocket (/api/chat/ws): one connection per open chat page
+    chat_ws_max_connections: int = 500  # Per worker; further connections are closed with code 1013
+    chat_ws_heartbeat_seconds: float = 25.0  # Ping a client silent for this long; close after two missed pings
+    chat_ws_idle_timeout_seconds: float = 600.0  # Close connections without a chat message for this long
+    
+    # Conversation state (LangGraph checkpoints keyed by session ID)
+    # "memory" or "sqlite" (needs langgraph-checkpoint-sqlite); empty: sqlite with SESSION_STORE=sql, else memory
+    ai_checkpointer: str = ""
+    ai_checkpoint_sqlite_path: str = "checkpoints.sqlite3"
+    
+    # Conversation history sent to the LLM
+    history_token_budget: int = 1500  # Estimated tokens per turn for summary + recent messages
+    history_max_recent_messages: int = 10  # Verbatim messages; keep below session_max_messages
+    history_summary_enabled: bool = True  # Fold older turns into a rolling summary (background LLM call)
+    history_summary_max_tokens: int = 300
+    
+    # Portfolio context retrieved per turn (chunk index per language, stored in search_index_dir)
+    ai_retrieval_enabled: bool = True  # Off: the system prompt is sent without portfolio context
+    ai_retrieval_top_k: int = 4  # Best-matching chunks considered per question
+    ai_retrieval_token_budget: int = 600  # Estimated tokens of retrieved context per turn
+    
+    # Response compression (gzip, and brotli when installed), negotiated via Accept-Encoding
+    compression_enabled: bool = True
+    compression_level: int = 6  # gzip scale 1-9; mapped onto brotli quality 0-11
+    compression_min_size: int = 512  # Bytes; smaller complete bodies are sent uncompressed
+    # Content-type prefixes that are already compressed (or not worth compressing)
+    compression_skip_types: str = "image/,video/,audio/,font/woff,application/zip,application/gzip,application/x-gzip,application/octet-stream,application/pdf"
+    
     # Security
     secret_key: str = "change-this-secret-key-in-production"
     allowed_origins: str = "http://localhost:3000,http://127.0.0.1:5500"
     
+    # Metrics
+    metrics_enabled: bool = True  # Expose Prometheus metrics at /api/metrics
+    
     # Logging
     log_level: str = "INFO"
+    log_async: bool = True  # Render and write logs on a background thread
+    log_queue_size: int = 10000  # Events buffered before new ones are dropped
+    # Sampling rules "event=rate" or "event@path=rate"; warnings, errors and 4xx/5xx always logged
+    log_sample_rates: str = "request_received@/api/health=0.01,request_completed@/api/health=0.01"
     
     @property
     def cors_origins_list(self) -> List[str]:
         """Parse CORS origins string into list."""
         return [origin.strip() for origin in self.cors_origins.split(",") if origin.strip()]
     
+    @property
+    def compression_skip_types_list(self) -> List[str]:
+        """Parse skipped compression content types into a list."""
+        return [prefix.strip().lower() for prefix in self.compression_skip_types.split(",") if prefix.strip()]
+    
+    @property
+    def ai_checkpointer_backend(self) -> str:
+        """Checkpointer to use; conversations must be shared wherever sessions are."""
+        if self.ai_checkpointer:
+            return self.ai_checkpointer.lower()
+        return "sqlite" if self.session_store == "sql" else "memory"
+    
     @property
     def allowed_origins_list(self) -> List[str]:
         """Parse allowed origins string into list."""
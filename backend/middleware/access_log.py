@@ -0,0 +1,87 @@
+"""
+Access logging middleware.
+Plain ASGI: records method, path, status and duration without wrapping
+the response body, so streaming responses are not buffered.
+"""
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Dict
+import time
+import structlog
+
+from utils.metrics import http_request_duration_seconds, http_requests_total
+
+logger = structlog.get_logger()
+
+
+class AccessLogMiddleware:
+    """Log all HTTP requests with timing information."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        # id(matched route) -> full path template, used as the metrics label;
+        # routes live as long as the app, so their ids are stable
+        self._route_templates: Dict[int, str] = {}
+
+    def _route_template(self, scope: Scope) -> str:
+        """Full template (e.g. /api/chat/history/{session_id}) of the matched route."""
+        route = scope.get("route")
+        if route is None:
+            return "unmatched"
+        template = self._route_templates.get(id(route))
+        if template is None:
+            # Routes of included routers may only know their own suffix;
+            # recover the router prefix from the concrete request path
+            template = route_path = getattr(route, "path", "unmatched")
+            try:
+                concrete = getattr(route, "path_format", route_path).format(**scope.get("path_params", {}))
+                if scope["path"].endswith(concrete):
+                    template = scope["path"][: len(scope["path"]) - len(concrete)] + route_path
+            except (KeyError, IndexError, ValueError):
+                pass
+            self._route_templates[id(route)] = template
+        return template
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        method = scope["method"]
+        path = scope["path"]
+        client = scope.get("client")
+
+        # Log request
+        logger.info(
+            "request_received",
+            method=method,
+            path=path,
+            client_ip=client[0] if client else None,
+        )
+
+        status_code = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - start_time
+
+            # Label by route template (e.g. /api/chat/history/{session_id}) to bound cardinality
+            route_path = self._route_template(scope)
+            http_requests_total.labels(method, route_path, status_code).inc()
+            http_request_duration_seconds.labels(method, route_path).observe(duration)
+
+            # Log response (for streams, once the body has been sent)
+            logger.info(
+                "request_completed",
+                method=method,
+                path=path,
+                status_code=status_code,
+                duration_ms=round(duration * 1000, 2),
+            )
@@ -0,0 +1,140 @@
+"""
+Response compression middleware.
+Plain ASGI: negotiates gzip (or brotli, when installed) from Accept-Encoding.
+Complete bodies are compressed in one go once they reach a minimum size;
+streamed bodies (e.g. server-sent events) are compressed chunk by chunk and
+flushed after each one, so every event still reaches the client immediately.
+"""
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Optional, Sequence
+
+from utils.compression import StreamCompressor, choose_encoding, compress
+from utils.metrics import http_compressed_responses_total, http_compression_saved_bytes_total
+
+# No body, or a body that must be returned byte for byte
+UNCOMPRESSED_STATUSES = frozenset([204, 206, 304])
+
+
+class CompressionMiddleware:
+    """Compress eligible responses with the best encoding the client accepts."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        level: int = 6,
+        min_size: int = 512,
+        skip_types: Sequence[str] = (),
+    ):
+        self.app = app
+        self.level = level
+        self.min_size = min_size
+        self.skip_types = tuple(prefix.lower() for prefix in skip_types)
+
+    def is_compressible(self, status: int, headers: Headers) -> bool:
+        """Whether a response may be compressed, judged from its status and headers."""
+        if status < 200 or status in UNCOMPRESSED_STATUSES:
+            return False
+        # Already encoded (e.g. precompressed site content), or explicitly not to be transformed
+        if "content-encoding" in headers or "no-transform" in headers.get("cache-control", ""):
+            return False
+        content_type = headers.get("content-type", "").lower()
+        return bool(content_type) and not content_type.startswith(self.skip_types)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        # Response start, held until the first body chunk shows whether and how to compress
+        start: Optional[Message] = None
+        compressor: Optional[StreamCompressor] = None
+        passthrough = False
+        body_bytes = sent_bytes = 0
+
+        async def send_compressed(message: Message):
+            nonlocal start, compressor, passthrough, body_bytes, sent_bytes
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                if not self.is_compressible(message["status"], Headers(raw=message["headers"])):
+                    passthrough = True
+                    await send(message)
+                    return
+                # Caches must keep the encoded and identity representations apart
+                headers = MutableHeaders(scope=message)
+                if "accept-encoding" not in headers.get("vary", "").lower():
+                    headers.add_vary_header("Accept-Encoding")
+                if encoding is None:
+                    passthrough = True
+                    await send(message)
+                    return
+                start = message
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                headers = MutableHeaders(scope=start)
+                declared = headers.get("content-length")
+                too_small = len(body) < self.min_size if not more_body else (
+                    declared is not None and declared.isdigit() and int(declared) < self.min_size
+                )
+                if too_small:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+
+                if not more_body:
+                    # Complete body: compress at once, and keep it only if it is smaller
+                    compressed = compress(body, encoding, self.level)
+                    if len(compressed) < len(body):
+                        self._mark_encoded(headers, encoding)
+                        headers["Content-Length"] = str(len(compressed))
+                        self._record(encoding, len(body), len(compressed))
+                        message = {**message, "body": compressed}
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+
+                # Streamed body: the final size is unknown, so Content-Length goes
+                compressor = StreamCompressor(encoding, self.level)
+                self._mark_encoded(headers, encoding)
+                if "content-length" in headers:
+                    del headers["content-length"]
+                await send(start)
+
+            body_bytes += len(body)
+            data = compressor.compress(body) if body else b""
+            if not more_body:
+                data += compressor.finish()
+            sent_bytes += len(data)
+            if data or not more_body:
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+            if not more_body:
+                self._record(encoding, body_bytes, sent_bytes)
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    def _mark_encoded(headers: MutableHeaders, encoding: str):
+        headers["Content-Encoding"] = encoding
+        # The encoded bytes differ from the identity body, so a strong validator becomes weak
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+
+    @staticmethod
+    def _record(encoding: str, original: int, compressed: int):
+        http_compressed_responses_total.labels(encoding).inc()
+        http_compression_saved_bytes_total.labels(encoding).inc(max(0, original - compressed))
@@ -1,123 +1,319 @@
 """
-Rate limiting middleware using in-memory storage.
-For production, consider using Redis-based rate limiting.
+Rate limiting middleware with pluggable state backends.
+Uses GCRA (Generic Cell Rate Algorithm): each client is tracked by one
+theoretical arrival time per limit, so memory and per-check cost are
+constant regardless of request volume.
+
+Backends:
+- memory: per-process state (default; limits apply per worker)
+- sqlite: state shared by all worker processes on the host via a WAL-mode
+  SQLite file, one statement per check
 """
-from fastapi import Request, status
-from starlette.middleware.base import BaseHTTPMiddleware
+from abc import ABC, abstractmethod
+from fastapi import status
+from starlette.datastructures import Headers
 from starlette.responses import JSONResponse
-from collections import defaultdict
-from datetime import datetime, timedelta
-from typing import Tuple
+from starlette.types import ASGIApp, Receive, Scope, Send
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+import math
+import sqlite3
+import time
 import structlog
 from config import settings
+from utils.metrics import rate_limit_rejections_total
 
 logger = structlog.get_logger()
 
+MINUTE_LIMIT_MESSAGE = "Too many requests per minute. Please try again later."
+HOUR_LIMIT_MESSAGE = "Too many requests per hour. Please try again later."
+
+
+class RateLimitBackend(ABC):
+    """
+    Per-client GCRA state store enforcing a per-minute and a per-hour limit.
+
+    A limit of N requests per period P has emission interval T = P / N and
+    allows a burst of up to N requests, refilling at one request every T
+    seconds. Rejected requests are not counted against the client.
+    """
+
+    def __init__(self, per_minute: int, per_hour: int):
+        self.per_minute = per_minute
+        self.per_hour = per_hour
+        self.minute_interval = 60.0 / per_minute
+        self.hour_interval = 3600.0 / per_hour
+
+    @abstractmethod
+    def check(self, client_id: str, now: Optional[float] = None) -> Tuple[bool, str, float]:
+        """
+        Check and record a request.
+
+        Returns:
+            (is_limited, message, retry_after_seconds)
+        """
+
+    def close(self):
+        """Release backend resources."""
+
+    def _rejection(self, minute_tat: float, hour_tat: float, now: float) -> Tuple[bool, str, float]:
+        """Explain a rejection from the client's (unchanged) arrival times."""
+        minute_excess = max(minute_tat, now) + self.minute_interval - now - 60.0
+        if minute_excess > 0:
+            return True, MINUTE_LIMIT_MESSAGE, minute_excess
+        hour_excess = max(hour_tat, now) + self.hour_interval - now - 3600.0
+        return True, HOUR_LIMIT_MESSAGE, max(hour_excess, 0.0)
+
+
+class GCRARateLimiter(RateLimitBackend):
+    """In-process GCRA state (the default backend)."""
+
+    # Stale clients dropped per check; keeps cleanup amortized O(1)
+    SWEEP_BATCH = 2
+
+    def __init__(self, per_minute: int, per_hour: int):
+        super().__init__(per_minute, per_hour)
+        # client_id -> [minute TAT, hour TAT]; least -> most recently updated
+        self.clients: "OrderedDict[str, List[float]]" = OrderedDict()
+
+    def check(self, client_id: str, now: Optional[float] = None) -> Tuple[bool, str, float]:
+        if now is None:
+            now = time.monotonic()
+
+        state = self.clients.get(client_id)
+        if state is None:
+            minute_tat = hour_tat = now
+        else:
+            minute_tat = state[0] if state[0] > now else now
+            hour_tat = state[1] if state[1] > now else now
+
+        new_minute_tat = minute_tat + self.minute_interval
+        if new_minute_tat - now > 60.0:
+            return True, MINUTE_LIMIT_MESSAGE, new_minute_tat - now - 60.0
+
+        new_hour_tat = hour_tat + self.hour_interval
+        if new_hour_tat - now > 3600.0:
+            return True, HOUR_LIMIT_MESSAGE, new_hour_tat - now - 3600.0
+
+        if state is None:
+            self.clients[client_id] = [new_minute_tat, new_hour_tat]
+        else:
+            state[0] = new_minute_tat
+            state[1] = new_hour_tat
+            self.clients.move_to_end(client_id)
+
+        self._sweep(now)
+        return False, "", 0.0
+
+    def _sweep(self, now: float):
+        """Drop clients whose state has fully decayed, oldest first."""
+        for _ in range(self.SWEEP_BATCH):
+            if not self.clients:
+                return
+            client_id, state = next(iter(self.clients.items()))
+            # Fully decayed state is identical to a client never seen before
+            if state[0] > now or state[1] > now:
+                return
+            del self.clients[client_id]
+
+
+class SQLiteRateLimitBackend(RateLimitBackend):
+    """
+    GCRA state shared across worker processes through a SQLite file.
+
+    Each check is a single upsert whose RETURNING clause says whether the
+    request was admitted, so a check costs one statement. Timestamps are
+    wall-clock seconds because monotonic clocks are not comparable across
+    processes. The connection is synchronous: with WAL and
+    synchronous=NORMAL a check takes tens of microseconds, well below the
+    cost of hopping to a thread. Because it runs on the event loop, it waits
+    at most BUSY_TIMEOUT for another worker's write lock and otherwise fails
+    open (admits the request) rather than stall every request of the worker.
+    """
+
+    # Delete fully decayed rows every this many checks
+    PRUNE_EVERY = 10_000
+    # Seconds to wait for a lock held by another worker
+    BUSY_TIMEOUT = 0.05
+
+    _CHECK_SQL = """
+        INSERT INTO rate_limits (client_id, minute_tat, hour_tat, allowed)
+        VALUES (:client_id, :now + :minute_interval, :now + :hour_interval, 1)
+        ON CONFLICT(client_id) DO UPDATE SET
+            allowed = {admit},
+            minute_tat = CASE WHEN {admit} THEN max(minute_tat, :now) + :minute_interval ELSE minute_tat END,
+            hour_tat = CASE WHEN {admit} THEN max(hour_tat, :now) + :hour_interval ELSE hour_tat END
+        RETURNING allowed, minute_tat, hour_tat
+    """.format(admit=(
+        "(max(minute_tat, :now) + :minute_interval - :now <= 60.0"
+        " AND max(hour_tat, :now) + :hour_interval - :now <= 3600.0)"
+    ))
+
+    def __init__(self, per_minute: int, per_hour: int, path: str):
+        super().__init__(per_minute, per_hour)
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._checks = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # Opened lazily so each worker process gets its own connection
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.BUSY_TIMEOUT, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits ("
+                " client_id TEXT PRIMARY KEY,"
+                " minute_tat REAL NOT NULL,"
+                " hour_tat REAL NOT NULL,"
+                " allowed INTEGER NOT NULL"
+                ") WITHOUT ROWID"
+            )
+            self._conn = conn
+        return self._conn
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Rate limiting middleware to prevent abuse."""
-    
-    def __init__(self, app):
-        super().__init__(app)
-        self.requests_per_minute = defaultdict(list)
-        self.requests_per_hour = defaultdict(list)
-        self.cleanup_interval = timedelta(minutes=5)
-        self.last_cleanup = datetime.now()
-    
-    def get_client_id(self, request: Request) -> str:
+    def check(self, client_id: str, now: Optional[float] = None) -> Tuple[bool, str, float]:
+        if now is None:
+            now = time.time()
+        try:
+            conn = self._connect()
+            allowed, minute_tat, hour_tat = conn.execute(self._CHECK_SQL, {
+                "client_id": client_id,
+                "now": now,
+                "minute_interval": self.minute_interval,
+                "hour_interval": self.hour_interval,
+            }).fetchone()
+
+            self._checks += 1
+            if self._checks % self.PRUNE_EVERY == 0:
+                conn.execute(
+                    "DELETE FROM rate_limits WHERE minute_tat <= ? AND hour_tat <= ?",
+                    (now, now),
+                )
+        except sqlite3.OperationalError as e:
+            # Locked by another worker for longer than BUSY_TIMEOUT: fail open
+            logger.warning("rate_limit_backend_unavailable", backend="sqlite", error=str(e))
+            return False, "", 0.0
+
+        if allowed:
+            return False, "", 0.0
+        return self._rejection(minute_tat, hour_tat, now)
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def create_rate_limit_backend() -> RateLimitBackend:
+    """Build the rate-limit backend selected by settings."""
+    if settings.rate_limit_backend == "sqlite":
+        return SQLiteRateLimitBackend(
+            per_minute=settings.rate_limit_per_minute,
+            per_hour=settings.rate_limit_per_hour,
+            path=settings.rate_limit_sqlite_path,
+        )
+    return GCRARateLimiter(
+        per_minute=settings.rate_limit_per_minute,
+        per_hour=settings.rate_limit_per_hour,
+    )
+
+
+_shared_backend: Optional[RateLimitBackend] = None
+
+
+def get_rate_limit_backend() -> RateLimitBackend:
+    """
+    Process-wide backend, shared by the middleware and by per-message checks
+    (WebSocket chat), so both transports draw on the same client budget.
+    """
+    global _shared_backend
+    if _shared_backend is None:
+        _shared_backend = create_rate_limit_backend()
+    return _shared_backend
+
+
+def get_client_id(headers: Headers, scope: Scope) -> str:
+    """Get unique identifier for client (IP address)."""
+    # Try to get real IP from proxy headers
+    forwarded_for = headers.get("x-forwarded-for")
+    if forwarded_for:
+        return forwarded_for.split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def is_exempt(headers: Headers) -> bool:
+    """Rate limiting is skipped in test mode or when the test header is present."""
+    return settings.environment == "test" or headers.get("x-test-mode") == "true"
+
+
+def record_rejection(message: str, client_id: str, path: str):
+    """Count and log a rejected request or message."""
+    rate_limit_rejections_total.labels("minute" if message == MINUTE_LIMIT_MESSAGE else "hour").inc()
+    logger.warning(
+        "rate_limit_exceeded",
+        client_id=client_id,
+        path=path,
+    )
+
+
+class RateLimitMiddleware:
+    """Rate limiting middleware to prevent abuse (plain ASGI)."""
+
+    # Skip rate limiting for health checks and docs
+    EXEMPT_PATHS = frozenset([
+        "/", "/api/health", "/api/metrics", "/api/docs", "/api/redoc", "/api/openapi.json",
+        # Read-only and cheap (precomputed index); searched as the visitor types
+        "/api/search",
+    ])
+    # Read-only, cacheable site content
+    EXEMPT_PREFIXES = ("/api/blog/", "/api/content/")
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.limiter = get_rate_limit_backend()
+
+    def get_client_id(self, headers: Headers, scope: Scope) -> str:
         """Get unique identifier for client (IP address)."""
-        # Try to get real IP from proxy headers
-        forwarded_for = request.headers.get("X-Forwarded-For")
-        if forwarded_for:
-            return forwarded_for.split(",")[0].strip()
-        return request.client.host if request.client else "unknown"
-    
+        return get_client_id(headers, scope)
+
     def is_rate_limited(self, client_id: str) -> Tuple[bool, str]:
         """Check if client has exceeded rate limits."""
-        now = datetime.now()
-        
-        # Cleanup old entries periodically
-        if now - self.last_cleanup > self.cleanup_interval:
-            self._cleanup_old_entries(now)
-            self.last_cleanup = now
-        
-        # Check per-minute limit
-        minute_ago = now - timedelta(minutes=1)
-        recent_requests = [
-            req_time for req_time in self.requests_per_minute[client_id]
-            if req_time > minute_ago
-        ]
-        self.requests_per_minute[client_id] = recent_requests
-        
-        if len(recent_requests) >= settings.rate_limit_per_minute:
-            return True, "Too many requests per minute. Please try again later."
-        
-        # Check per-hour limit
-        hour_ago = now - timedelta(hours=1)
-        recent_requests_hour = [
-            req_time for req_time in self.requests_per_hour[client_id]
-            if req_time > hour_ago
-        ]
-        self.requests_per_hour[client_id] = recent_requests_hour
-        
-        if len(recent_requests_hour) >= settings.rate_limit_per_hour:
-            return True, "Too many requests per hour. Please try again later."
-        
-        # Record this request
-        self.requests_per_minute[client_id].append(now)
-        self.requests_per_hour[client_id].append(now)
-        
-        return False, ""
-    
-    def _cleanup_old_entries(self, now: datetime):
-        """Remove old entries from rate limit tracking."""
-        minute_ago = now - timedelta(minutes=1)
-        hour_ago = now - timedelta(hours=1)
-        
-        # Cleanup per-minute tracking
-        for client_id in list(self.requests_per_minute.keys()):
-            self.requests_per_minute[client_id] = [
-                req_time for req_time in self.requests_per_minute[client_id]
-                if req_time > minute_ago
-            ]
-            if not self.requests_per_minute[client_id]:
-                del self.requests_per_minute[client_id]
-        
-        # Cleanup per-hour tracking
-        for client_id in list(self.requests_per_hour.keys()):
-            self.requests_per_hour[client_id] = [
-                req_time for req_time in self.requests_per_hour[client_id]
-                if req_time > hour_ago
-            ]
-            if not self.requests_per_hour[client_id]:
-                del self.requests_per_hour[client_id]
-    
-    async def dispatch(self, request: Request, call_next):
+        is_limited, message, _ = self.limiter.check(client_id)
+        return is_limited, message
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         """Process request with rate limiting."""
-        # Skip rate limiting for health checks and docs
-        if request.url.path in ["/", "/api/health", "/api/docs", "/api/redoc", "/api/openapi.json"]:
-            return await call_next(request)
-        
+        if (
+            scope["type"] != "http"
+            or scope["path"] in self.EXEMPT_PATHS
+            or scope["path"].startswith(self.EXEMPT_PREFIXES)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+
         # Skip rate limiting in test mode or when test header is present
-        if settings.environment == "test" or request.headers.get("X-Test-Mode") == "true":
-            return await call_next(request)
-        
-        client_id = self.get_client_id(request)
-        is_limited, message = self.is_rate_limited(client_id)
-        
+        if is_exempt(headers):
+            await self.app(scope, receive, send)
+            return
+
+        client_id = self.get_client_id(headers, scope)
+        is_limited, message, retry_after = self.limiter.check(client_id)
+
         if is_limited:
-            logger.warning(
-                "rate_limit_exceeded",
-                client_id=client_id,
-                path=request.url.path,
-            )
-            return JSONResponse(
+            record_rejection(message, client_id, scope["path"])
+            response = JSONResponse(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 content={
                     "success": False,
                     "message": message,
                 },
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
             )
-        
-        return await call_next(request)
+            await response(scope, receive, send)
+            return
 
+        await self.app(scope, receive, send)
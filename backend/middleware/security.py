@@ -1,46 +1,98 @@
 """
 Security middleware for request validation and security headers.
+Implemented as plain ASGI so streaming responses pass through untouched.
 """
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.exceptions import HTTPException
 from starlette.responses import Response as StarletteResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import structlog
 
 logger = structlog.get_logger()
 
+MAX_BODY_SIZE = 10 * 1024 * 1024  # 10MB
 
-class SecurityMiddleware(BaseHTTPMiddleware):
+SECURITY_HEADERS = (
+    ("X-Content-Type-Options", "nosniff"),
+    ("X-Frame-Options", "DENY"),
+    ("X-XSS-Protection", "1; mode=block"),
+    ("Referrer-Policy", "strict-origin-when-cross-origin"),
+)
+HSTS_HEADER = ("Strict-Transport-Security", "max-age=31536000; includeSubDomains")
+
+
+class RequestEntityTooLarge(HTTPException):
+    """Raised from receive() once a streamed body exceeds the size limit."""
+
+    def __init__(self):
+        super().__init__(status_code=413, detail="Request entity too large")
+
+
+class SecurityMiddleware:
     """Middleware to add security headers and validate requests."""
-    
-    async def dispatch(self, request: Request, call_next):
+
+    def __init__(self, app: ASGIApp, max_body_size: int = MAX_BODY_SIZE):
+        self.app = app
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         """Process request and add security headers."""
-        # Validate request size (prevent DoS)
-        if request.headers.get("content-length"):
-            content_length = int(request.headers.get("content-length", 0))
-            max_size = 10 * 1024 * 1024  # 10MB
-            if content_length > max_size:
-                logger.warning(
-                    "request_too_large",
-                    path=request.url.path,
-                    size=content_length,
-                )
-                return StarletteResponse(
-                    status_code=413,
-                    content="Request entity too large",
-                )
-        
-        # Process request
-        response = await call_next(request)
-        
-        # Add security headers
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+
+        # Validate declared request size (prevent DoS)
+        content_length = headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_body_size:
+            self._log_too_large(scope, int(content_length))
+            await StarletteResponse(status_code=413, content="Request entity too large")(scope, receive, send)
+            return
+
         # Only add HSTS in production
-        if not request.url.scheme == "http" or "localhost" not in request.url.hostname:
-            response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-        
-        return response
+        hostname = headers.get("host", "").rsplit(":", 1)[0]
+        add_hsts = scope.get("scheme") != "http" or "localhost" not in hostname
+
+        received = 0
+        response_started = False
+
+        async def receive_limited() -> Message:
+            # Enforce the limit on the bytes actually received, which also
+            # covers chunked bodies without a content-length header
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    self._log_too_large(scope, received)
+                    raise RequestEntityTooLarge()
+            return message
+
+        async def send_with_headers(message: Message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                response_headers = MutableHeaders(scope=message)
+                for name, value in SECURITY_HEADERS:
+                    response_headers[name] = value
+                if add_hsts:
+                    response_headers[HSTS_HEADER[0]] = HSTS_HEADER[1]
+            await send(message)
+
+        try:
+            await self.app(scope, receive_limited, send_with_headers)
+        except RequestEntityTooLarge:
+            if response_started:
+                raise
+            await StarletteResponse(status_code=413, content="Request entity too large")(
+                scope, receive, send_with_headers
+            )
 
+    @staticmethod
+    def _log_too_large(scope: Scope, size: int):
+        logger.warning(
+            "request_too_large",
+            path=scope["path"],
+            size=size,
+        )
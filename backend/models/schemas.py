@@ -72,3 +72,42 @@ class ErrorResponse(BaseModel):
     message: str
     errors: Optional[List[str]] = None
 
+
+
+class TocEntry(BaseModel):
+    """Table of contents entry for a blog post heading."""
+    id: str = Field(..., description="Heading anchor ID")
+    text: str
+    level: int = Field(..., ge=1, le=6)
+
+
+class BlogPostResponse(BaseModel):
+    """Server-rendered blog post."""
+    slug: str
+    lang: str
+    title: str
+    date: str
+    image: str
+    excerpt: str
+    html: str = Field(..., description="Rendered post body")
+    toc: List[TocEntry] = Field(default_factory=list, description="Headings in document order")
+
+
+class SearchResult(BaseModel):
+    """A blog post or project matching a search query."""
+    id: str = Field(..., description="Document ID, e.g. blog:<slug> or project:<n>")
+    type: str = Field(..., description="blog or project")
+    title: str
+    url: str = Field(..., description="Page to open, relative to the site root")
+    date: str = ""
+    score: float = Field(..., description="BM25 relevance score")
+    snippet: str = Field(..., description="Excerpt, HTML-escaped, with matched terms wrapped in <mark>")
+
+
+class SearchResponse(BaseModel):
+    """Search results, most relevant first."""
+    query: str
+    lang: str
+    total: int = Field(..., description="Number of matching documents")
+    took_ms: float
+    results: List[SearchResult] = Field(default_factory=list)
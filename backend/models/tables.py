@@ -0,0 +1,37 @@
+"""
+SQLAlchemy table definitions for persistent storage.
+"""
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+)
+
+metadata = MetaData()
+
+
+chat_sessions = Table(
+    "chat_sessions",
+    metadata,
+    Column("id", String(64), primary_key=True),
+    Column("created_at", DateTime, nullable=False),
+    Column("last_activity", DateTime, nullable=False, index=True),
+    Column("language", String(8), nullable=False, default="en"),
+)
+
+
+contact_submissions = Table(
+    "contact_submissions",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("name", String(100), nullable=False),
+    Column("email", String(320), nullable=False),
+    Column("subject", String(200), nullable=False),
+    Column("message", Text, nullable=False),
+    Column("client_ip", String(64), nullable=True),
+    Column("submitted_at", DateTime, nullable=False, index=True),
+)
@@ -3,21 +3,107 @@ AI service for chat functionality using LangGraph with Google Gemini.
 Implements an agent-based chat completion system.
 """
 from langgraph.graph import StateGraph, END
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+from langgraph.graph.message import add_messages
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AnyMessage, BaseMessage, HumanMessage, AIMessage, RemoveMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
+from concurrent.futures import ThreadPoolExecutor
 import structlog
 from config import settings
-from typing import List, Dict, Optional, TypedDict, Annotated
+from services.checkpointer import (
+    LatestInMemorySaver,
+    check_checkpointer_settings,
+    close_checkpointer,
+    create_checkpointer,
+)
+from services.history_manager import HistoryManager, message_text
+from services.knowledge_service import knowledge_service
+from services.llm_pool import create_fake_llm_pool, create_llm_pool
+from services.response_cache import response_cache
+from utils.metrics import (
+    ai_requests_coalesced_total,
+    chat_history_summaries_total,
+    chat_history_tokens,
+    llm_errors_total,
+    llm_output_chars,
+    llm_request_duration_seconds,
+)
+from typing import AsyncIterator, Iterable, List, Dict, Optional, Tuple, TypedDict, Annotated
 import os
 import asyncio
-from operator import add
+import contextvars
+import time
+import uuid
 
 logger = structlog.get_logger()
 
+SERVICE_UNAVAILABLE_MESSAGE = "I'm sorry, the AI service is not currently available. Please try again later or use the contact form."
+SERVICE_ERROR_MESSAGE = "I'm sorry, I encountered an error processing your message. Please try again later."
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a chat between a website visitor and the site owner's AI persona. "
+    "Merge the new messages into the existing summary. Keep what the visitor shared about themselves, "
+    "what they asked and what was answered. Write in the language of the conversation, "
+    "in at most {max_words} words. Reply with the summary only."
+)
+# Used when data/system_prompt.txt is absent; portfolio facts come from retrieval, not the prompt
+DEFAULT_SYSTEM_PROMPT = (
+    "You are the AI persona of the portfolio site's owner, talking with a visitor in the first person. "
+    "Answer questions about their work, projects, skills and writing from the portfolio context provided; "
+    "if it does not cover a question, say so instead of guessing, and suggest the contact form. "
+    "Reply in the visitor's language, briefly and in a friendly, professional tone."
+)
+CONTEXT_HEADER = "Portfolio context for this question:"
 
-class ChatState(TypedDict):
-    """State for the LangGraph chat agent."""
-    messages: Annotated[List, add]  # Accumulate messages
+
+class ChatState(TypedDict, total=False):
+    """State for the LangGraph chat agent (one thread per chat session)."""
+    messages: Annotated[List[AnyMessage], add_messages]  # Accumulate messages; supports RemoveMessage
+    summary: str  # Rolling summary of turns no longer in messages
+    summary_through: str  # ID of the last message folded into the summary
+    context: str  # Portfolio chunks retrieved for the current question
+
+
+class SharedTurn:
+    """
+    One in-flight LLM turn whose output is shared by identical requests.
+    
+    Text is appended as it is produced; each waiter replays it from the
+    start at its own pace, so late joiners miss nothing.
+    """
+    
+    def __init__(self):
+        self.parts: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+    
+    def _notify(self):
+        # Wake current waiters; later waits use a fresh event
+        self._changed.set()
+        self._changed = asyncio.Event()
+    
+    def push(self, text: str):
+        self.parts.append(text)
+        self._notify()
+    
+    def finish(self, error: Optional[BaseException] = None):
+        self.done = True
+        self.error = error
+        self._notify()
+    
+    async def stream(self) -> AsyncIterator[str]:
+        """Yield every fragment so far, then new ones until the turn finishes."""
+        index = 0
+        while True:
+            while index < len(self.parts):
+                yield self.parts[index]
+                index += 1
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            await self._changed.wait()
 
 
 class AIService:
@@ -25,26 +111,57 @@ class AIService:
     
     def __init__(self):
         self.api_key = settings.gemini_api_key or os.getenv("GEMINI_API_KEY", "")
-        self.model_name = settings.gemini_model
+        self.provider = settings.ai_provider
+        # Metrics and cache label; the fake provider never shares cached answers with Gemini
+        self.model_name = "fake" if self.provider == "fake" else settings.gemini_model
         self.temperature = settings.ai_temperature
         self.max_tokens = settings.ai_max_tokens
         
-        if not self.api_key:
+        # Explicit cap on concurrent LLM calls; excess requests wait here
+        self.max_concurrency = settings.ai_max_concurrency
+        self._llm_slots = asyncio.Semaphore(self.max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+        # Dedicated pool, used only for providers without a native async path
+        self._sync_executor: Optional[ThreadPoolExecutor] = None
+        
+        # Conversation state lives in the checkpointer, keyed by session ID (thread ID)
+        self.checkpointer = LatestInMemorySaver()
+        self.history = HistoryManager(
+            token_budget=settings.history_token_budget,
+            max_recent_messages=settings.history_max_recent_messages,
+            max_retained_messages=settings.session_max_messages,
+            summary_max_tokens=settings.history_summary_max_tokens,
+            summarizer=self.summarize_conversation if settings.history_summary_enabled else None,
+        )
+        # session_id -> running summary refresh / summary waiting to be applied on the next turn
+        self._summary_tasks: Dict[str, asyncio.Task] = {}
+        self._pending_summaries: Dict[str, Dict[str, str]] = {}
+        # cache key -> in-flight turn shared by identical opening questions
+        self._in_flight: Dict[str, SharedTurn] = {}
+        self.coalesced = 0
+        
+        if self.provider != "fake" and not self.api_key:
             logger.warning("gemini_api_key_missing", message="AI service not configured")
             self.llm = None
             self.agent = None
         else:
             try:
-                # Initialize Google Gemini LLM
-                self.llm = ChatGoogleGenerativeAI(
-                    model=self.model_name,
-                    google_api_key=self.api_key,
-                    temperature=self.temperature,
-                    max_output_tokens=self.max_tokens,
-                )
+                # Backends (Gemini keys x models, or simulated) behind failover, circuit breakers and hedging
+                if self.provider == "fake":
+                    self.llm = create_fake_llm_pool()
+                else:
+                    self.llm = create_llm_pool(self.api_key)
                 
-                # Load system prompt from file
+                # Load system prompt from file; the message is built once and reused every turn
                 self.system_prompt = self._load_system_prompt()
+                self.system_message = SystemMessage(content=self.system_prompt)
+                
+                if not self._has_native_async(self.llm):
+                    self._sync_executor = ThreadPoolExecutor(
+                        max_workers=settings.ai_sync_executor_workers,
+                        thread_name_prefix="llm-sync",
+                    )
                 
                 # Build LangGraph agent
                 self.agent = self._build_agent()
@@ -72,48 +189,307 @@ class AIService:
                 return prompt
             else:
                 logger.warning("system_prompt_file_not_found", path=prompt_path)
-                return "You are a helpful AI assistant."
+                return DEFAULT_SYSTEM_PROMPT
         except Exception as e:
             logger.error("failed_to_load_system_prompt", error=str(e), exc_info=True)
-            return "You are a helpful AI assistant."
+            return DEFAULT_SYSTEM_PROMPT
+    
+    async def start(self):
+        """Open the configured checkpointer (called on application startup)."""
+        if settings.ai_checkpointer_backend == "memory":
+            check_checkpointer_settings()
+            return
+        self.checkpointer = await create_checkpointer()
+        if self.agent:
+            self.agent = self._build_agent()
+    
+    async def close(self):
+        """Stop summary refreshes and close the checkpointer (called on shutdown)."""
+        for task in list(self._summary_tasks.values()):
+            task.cancel()
+        await asyncio.gather(*self._summary_tasks.values(), return_exceptions=True)
+        self._summary_tasks.clear()
+        await close_checkpointer(self.checkpointer)
+    
+    async def delete_conversations(self, session_ids: Iterable[str]):
+        """Drop the stored conversation state of removed sessions."""
+        for session_id in session_ids:
+            self._pending_summaries.pop(session_id, None)
+            await self.checkpointer.adelete_thread(session_id)
+    
+    @staticmethod
+    def _has_native_async(llm) -> bool:
+        """Whether the chat model implements its own async generation."""
+        if not isinstance(llm, BaseChatModel):
+            return hasattr(llm, "ainvoke")
+        return type(llm)._agenerate is not BaseChatModel._agenerate
+    
+    async def _call_llm(self, messages: List):
+        """Call the LLM within the concurrency limit."""
+        self.waiting += 1
+        try:
+            await self._llm_slots.acquire()
+        finally:
+            self.waiting -= 1
+        
+        self.in_flight += 1
+        start_time = time.perf_counter()
+        try:
+            if self._sync_executor is None:
+                response = await self.llm.ainvoke(messages)
+            else:
+                loop = asyncio.get_running_loop()
+                response = await loop.run_in_executor(self._sync_executor, self.llm.invoke, messages)
+        except Exception as e:
+            llm_errors_total.labels(self.model_name, type(e).__name__).inc()
+            raise
+        finally:
+            llm_request_duration_seconds.labels(self.model_name).observe(time.perf_counter() - start_time)
+            self.in_flight -= 1
+            self._llm_slots.release()
+        
+        llm_output_chars.labels(self.model_name).observe(len(self._message_text(response)))
+        return response
+    
+    async def summarize_conversation(
+        self,
+        previous_summary: str,
+        messages: List[BaseMessage],
+        max_tokens: int = 300,
+    ) -> Optional[str]:
+        """
+        Fold messages into a rolling conversation summary.
+        
+        Called off the request path after a turn; returns None if the LLM
+        is not configured or the call fails.
+        """
+        if not self.llm:
+            return None
+        
+        transcript = "\n".join(
+            f"{'user' if message.type == 'human' else 'assistant'}: {message_text(message)}"
+            for message in messages
+        )
+        prompt = [
+            SystemMessage(content=SUMMARY_PROMPT.format(max_words=max(20, max_tokens * 3 // 4))),
+            HumanMessage(content=f"Existing summary:\n{previous_summary or '(none)'}\n\nNew messages:\n{transcript}"),
+        ]
+        try:
+            response = await self._call_llm(prompt)
+        except Exception as e:
+            logger.warning("conversation_summary_failed", error=str(e), error_type=type(e).__name__)
+            return None
+        return self._message_text(response).strip() or None
+    
+    def get_concurrency_stats(self) -> Dict[str, int]:
+        """Current LLM concurrency usage."""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "shared_turns": len(self._in_flight),
+            "coalesced": self.coalesced,
+        }
     
     def _build_agent(self) -> StateGraph:
-        """Build LangGraph agent for chat completion."""
+        """Build LangGraph agent for chat completion, checkpointed per session."""
+        
+        async def retrieve_node(state: ChatState, config: RunnableConfig):
+            """Node that selects the portfolio chunks relevant to the new question."""
+            messages = state["messages"]
+            previous = next((message_text(m) for m in reversed(messages[:-1]) if m.type == "human"), "")
+            context = await knowledge_service.retrieve(
+                config["configurable"].get("language", "en"),
+                message_text(messages[-1]),
+                fallback_question=previous,
+            )
+            return {"context": context}
         
-        def chat_node(state: ChatState):
+        async def chat_node(state: ChatState, config: RunnableConfig):
             """Node that handles chat completion."""
-            messages = state.get("messages", [])
+            messages = state["messages"]
+            summary = state.get("summary") or ""
             
-            # Add system message if not already present
-            if not messages or not isinstance(messages[0], SystemMessage):
-                system_msg = SystemMessage(content=self.system_prompt)
-                messages = [system_msg] + messages
+            # Drop messages already folded into the summary
+            removed = []
+            summary_through = state.get("summary_through")
+            if summary_through:
+                for index, message in enumerate(messages):
+                    if message.id == summary_through:
+                        removed, messages = messages[:index + 1], messages[index + 1:]
+                        break
+            
+            # Recent history within the token budget, plus the new user message
+            window, overflow, dropped, tokens = self.history.build_context(summary, messages[:-1])
+            chat_history_tokens.observe(tokens)
+            removed.extend(dropped)
+            prompt = [self._system_message_for(summary, state.get("context") or ""), *window, messages[-1]]
             
             # Get response from LLM
-            response = self.llm.invoke(messages)
+            response = await self._call_llm(prompt)
+            
+            if overflow:
+                self._schedule_summary(config["configurable"]["thread_id"], summary, overflow)
             
             # Return AI response to be added to messages (reducer will accumulate)
-            return {"messages": [response]}
+            return {"messages": [RemoveMessage(id=message.id) for message in removed] + [response]}
         
         # Create the graph
         workflow = StateGraph(ChatState)
         
-        # Add the chat node
+        # Add the chat node, preceded by retrieval of portfolio context
         workflow.add_node("chat", chat_node)
-        
-        # Set entry point
-        workflow.set_entry_point("chat")
+        if settings.ai_retrieval_enabled:
+            workflow.add_node("retrieve", retrieve_node)
+            workflow.set_entry_point("retrieve")
+            workflow.add_edge("retrieve", "chat")
+        else:
+            workflow.set_entry_point("chat")
         
         # Connect to END
         workflow.add_edge("chat", END)
         
         # Compile the graph
-        return workflow.compile()
+        return workflow.compile(checkpointer=self.checkpointer)
+    
+    def _system_message_for(self, summary: str, context: str = "") -> SystemMessage:
+        """System prompt, extended with the turn's retrieved context and the rolling summary."""
+        if not summary and not context:
+            return self.system_message
+        parts = [self.system_prompt]
+        if context:
+            parts.append(f"{CONTEXT_HEADER}\n{context}")
+        if summary:
+            parts.append(f"Summary of the earlier conversation:\n{summary}")
+        return SystemMessage(content="\n\n".join(parts))
+    
+    def _schedule_summary(self, session_id: str, previous_summary: str, overflow: List[BaseMessage]):
+        """Start a background summary refresh unless one is already running for the session."""
+        if self.history.summarizer is None or session_id in self._summary_tasks:
+            return
+        # Fresh context: a task copies the current one, which inside a graph node carries
+        # LangGraph's run callbacks, and would stream the summary's tokens into the reply
+        task = asyncio.create_task(
+            self._refresh_summary(session_id, previous_summary, overflow),
+            context=contextvars.Context(),
+        )
+        self._summary_tasks[session_id] = task
+        task.add_done_callback(lambda _: self._summary_tasks.pop(session_id, None))
+    
+    async def _refresh_summary(self, session_id: str, previous_summary: str, overflow: List[BaseMessage]):
+        """Fold overflow messages into the rolling summary, applied with the session's next turn."""
+        try:
+            summary = await self.history.summarize(previous_summary, overflow)
+        except Exception as e:
+            summary = None
+            logger.error("history_summary_failed", session_id=session_id, error=str(e), exc_info=True)
+        if summary is None:
+            chat_history_summaries_total.labels("failed").inc()
+            return
+        # Applied as part of the next turn's input so it never races a running turn
+        self._pending_summaries[session_id] = {"summary": summary, "summary_through": overflow[-1].id}
+        chat_history_summaries_total.labels("updated").inc()
+        logger.info("history_summary_updated", session_id=session_id, folded_messages=len(overflow))
+    
+    async def _prepare_turn(self, user_message: str, session_id: Optional[str], language: str):
+        """
+        Thread config, graph input and cache key for one turn.
+        
+        Only the new message is sent; earlier turns come from the checkpoint.
+        Opening questions, whose answer does not depend on earlier context,
+        get a cache key: their responses are cached, and identical ones in
+        flight at the same time share a single LLM call.
+        """
+        config = {"configurable": {"thread_id": session_id or f"oneoff-{uuid.uuid4()}", "language": language}}
+        graph_input = {"messages": [HumanMessage(content=user_message)]}
+        if session_id:
+            graph_input.update(self._pending_summaries.pop(session_id, {}))
+        
+        cache_key = None
+        if not session_id or not (await self.agent.aget_state(config)).values.get("messages"):
+            cache_key = response_cache.make_key(language, self.model_name, user_message)
+        return config, graph_input, cache_key
+    
+    def _join_turn(
+        self,
+        cache_key: str,
+        graph_input: Dict,
+        config: Dict,
+        session_id: Optional[str],
+        streaming: bool,
+    ) -> Tuple["SharedTurn", bool]:
+        """
+        Attach to the in-flight turn for cache_key, or start one.
+        
+        Returns (turn, is_leader). The turn runs in its own task, so a
+        disconnecting client (leader included) never cancels it for the others.
+        """
+        turn = self._in_flight.get(cache_key)
+        if turn is not None:
+            self.coalesced += 1
+            ai_requests_coalesced_total.inc()
+            return turn, False
+        
+        turn = SharedTurn()
+        turn.task = asyncio.create_task(
+            self._run_shared_turn(turn, cache_key, graph_input, config, session_id, streaming)
+        )
+        # Retrieve the outcome even if every waiter has gone, so failures are not reported as unhandled
+        turn.task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        self._in_flight[cache_key] = turn
+        return turn, True
+    
+    async def _run_shared_turn(
+        self,
+        turn: "SharedTurn",
+        cache_key: str,
+        graph_input: Dict,
+        config: Dict,
+        session_id: Optional[str],
+        streaming: bool,
+    ) -> str:
+        """Run the leader's turn through the graph, publishing output to every waiter."""
+        try:
+            if streaming:
+                # stream_mode="messages" surfaces LLM token chunks from inside graph nodes
+                async for chunk, metadata in self.agent.astream(graph_input, config, stream_mode="messages"):
+                    if metadata.get("langgraph_node") != "chat":
+                        continue
+                    text = self._message_text(chunk)
+                    if text:
+                        turn.push(text)
+                ai_response = "".join(turn.parts).strip()
+            else:
+                result = await self.agent.ainvoke(graph_input, config)
+                ai_response = self._message_text(result["messages"][-1]).strip() if result.get("messages") else ""
+                if ai_response:
+                    turn.push(ai_response)
+            
+            if ai_response:
+                response_cache.set(cache_key, ai_response)
+            turn.finish()
+            return ai_response
+        except BaseException as e:
+            turn.finish(e)
+            raise
+        finally:
+            if self._in_flight.get(cache_key) is turn:
+                del self._in_flight[cache_key]
+            if not session_id:
+                await self.checkpointer.adelete_thread(config["configurable"]["thread_id"])
+    
+    async def _record_cached_turn(self, config: Dict, user_message: str, response: str):
+        """Append a cache-served exchange to the session's conversation state."""
+        await self.agent.aupdate_state(
+            config,
+            {"messages": [HumanMessage(content=user_message), AIMessage(content=response)]},
+            as_node="chat",
+        )
     
     async def get_chat_response(
         self,
         user_message: str,
-        conversation_history: Optional[List[Dict[str, str]]] = None,
+        session_id: Optional[str] = None,
         language: str = "en",
     ) -> str:
         """
@@ -121,59 +497,45 @@ class AIService:
         
         Args:
             user_message: User's message
-            conversation_history: Previous messages in conversation
+            session_id: Chat session whose conversation state to continue
+                (None for a one-off exchange without history)
             language: Language preference (en/ar)
             
         Returns:
             AI response message
         """
         if not self.agent or not self.llm:
-            return "I'm sorry, the AI service is not currently available. Please try again later or use the contact form."
+            return SERVICE_UNAVAILABLE_MESSAGE
         
         try:
-            # Convert conversation history to LangChain messages
-            messages = []
-            
-            # Add conversation history if available
-            if conversation_history:
-                for msg in conversation_history:
-                    role = msg.get("role", "user")
-                    content = msg.get("content", "")
-                    if role == "user":
-                        messages.append(HumanMessage(content=content))
-                    elif role == "assistant":
-                        messages.append(AIMessage(content=content))
-            
-            # Add current user message
-            messages.append(HumanMessage(content=user_message))
-            
-            # Prepare state for LangGraph
-            initial_state = {"messages": messages}
-            
-            # Run the agent asynchronously
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None,
-                lambda: self.agent.invoke(initial_state)
-            )
+            config, graph_input, cache_key = await self._prepare_turn(user_message, session_id, language)
             
-            # Extract the AI response (last message should be from AI)
-            if result and "messages" in result and len(result["messages"]) > 0:
-                # Get the last message which should be the AI response
-                last_message = result["messages"][-1]
-                if hasattr(last_message, 'content'):
-                    ai_response = last_message.content.strip()
-                elif isinstance(last_message, dict) and 'content' in last_message:
-                    ai_response = last_message['content'].strip()
-                else:
-                    ai_response = str(last_message).strip()
+            if cache_key is None:
+                # Run the agent natively async; prior turns are loaded from the checkpoint
+                result = await self.agent.ainvoke(graph_input, config)
+                ai_response = self._message_text(result["messages"][-1]).strip() if result.get("messages") else ""
             else:
-                ai_response = "I'm sorry, I didn't receive a valid response."
+                # Serve repeated questions without invoking the LLM
+                cached = response_cache.get(cache_key)
+                if cached is not None:
+                    logger.info("ai_response_cache_hit", model=self.model_name)
+                    if session_id:
+                        await self._record_cached_turn(config, user_message, cached)
+                    return cached
+                
+                # Identical questions in flight share one LLM call
+                turn, is_leader = self._join_turn(cache_key, graph_input, config, session_id, streaming=False)
+                ai_response = await asyncio.shield(turn.task)
+                if not is_leader and session_id and ai_response:
+                    await self._record_cached_turn(config, user_message, ai_response)
+            
+            if not ai_response:
+                return "I'm sorry, I didn't receive a valid response."
             
             logger.info(
                 "ai_response_generated",
                 model=self.model_name,
-                has_history=conversation_history is not None and len(conversation_history) > 0,
+                has_session=session_id is not None,
             )
             
             return ai_response
@@ -185,11 +547,110 @@ class AIService:
                 error_type=type(e).__name__,
                 exc_info=True,
             )
-            return "I'm sorry, I encountered an error processing your message. Please try again later."
+            return SERVICE_ERROR_MESSAGE
+    
+    async def stream_chat_response(
+        self,
+        user_message: str,
+        session_id: Optional[str] = None,
+        language: str = "en",
+    ) -> AsyncIterator[str]:
+        """
+        Stream AI response tokens as the LLM produces them.
+        
+        Args:
+            user_message: User's message
+            session_id: Chat session whose conversation state to continue
+                (None for a one-off exchange without history)
+            language: Language preference (en/ar)
+            
+        Yields:
+            Text fragments of the AI response, in order
+        """
+        if not self.agent or not self.llm:
+            yield SERVICE_UNAVAILABLE_MESSAGE
+            return
+        
+        parts = []
+        
+        try:
+            config, graph_input, cache_key = await self._prepare_turn(user_message, session_id, language)
+            
+            if cache_key is None:
+                # stream_mode="messages" surfaces LLM token chunks from inside graph nodes
+                async for chunk, metadata in self.agent.astream(
+                    graph_input,
+                    config,
+                    stream_mode="messages",
+                ):
+                    if metadata.get("langgraph_node") != "chat":
+                        continue
+                    text = self._message_text(chunk)
+                    if text:
+                        parts.append(text)
+                        yield text
+            else:
+                cached = response_cache.get(cache_key)
+                if cached is not None:
+                    logger.info("ai_response_cache_hit", model=self.model_name, streamed=True)
+                    if session_id:
+                        await self._record_cached_turn(config, user_message, cached)
+                    yield cached
+                    return
+                
+                # Identical questions in flight share one LLM call; each waiter replays its tokens
+                turn, is_leader = self._join_turn(cache_key, graph_input, config, session_id, streaming=True)
+                async for text in turn.stream():
+                    parts.append(text)
+                    yield text
+                ai_response = "".join(parts).strip()
+                if not is_leader and session_id and ai_response:
+                    await self._record_cached_turn(config, user_message, ai_response)
+            
+            logger.info(
+                "ai_response_streamed",
+                model=self.model_name,
+                has_session=session_id is not None,
+            )
+        except Exception as e:
+            logger.error(
+                "ai_stream_failed",
+                error=str(e),
+                error_type=type(e).__name__,
+                exc_info=True,
+            )
+            if not parts:
+                yield SERVICE_ERROR_MESSAGE
+    
+    @staticmethod
+    def _message_text(message) -> str:
+        """Extract plain text from a message or message chunk."""
+        content = getattr(message, "content", message)
+        if isinstance(content, str):
+            return content
+        if isinstance(content, list):
+            # Multi-part content: keep only text parts
+            return "".join(
+                part if isinstance(part, str) else part.get("text", "")
+                for part in content
+                if isinstance(part, (str, dict))
+            )
+        return str(content) if content is not None else ""
     
-    def format_message_for_history(self, role: str, content: str) -> Dict[str, str]:
-        """Format message for conversation history."""
-        return {"role": role, "content": content}
+    async def get_conversation(self, session_id: str) -> List[Dict[str, str]]:
+        """
+        Messages of a session's conversation state, oldest first.
+        
+        This is the state the LLM continues from; turns already folded into
+        the rolling summary are no longer included.
+        """
+        if not self.agent:
+            return []
+        state = await self.agent.aget_state({"configurable": {"thread_id": session_id}})
+        return [
+            {"role": "user" if message.type == "human" else "assistant", "content": message_text(message)}
+            for message in state.values.get("messages", [])
+        ]
 
 
 # Global AI service instance
@@ -0,0 +1,170 @@
+"""
+Blog post rendering service.
+Renders data/blogs/*.md (frontmatter, markdown, table of contents) on the
+server and caches the result in memory until the source files change.
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import os
+import re
+import structlog
+import markdown
+from markdown.extensions import Extension
+from markdown.extensions.toc import slugify_unicode
+from markdown.treeprocessors import Treeprocessor
+
+from services.content_service import content_service, get_content_dir
+
+logger = structlog.get_logger()
+
+SLUG_PATTERN = re.compile(r"^[a-z0-9][a-z0-9-]{0,100}$")
+FRONTMATTER_PATTERN = re.compile(r"^---\s*\n(.*?)\n---\s*\n(.*)$", re.DOTALL)
+
+# Classes the blog page styles rendered elements with (previously added by the marked.js renderer)
+HEADING_CLASS = "scroll-mt-24"
+PRE_CLASS = "bg-gray-100 dark:bg-gray-900 rounded-lg p-4 overflow-x-auto"
+BLOCKQUOTE_CLASS = "border-l-4 border-blue-500 pl-4 italic my-4 text-gray-700 dark:text-gray-300"
+LINK_CLASS = "text-blue-600 dark:text-blue-400 hover:underline"
+
+
+def parse_frontmatter(text: str) -> Tuple[Dict[str, str], str]:
+    """Split "key: value" frontmatter from the markdown body."""
+    match = FRONTMATTER_PATTERN.match(text)
+    if not match:
+        return {}, text
+    frontmatter = {}
+    for line in match.group(1).splitlines():
+        key, sep, value = line.partition(":")
+        if sep and key.strip():
+            frontmatter[key.strip()] = value.strip().strip("\"'")
+    return frontmatter, match.group(2)
+
+
+class _BlogStyleProcessor(Treeprocessor):
+    def run(self, root):
+        for element in root.iter():
+            if element.tag in ("h1", "h2", "h3", "h4", "h5", "h6"):
+                element.set("class", HEADING_CLASS)
+            elif element.tag == "blockquote":
+                element.set("class", BLOCKQUOTE_CLASS)
+            elif element.tag == "a":
+                element.set("class", LINK_CLASS)
+                if element.get("href", "").startswith("http"):
+                    element.set("target", "_blank")
+                    element.set("rel", "noopener noreferrer")
+
+
+class _BlogStyleExtension(Extension):
+    def extendMarkdown(self, md):
+        # After the toc extension (priority 5) has assigned heading IDs
+        md.treeprocessors.register(_BlogStyleProcessor(md), "blog_style", 1)
+
+
+def _flatten_toc(tokens: List[Dict], out: Optional[List[Dict]] = None) -> List[Dict]:
+    out = [] if out is None else out
+    for token in tokens:
+        out.append({"id": token["id"], "text": token["name"], "level": token["level"]})
+        _flatten_toc(token["children"], out)
+    return out
+
+
+def render_markdown(text: str) -> Tuple[str, List[Dict]]:
+    """Render markdown to HTML; returns (html, flat table of contents)."""
+    md = markdown.Markdown(
+        extensions=["extra", "sane_lists", "nl2br", "toc", _BlogStyleExtension()],
+        # Unicode slugs keep Arabic headings linkable
+        extension_configs={"toc": {"slugify": slugify_unicode}},
+    )
+    # Fenced code blocks bypass the element tree, so their <pre> is styled here
+    html = md.convert(text).replace("<pre><code", f'<pre class="{PRE_CLASS}"><code')
+    return html, _flatten_toc(md.toc_tokens)
+
+
+@dataclass
+class RenderedPost:
+    """A rendered post and the source versions it was built from."""
+    versions: Tuple
+    data: Dict
+    etag: str
+
+
+class BlogService:
+    """Renders blog posts and caches them by source file mtime."""
+
+    def __init__(self, content_dir: Optional[str] = None):
+        self.content_dir = content_dir or get_content_dir()
+        self._cache: Dict[Tuple[str, str], RenderedPost] = {}
+
+    def _post_path(self, slug: str, lang: str) -> Optional[str]:
+        """Language-specific file first (slug.ar.md), then the shared one (slug.md)."""
+        blogs_dir = os.path.join(self.content_dir, "blogs")
+        for name in (f"{slug}.{lang}.md", f"{slug}.md"):
+            path = os.path.join(blogs_dir, name)
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def _content_path(self, lang: str) -> str:
+        return os.path.join(self.content_dir, f"content.{lang}.json")
+
+    @staticmethod
+    def _mtime(path: str) -> int:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _blog_entry(lang: str, slug: str) -> Dict:
+        """The post's entry in the blog section of content.{lang}.json, if any."""
+        for entry in content_service.get_data(lang).get("blog", []):
+            if (entry.get("slug") or entry.get("link", "").partition("?slug=")[2]) == slug:
+                return entry
+        return {}
+
+    def _render(self, slug: str, lang: str, path: str, versions: Tuple) -> RenderedPost:
+        with open(path, "r", encoding="utf-8") as f:
+            frontmatter, body = parse_frontmatter(f.read())
+        entry = self._blog_entry(lang, slug)
+        html, toc = render_markdown(body)
+        data = {
+            "slug": slug,
+            "lang": lang,
+            # Frontmatter takes precedence over the content file's blog entry
+            "title": frontmatter.get("title") or entry.get("title") or "Untitled",
+            "date": frontmatter.get("date") or entry.get("date") or "",
+            "image": frontmatter.get("image") or entry.get("image") or "",
+            "excerpt": frontmatter.get("excerpt") or frontmatter.get("description") or entry.get("excerpt") or "",
+            "html": html,
+            "toc": toc,
+        }
+        digest = hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()[:32]
+        logger.info("blog_post_rendered", slug=slug, lang=lang, toc_entries=len(toc))
+        return RenderedPost(versions=versions, data=data, etag=f'"{digest}"')
+
+    async def get_post(self, slug: str, lang: str) -> Optional[RenderedPost]:
+        """
+        Rendered post for slug and language, or None if there is no such post.
+
+        Each call only stats the source files; the markdown is re-rendered
+        (off the event loop) when the post or content file has changed.
+        """
+        if not SLUG_PATTERN.match(slug):
+            return None
+        path = self._post_path(slug, lang)
+        if path is None:
+            return None
+        versions = (path, self._mtime(path), self._mtime(self._content_path(lang)))
+        cached = self._cache.get((slug, lang))
+        if cached and cached.versions == versions:
+            return cached
+        post = await asyncio.to_thread(self._render, slug, lang, path, versions)
+        self._cache[(slug, lang)] = post
+        return post
+
+
+# Global blog service instance
+blog_service = BlogService()
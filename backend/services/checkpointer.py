@@ -0,0 +1,133 @@
+"""
+LangGraph checkpointers for conversation state.
+Chat state is keyed by session ID (the graph's thread ID). Only the latest
+checkpoint of each thread is kept: conversations never resume from an
+earlier step, and keeping every step would grow memory with each turn.
+"""
+from typing import Any, Dict, Tuple
+import structlog
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import BaseCheckpointSaver, ChannelVersions, Checkpoint, CheckpointMetadata
+from langgraph.checkpoint.memory import InMemorySaver
+
+from config import settings
+
+logger = structlog.get_logger()
+
+
+class LatestInMemorySaver(InMemorySaver):
+    """In-memory checkpointer that drops superseded checkpoints, writes and channel blobs."""
+
+    def __init__(self):
+        super().__init__()
+        # (thread_id, checkpoint_ns) -> channel versions of the latest checkpoint
+        self._latest_versions: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        result = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        for checkpoint_id in [cid for cid in checkpoints if cid != checkpoint["id"]]:
+            del checkpoints[checkpoint_id]
+            self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+
+        versions = dict(checkpoint["channel_versions"])
+        previous = self._latest_versions.get((thread_id, checkpoint_ns), {})
+        for channel, version in previous.items():
+            if versions.get(channel) != version:
+                self.blobs.pop((thread_id, checkpoint_ns, channel, version), None)
+        self._latest_versions[(thread_id, checkpoint_ns)] = versions
+        return result
+
+    def delete_thread(self, thread_id: str) -> None:
+        # Only this thread's keys are visited (the base class scans all threads)
+        for checkpoint_ns, checkpoints in self.storage.pop(thread_id, {}).items():
+            for checkpoint_id in checkpoints:
+                self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+            for channel, version in self._latest_versions.pop((thread_id, checkpoint_ns), {}).items():
+                self.blobs.pop((thread_id, checkpoint_ns, channel, version), None)
+
+
+def _latest_sqlite_saver_class():
+    """AsyncSqliteSaver subclass that deletes superseded checkpoints (optional dependency)."""
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+    class LatestAsyncSqliteSaver(AsyncSqliteSaver):
+        async def aput(
+            self,
+            config: RunnableConfig,
+            checkpoint: Checkpoint,
+            metadata: CheckpointMetadata,
+            new_versions: ChannelVersions,
+        ) -> RunnableConfig:
+            result = await super().aput(config, checkpoint, metadata, new_versions)
+            key = (str(config["configurable"]["thread_id"]), config["configurable"]["checkpoint_ns"], checkpoint["id"])
+            # Checkpoint IDs are time-ordered, so older ones sort first
+            async with self.lock, self.conn.cursor() as cur:
+                await cur.execute(
+                    "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < ?",
+                    key,
+                )
+                await cur.execute(
+                    "DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < ?",
+                    key,
+                )
+                await self.conn.commit()
+            return result
+
+    return LatestAsyncSqliteSaver
+
+
+def check_checkpointer_settings():
+    """
+    Refuse a per-process checkpointer with shared sessions.
+
+    With SESSION_STORE=sql, a turn may land on any worker, and only the worker
+    that sweeps an expired session deletes its conversation; in-memory
+    checkpoints would miss history on other workers and never be freed there.
+    """
+    if settings.session_store == "sql" and settings.ai_checkpointer_backend == "memory":
+        raise RuntimeError("SESSION_STORE=sql requires AI_CHECKPOINTER=sqlite (or unset)")
+
+
+async def create_checkpointer() -> BaseCheckpointSaver:
+    """
+    Build the checkpointer selected by settings.
+
+    "sqlite" requires the langgraph-checkpoint-sqlite package and falls back
+    to memory when it is not installed, unless sessions are shared (SESSION_STORE=sql).
+    """
+    check_checkpointer_settings()
+    if settings.ai_checkpointer_backend == "sqlite":
+        try:
+            import aiosqlite
+
+            saver_class = _latest_sqlite_saver_class()
+        except ImportError:
+            if settings.session_store == "sql":
+                raise RuntimeError(
+                    "SESSION_STORE=sql needs the sqlite checkpointer: install langgraph-checkpoint-sqlite"
+                )
+            logger.warning("sqlite_checkpointer_unavailable", fallback="memory")
+        else:
+            conn = await aiosqlite.connect(settings.ai_checkpoint_sqlite_path)
+            saver = saver_class(conn)
+            await saver.setup()
+            logger.info("checkpointer_ready", backend="sqlite", path=settings.ai_checkpoint_sqlite_path)
+            return saver
+    return LatestInMemorySaver()
+
+
+async def close_checkpointer(checkpointer: BaseCheckpointSaver):
+    """Release the checkpointer's connection, if it has one."""
+    conn = getattr(checkpointer, "conn", None)
+    if conn is not None:
+        await conn.close()
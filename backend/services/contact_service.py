@@ -0,0 +1,239 @@
+"""
+Contact submission pipeline.
+The route enqueues submissions into a bounded in-process queue and returns
+immediately; background workers drain it in batches, persist each batch
+with one multi-row insert and deliver submissions to an optional webhook.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional
+import asyncio
+import httpx
+import structlog
+from sqlalchemy import insert
+
+from config import settings
+from models.tables import contact_submissions
+from utils.metrics import contact_submissions_total
+
+logger = structlog.get_logger()
+
+
+class ContactPipeline:
+    """Bounded queue of contact submissions with batched persistence and webhook delivery."""
+
+    def __init__(
+        self,
+        max_queue_size: int = 1000,
+        workers: int = 2,
+        batch_size: int = 50,
+        batch_linger: float = 0.5,
+        persist: bool = True,
+        database_url: str = "",
+        store_max_retries: int = 3,
+        webhook_url: str = "",
+        webhook_timeout: float = 10.0,
+        webhook_max_retries: int = 3,
+        webhook_concurrency: int = 5,
+    ):
+        self.max_queue_size = max_queue_size
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_linger = batch_linger
+        self.persist = persist
+        self.database_url = database_url
+        self.store_max_retries = store_max_retries
+        self.webhook_url = webhook_url
+        self.webhook_timeout = webhook_timeout
+        self.webhook_max_retries = webhook_max_retries
+        self.webhook_concurrency = webhook_concurrency
+
+        self.queue: "asyncio.Queue[Dict]" = asyncio.Queue(maxsize=max_queue_size)
+        self._tasks: List[asyncio.Task] = []
+        self._client: Optional[httpx.AsyncClient] = None
+        self._webhook_slots = asyncio.Semaphore(webhook_concurrency)
+        self._engine = None
+
+    def _ensure_workers(self):
+        """Start the worker tasks if they are not running."""
+        self._tasks = [task for task in self._tasks if not task.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    async def start(self):
+        """Start workers (called on application startup)."""
+        self._ensure_workers()
+
+    async def close(self, timeout: float = 10.0):
+        """Drain the queue, then stop workers and close the HTTP client."""
+        if self._tasks:
+            try:
+                await asyncio.wait_for(self.queue.join(), timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.warning("contact_queue_not_drained", pending=self.queue.qsize())
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._tasks = []
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def enqueue(self, submission: Dict) -> bool:
+        """Queue a submission; returns False when the queue is full."""
+        self._ensure_workers()
+        try:
+            self.queue.put_nowait(submission)
+        except asyncio.QueueFull:
+            contact_submissions_total.labels("rejected").inc()
+            return False
+        contact_submissions_total.labels("queued").inc()
+        return True
+
+    async def _next_batch(self) -> List[Dict]:
+        """Wait for one submission, then collect more for up to batch_linger seconds."""
+        batch = [await self.queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.batch_linger
+        while len(batch) < self.batch_size:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _worker(self):
+        while True:
+            batch = await self._next_batch()
+            try:
+                if self.persist:
+                    await self._store(batch)
+                if self.webhook_url:
+                    await asyncio.gather(*(self._deliver(submission) for submission in batch))
+            except Exception as e:
+                # One bad batch must not stop the worker and strand the rest of the queue
+                logger.error(
+                    "contact_batch_failed",
+                    batch_size=len(batch),
+                    error=str(e),
+                    error_type=type(e).__name__,
+                    exc_info=True,
+                )
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    async def _store(self, batch: List[Dict]):
+        """Persist a batch, retrying with exponential backoff; dropped only after the last attempt."""
+        for attempt in range(self.store_max_retries + 1):
+            try:
+                await self._persist(batch)
+                return
+            except Exception as e:
+                error = e
+                logger.warning(
+                    "contact_batch_store_retry",
+                    batch_size=len(batch),
+                    attempt=attempt + 1,
+                    error=str(e),
+                    error_type=type(e).__name__,
+                )
+            if attempt < self.store_max_retries:
+                await asyncio.sleep(min(2 ** attempt * 0.5, 30.0))
+
+        contact_submissions_total.labels("store_failed").inc(len(batch))
+        logger.error(
+            "contact_batch_store_failed",
+            batch_size=len(batch),
+            attempts=self.store_max_retries + 1,
+            error=str(error),
+            error_type=type(error).__name__,
+            exc_info=error,
+        )
+
+    async def _persist(self, batch: List[Dict]):
+        """Insert a batch of submissions in one statement."""
+        from services.database import get_engine, init_models
+
+        if self._engine is None:
+            engine = get_engine(self.database_url)
+            await init_models(engine)
+            self._engine = engine
+        async with self._engine.begin() as conn:
+            await conn.execute(insert(contact_submissions), batch)
+        contact_submissions_total.labels("stored").inc(len(batch))
+        logger.info("contact_batch_stored", batch_size=len(batch))
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Shared HTTP client so webhook calls reuse pooled connections."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.webhook_timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=self.webhook_concurrency,
+                    max_keepalive_connections=self.webhook_concurrency,
+                ),
+            )
+        return self._client
+
+    async def _deliver(self, submission: Dict):
+        """POST one submission to the webhook, retrying with exponential backoff."""
+        payload = {**submission, "submitted_at": submission["submitted_at"].isoformat()}
+        async with self._webhook_slots:
+            for attempt in range(self.webhook_max_retries + 1):
+                try:
+                    response = await self._get_client().post(self.webhook_url, json=payload)
+                    if response.is_success:
+                        contact_submissions_total.labels("delivered").inc()
+                        return
+                    # Retry server errors and throttling; other 4xx will not succeed later
+                    if response.is_client_error and response.status_code != 429:
+                        contact_submissions_total.labels("undeliverable").inc()
+                        logger.error("contact_webhook_rejected", status_code=response.status_code)
+                        return
+                    error = f"HTTP {response.status_code}"
+                except httpx.HTTPError as e:
+                    error = f"{type(e).__name__}: {e}"
+
+                if attempt < self.webhook_max_retries:
+                    await asyncio.sleep(min(2 ** attempt * 0.5, 30.0))
+
+        contact_submissions_total.labels("undeliverable").inc()
+        logger.error(
+            "contact_webhook_failed",
+            attempts=self.webhook_max_retries + 1,
+            error=error,
+        )
+
+    def get_queue_depth(self) -> int:
+        """Submissions waiting to be processed."""
+        return self.queue.qsize()
+
+
+def build_submission(name: str, email: str, subject: str, message: str, client_ip: Optional[str]) -> Dict:
+    """Row for the contact_submissions table."""
+    return {
+        "name": name,
+        "email": email,
+        "subject": subject,
+        "message": message,
+        "client_ip": client_ip,
+        "submitted_at": datetime.now(),
+    }
+
+
+# Global contact pipeline instance
+contact_pipeline = ContactPipeline(
+    max_queue_size=settings.contact_queue_size,
+    workers=settings.contact_workers,
+    batch_size=settings.contact_batch_size,
+    batch_linger=settings.contact_batch_linger_ms / 1000,
+    persist=settings.contact_persist_enabled,
+    database_url=settings.database_url,
+    store_max_retries=settings.contact_store_max_retries,
+    webhook_url=settings.contact_webhook_url,
+    webhook_timeout=settings.contact_webhook_timeout_seconds,
+    webhook_max_retries=settings.contact_webhook_max_retries,
+)
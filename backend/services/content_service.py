@@ -0,0 +1,131 @@
+"""
+Site content service.
+Serves data/content.{lang}.json from memory: each file is parsed once per
+change, and every requested slice is serialized, hashed and compressed
+once, so repeat requests cost a stat() and a dict lookup.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import os
+import structlog
+
+from config import settings
+from utils.compression import SUPPORTED_ENCODINGS, compress
+
+logger = structlog.get_logger()
+
+SUPPORTED_LANGUAGES = ("en", "ar")
+
+
+def get_content_dir() -> str:
+    """Site data directory (content.{lang}.json, blogs/)."""
+    return settings.content_dir or os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+        "data",
+    )
+
+
+class UnknownSection(KeyError):
+    """A requested section is not in the content document."""
+
+
+@dataclass
+class ContentBody:
+    """One serialized representation (whole document or a slice) with its validators."""
+    body: bytes
+    etag: str
+    # encoding -> compressed body, filled on first request for that encoding
+    encoded: Dict[str, bytes] = field(default_factory=dict)
+
+    def encode(self, encoding: str) -> bytes:
+        data = self.encoded.get(encoding)
+        if data is None:
+            data = self.encoded[encoding] = compress(self.body, encoding, level=9)
+        return data
+
+
+@dataclass
+class ContentDocument:
+    """Parsed content file and the bodies served from it."""
+    version: Tuple[int, int]
+    data: Dict
+    bodies: Dict[Tuple[str, ...], ContentBody] = field(default_factory=dict)
+
+
+class ContentService:
+    """Caches parsed content documents by file mtime and size."""
+
+    def __init__(self, content_dir: Optional[str] = None):
+        self.content_dir = content_dir or get_content_dir()
+        self._documents: Dict[str, ContentDocument] = {}
+
+    def _path(self, lang: str) -> str:
+        return os.path.join(self.content_dir, f"content.{lang}.json")
+
+    def get_document(self, lang: str) -> Optional[ContentDocument]:
+        """Parsed content for a language (re-read when the file changes), or None if missing/invalid."""
+        try:
+            stat = os.stat(self._path(lang))
+        except OSError:
+            return None
+        version = (stat.st_mtime_ns, stat.st_size)
+        document = self._documents.get(lang)
+        if document and document.version == version:
+            return document
+        try:
+            with open(self._path(lang), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error("content_load_failed", lang=lang, error=str(e))
+            return None
+        document = self._documents[lang] = ContentDocument(version=version, data=data)
+        logger.info("content_loaded", lang=lang, sections=len(data))
+        return document
+
+    def get_data(self, lang: str) -> Dict:
+        """Parsed content dictionary for a language (empty if unavailable)."""
+        document = self.get_document(lang)
+        return document.data if document else {}
+
+    def _build_body(self, document: ContentDocument, sections: Tuple[str, ...]) -> ContentBody:
+        data = document.data
+        if sections:
+            missing = [name for name in sections if name not in data]
+            if missing:
+                raise UnknownSection(", ".join(missing))
+            data = {name: data[name] for name in sections}
+        body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        content = ContentBody(body=body, etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+        # Precompress the preferred encoding now; others are compressed on first use
+        content.encode(SUPPORTED_ENCODINGS[0])
+        return content
+
+    async def get_body(self, lang: str, sections: Tuple[str, ...] = ()) -> Optional[ContentBody]:
+        """
+        Serialized content for a language, optionally limited to top-level sections.
+
+        Returns None when the content file is missing; raises UnknownSection
+        for sections the document does not have.
+        """
+        document = self._documents.get(lang)
+        try:
+            version = os.stat(self._path(lang))
+        except OSError:
+            return None
+        if document is None or document.version != (version.st_mtime_ns, version.st_size):
+            # Changed or not loaded yet: parse off the event loop
+            document = await asyncio.to_thread(self.get_document, lang)
+            if document is None:
+                return None
+        key = tuple(sorted(set(sections)))
+        body = document.bodies.get(key)
+        if body is None:
+            body = document.bodies[key] = await asyncio.to_thread(self._build_body, document, key)
+        return body
+
+
+# Global content service instance
+content_service = ContentService()
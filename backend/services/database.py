@@ -0,0 +1,73 @@
+"""
+Async database engine management.
+Normalizes DATABASE_URL to an async driver and shares one engine per URL.
+"""
+from typing import Dict
+import asyncio
+import structlog
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from config import settings
+from models.tables import metadata
+
+logger = structlog.get_logger()
+
+DEFAULT_SQLITE_URL = "sqlite+aiosqlite:///./portfolio.db"
+
+# Sync driver prefixes mapped to their async counterparts
+_ASYNC_DRIVERS = {
+    "sqlite://": "sqlite+aiosqlite://",
+    "postgresql://": "postgresql+asyncpg://",
+    "postgresql+psycopg2://": "postgresql+asyncpg://",
+    "postgres://": "postgresql+asyncpg://",
+}
+
+_engines: Dict[str, AsyncEngine] = {}
+_initialized: set = set()
+_init_lock = asyncio.Lock()
+
+
+def to_async_url(url: str) -> str:
+    """Return an async-driver URL for the given database URL."""
+    if not url:
+        return DEFAULT_SQLITE_URL
+    for prefix, async_prefix in _ASYNC_DRIVERS.items():
+        if url.startswith(prefix):
+            return async_prefix + url[len(prefix):]
+    return url
+
+
+def get_engine(url: str = "") -> AsyncEngine:
+    """Get (or create) the shared async engine for a database URL."""
+    async_url = to_async_url(url or settings.database_url)
+    engine = _engines.get(async_url)
+    if engine is None:
+        engine = create_async_engine(async_url, pool_pre_ping=True)
+        _engines[async_url] = engine
+        logger.info("database_engine_created", dialect=engine.dialect.name)
+    return engine
+
+
+async def init_models(engine: AsyncEngine):
+    """Create tables on first use of an engine."""
+    key = str(engine.url)
+    if key in _initialized:
+        return
+    # Concurrent first users (e.g. background workers) must not both run DDL
+    async with _init_lock:
+        if key in _initialized:
+            return
+        async with engine.begin() as conn:
+            if engine.dialect.name == "sqlite":
+                # WAL lets readers proceed while a worker is writing
+                await conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+            await conn.run_sync(metadata.create_all)
+        _initialized.add(key)
+
+
+async def dispose_engines():
+    """Dispose all engines (application shutdown)."""
+    for engine in _engines.values():
+        await engine.dispose()
+    _engines.clear()
+    _initialized.clear()
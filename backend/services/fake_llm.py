@@ -0,0 +1,124 @@
+"""
+Fake chat model for offline testing and load tests.
+Simulates provider latency (drawn from a configurable distribution, with an
+optional slow tail), token-by-token output and injected errors without any
+network calls. Selected with AI_PROVIDER=fake.
+"""
+from typing import Any, AsyncIterator, Iterator, List, Optional
+import asyncio
+import math
+import random
+import time
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+DEFAULT_FAKE_RESPONSE = (
+    "Thanks for your message! This is a simulated answer from the offline test model, "
+    "long enough to exercise streaming and response handling."
+)
+
+
+class FakeLLMError(RuntimeError):
+    """Injected provider failure."""
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model with configurable latency, output rate and error rate."""
+
+    response: str = DEFAULT_FAKE_RESPONSE
+    latency_seconds: float = 0.2  # Typical time to first token (median for lognormal, mean otherwise)
+    latency_distribution: str = "fixed"  # "fixed", "uniform", "exponential" or "lognormal"
+    latency_spread: float = 0.5  # uniform: +/- fraction of latency; lognormal: sigma
+    tail_probability: float = 0.0  # Chance a call is slowed down...
+    tail_latency_seconds: float = 0.0  # ...by this much extra
+    tokens_per_second: float = 0.0  # Output rate; 0 emits everything at once
+    error_rate: float = 0.0  # Chance a call fails after its latency
+    seed: Optional[int] = None
+
+    _random: random.Random = PrivateAttr()
+
+    def model_post_init(self, __context: Any) -> None:
+        self._random = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def _first_token_delay(self) -> float:
+        if self.latency_distribution == "uniform":
+            spread = self.latency_seconds * self.latency_spread
+            delay = self._random.uniform(self.latency_seconds - spread, self.latency_seconds + spread)
+        elif self.latency_distribution == "exponential":
+            delay = self._random.expovariate(1 / self.latency_seconds) if self.latency_seconds > 0 else 0.0
+        elif self.latency_distribution == "lognormal":
+            delay = self._random.lognormvariate(math.log(self.latency_seconds), self.latency_spread) if self.latency_seconds > 0 else 0.0
+        else:
+            delay = self.latency_seconds
+        if self.tail_probability and self._random.random() < self.tail_probability:
+            delay += self.tail_latency_seconds
+        return max(0.0, delay)
+
+    def _maybe_fail(self):
+        if self.error_rate and self._random.random() < self.error_rate:
+            raise FakeLLMError("Injected fake LLM error")
+
+    def _tokens(self) -> List[str]:
+        # Words with their trailing space, so joined chunks reproduce the response
+        words = self.response.split(" ")
+        return [word + " " for word in words[:-1]] + words[-1:]
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self._first_token_delay())
+        self._maybe_fail()
+        if self.tokens_per_second:
+            time.sleep(len(self._tokens()) / self.tokens_per_second)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.response))])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await asyncio.sleep(self._first_token_delay())
+        self._maybe_fail()
+        if self.tokens_per_second:
+            await asyncio.sleep(len(self._tokens()) / self.tokens_per_second)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.response))])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self._first_token_delay())
+        self._maybe_fail()
+        for index, token in enumerate(self._tokens()):
+            if index and self.tokens_per_second:
+                time.sleep(1 / self.tokens_per_second)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self._first_token_delay())
+        self._maybe_fail()
+        for index, token in enumerate(self._tokens()):
+            if index and self.tokens_per_second:
+                await asyncio.sleep(1 / self.tokens_per_second)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
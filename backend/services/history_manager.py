@@ -0,0 +1,123 @@
+"""
+Token-budgeted conversation history.
+Keeps the most recent turns verbatim within a fixed token budget and folds
+older turns into a rolling summary, so prompt size per turn stays bounded
+without dropping earlier context.
+"""
+from collections import OrderedDict
+from typing import Awaitable, Callable, List, Optional, Sequence, Tuple
+import structlog
+from langchain_core.messages import BaseMessage
+
+logger = structlog.get_logger()
+
+# Role/turn framing the model adds around each message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# (previous_summary, messages_to_fold, max_tokens) -> new summary or None on failure
+Summarizer = Callable[[str, List[BaseMessage], int], Awaitable[Optional[str]]]
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate: ~4 UTF-8 bytes per token.
+
+    Counting bytes rather than characters makes non-Latin scripts (e.g.
+    Arabic, 2 bytes per letter) cost more per character, as they do for
+    real tokenizers.
+    """
+    return len(text.encode("utf-8")) // 4 + 1
+
+
+def message_text(message: BaseMessage) -> str:
+    """Plain text of a message (multi-part content keeps only text parts)."""
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return "".join(
+        part if isinstance(part, str) else part.get("text", "")
+        for part in content
+        if isinstance(part, (str, dict))
+    )
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text so its estimate fits within max_tokens."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    return text.encode("utf-8")[: max_tokens * 4].decode("utf-8", errors="ignore").rstrip()
+
+
+class HistoryManager:
+    """Selects the history sent to the LLM for each turn."""
+
+    def __init__(
+        self,
+        token_budget: int = 1500,
+        max_recent_messages: int = 10,
+        max_retained_messages: int = 20,
+        summary_max_tokens: int = 300,
+        summarizer: Optional[Summarizer] = None,
+        token_cache_size: int = 10000,
+    ):
+        self.token_budget = token_budget
+        self.max_recent_messages = max_recent_messages
+        self.max_retained_messages = max_retained_messages
+        self.summary_max_tokens = summary_max_tokens
+        self.summarizer = summarizer
+        self.token_cache_size = token_cache_size
+        # message id -> token estimate; ids are stable across checkpoint loads
+        self._token_cache: "OrderedDict[str, int]" = OrderedDict()
+
+    def message_tokens(self, message: BaseMessage) -> int:
+        """Token estimate for a message, computed once per message ID."""
+        tokens = self._token_cache.get(message.id) if message.id else None
+        if tokens is None:
+            tokens = estimate_tokens(message_text(message)) + MESSAGE_OVERHEAD_TOKENS
+            if message.id:
+                self._token_cache[message.id] = tokens
+                if len(self._token_cache) > self.token_cache_size:
+                    self._token_cache.popitem(last=False)
+        return tokens
+
+    def build_context(
+        self,
+        summary: str,
+        messages: Sequence[BaseMessage],
+    ) -> Tuple[List[BaseMessage], List[BaseMessage], List[BaseMessage], int]:
+        """
+        Choose the history for one turn.
+
+        Args:
+            summary: Rolling summary of turns no longer in messages
+            messages: Unsummarized prior messages, oldest first
+
+        Returns:
+            (window, overflow, dropped, tokens): messages sent verbatim;
+            older messages waiting to be folded into the summary; messages
+            to discard outright (beyond retention, or nothing can summarize
+            them); estimated tokens of summary plus window
+        """
+        used = estimate_tokens(summary) + MESSAGE_OVERHEAD_TOKENS if summary else 0
+        start = len(messages)
+        # Newest first, stop at the first message that no longer fits
+        while start > 0 and len(messages) - start < self.max_recent_messages:
+            tokens = self.message_tokens(messages[start - 1])
+            if used + tokens > self.token_budget:
+                break
+            used += tokens
+            start -= 1
+
+        overflow = list(messages[:start])
+        keep = self.max_retained_messages - (len(messages) - start) if self.summarizer else 0
+        cut = max(0, len(overflow) - max(0, keep))
+        return list(messages[start:]), overflow[cut:], overflow[:cut], used
+
+    async def summarize(self, previous_summary: str, overflow: List[BaseMessage]) -> Optional[str]:
+        """Fold overflow messages into the summary; None when no summarizer is available or it fails."""
+        if self.summarizer is None or not overflow:
+            return None
+        summary = await self.summarizer(previous_summary, overflow, self.summary_max_tokens)
+        if not summary:
+            return None
+        return truncate_to_tokens(summary.strip(), self.summary_max_tokens)
@@ -0,0 +1,224 @@
+"""
+Portfolio knowledge for the AI persona.
+Splits content.{lang}.json and data/blogs/*.md into short passages (chunks)
+and keeps them in a BM25 index per language, in the same on-disk format and
+with the same incremental rebuilds as site search (services/search_service.py).
+Each chat turn retrieves the chunks that best match the question and sends only
+those, within a token budget, instead of every portfolio fact on every turn.
+Indexes can be built ahead of time with `python -m services.knowledge_service`.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+import os
+import re
+import structlog
+
+from config import settings
+from services.blog_service import parse_frontmatter
+from services.content_service import SUPPORTED_LANGUAGES, content_service
+from services.history_manager import estimate_tokens, truncate_to_tokens
+from services.search_index import SearchDocument
+from services.search_service import SearchService, markdown_to_text
+from utils.metrics import chat_context_tokens
+
+logger = structlog.get_logger()
+
+# Upper bound for one chunk, so several fit in the retrieval budget
+CHUNK_MAX_TOKENS = 160
+# Chunk types sent with every turn (who the persona is), ahead of retrieved ones
+PINNED_TYPES = ("profile",)
+
+# Fenced code is removed before splitting ("#" comments inside it are not headings)
+_CODE_FENCE = re.compile(r"^(```|~~~).*?^\1", re.DOTALL | re.MULTILINE)
+_HEADING_PATTERN = re.compile(r"^\s{0,3}#{1,6}\s+(.+?)\s*#*\s*$", re.MULTILINE)
+_SENTENCE_END = re.compile(r"(?<=[.!?؟])\s+")
+
+
+def pack_passages(paragraphs: Iterable[str], max_tokens: int = CHUNK_MAX_TOKENS) -> List[str]:
+    """
+    Group consecutive paragraphs into passages of at most max_tokens.
+    Longer paragraphs are split at sentence ends (and cut if one sentence is still too long).
+    """
+    pieces = []
+    for paragraph in paragraphs:
+        if estimate_tokens(paragraph) <= max_tokens:
+            pieces.append(paragraph)
+        else:
+            pieces.extend(truncate_to_tokens(s, max_tokens) for s in _SENTENCE_END.split(paragraph))
+
+    passages, current = [], ""
+    for piece in filter(None, pieces):
+        candidate = f"{current} {piece}" if current else piece
+        if current and estimate_tokens(candidate) > max_tokens:
+            passages.append(current)
+            candidate = piece
+        current = candidate
+    if current:
+        passages.append(current)
+    return passages
+
+
+def markdown_sections(body: str) -> List[Tuple[str, List[str]]]:
+    """(heading, plain-text paragraphs) for each heading-delimited section of a markdown body."""
+    body = _CODE_FENCE.sub("", body)
+    sections = []
+    heading, start = "", 0
+    for match in [*_HEADING_PATTERN.finditer(body), None]:
+        end = match.start() if match else len(body)
+        paragraphs = [markdown_to_text(block) for block in re.split(r"\n\s*\n", body[start:end])]
+        paragraphs = [p for p in paragraphs if p]
+        if paragraphs:
+            sections.append((heading, paragraphs))
+        if match:
+            heading, start = markdown_to_text(match.group(1)), match.end()
+    return sections
+
+
+class KnowledgeService(SearchService):
+    """Chunk index per language over the site content, queried once per chat turn."""
+
+    index_name = "chunks"
+
+    def _documents(self, lang: str) -> List[SearchDocument]:
+        data = content_service.get_data(lang)
+        chunks: List[SearchDocument] = []
+
+        def add(chunk_id: str, chunk_type: str, title: str, paragraphs: Iterable[str], url: str = ""):
+            passages = pack_passages(p.strip() for p in paragraphs if p and p.strip())
+            for part, text in enumerate(passages, start=1):
+                chunks.append(SearchDocument(
+                    id=chunk_id if len(passages) == 1 else f"{chunk_id}#{part}",
+                    type=chunk_type,
+                    title=title,
+                    url=url,
+                    text=text,
+                ))
+
+        hero = data.get("hero", {})
+        add("profile", "profile", hero.get("name", ""), [
+            ", ".join(filter(None, [hero.get("name"), hero.get("title")])) + ".",
+            hero.get("subtitle", ""),
+        ])
+
+        about = data.get("about", {})
+        add("about", "about", about.get("heading", ""), [
+            about.get("text", ""), about.get("story", ""), ", ".join(about.get("skillsSummary", [])),
+        ], "index.html#about")
+
+        for number, job in enumerate(data.get("experience", []), start=1):
+            title = " — ".join(filter(None, [job.get("role"), job.get("company")]))
+            if job.get("period"):
+                title = f"{title} ({job['period']})"
+            add(f"experience:{number}", "experience", title, job.get("details", []), "index.html#experience")
+
+        for number, project in enumerate(data.get("projects", []), start=1):
+            link = project.get("link") if project.get("link") not in ("", "#") else project.get("github")
+            add(f"project:{number}", "project", project.get("title", ""), [
+                project.get("description", ""),
+                ", ".join(project.get("techStack", [])),
+                project.get("metrics", ""),
+            ], link or "index.html#projects")
+
+        for group in data.get("skills", []):
+            category = group.get("category", "")
+            add(f"skills:{category}", "skills", category, [
+                f"{item.get('name', '')}: {item['description']}" if item.get("description") else item.get("name", "")
+                for item in group.get("items", [])
+            ], "index.html#skills")
+
+        for number, testimonial in enumerate(data.get("testimonials", []), start=1):
+            author = ", ".join(filter(None, [
+                testimonial.get("author"), testimonial.get("role"), testimonial.get("company"),
+            ]))
+            add(f"testimonial:{number}", "testimonial", author, [testimonial.get("quote", "")], "index.html#testimonials")
+
+        contact = data.get("contact", {})
+        add("contact", "contact", contact.get("heading", ""), [
+            contact.get("text", ""),
+            contact.get("email", ""),
+            *(f"{link.get('platform', '')}: {link.get('url', '')}" for link in contact.get("socialLinks", [])),
+            contact.get("calendarLink", ""),
+        ], "index.html#contact")
+
+        # Blog posts: one or more chunks per section, titled "post — section"
+        blog_files = self._blog_files(lang)
+        entries = {}
+        for entry in data.get("blog", []):
+            slug = entry.get("slug") or entry.get("link", "").partition("?slug=")[2]
+            entries[slug or entry.get("title", "")] = entry
+        for slug in sorted(set(entries) | set(blog_files)):
+            entry = entries.get(slug, {})
+            url = entry.get("link") or f"blog.html?slug={slug}"
+            frontmatter, body = {}, ""
+            if slug in blog_files:
+                with open(os.path.join(self.content_dir, blog_files[slug]), "r", encoding="utf-8") as f:
+                    frontmatter, body = parse_frontmatter(f.read())
+            translated = blog_files.get(slug, "").endswith(f".{lang}.md")
+            primary, secondary = (frontmatter, entry) if translated else (entry, frontmatter)
+            title = primary.get("title") or secondary.get("title") or slug
+            add(f"blog:{slug}", "blog", title, [primary.get("excerpt") or secondary.get("excerpt", "")], url)
+            for number, (heading, paragraphs) in enumerate(markdown_sections(body), start=1):
+                if heading == frontmatter.get("title"):
+                    heading = ""
+                add(f"blog:{slug}:{number}", "blog", " — ".join(filter(None, [title, heading])), paragraphs, url)
+        return chunks
+
+    @staticmethod
+    def format_chunk(chunk: Dict) -> str:
+        """One chunk as sent to the LLM: bracketed title (and link), then its text."""
+        header = f"[{chunk['title']}]" if chunk["title"] else ""
+        if chunk["type"] in ("project", "blog") and chunk["url"]:
+            header = f"{header} {chunk['url']}".strip()
+        return f"{header}\n{chunk['text']}" if header else chunk["text"]
+
+    async def retrieve(
+        self,
+        lang: str,
+        question: str,
+        fallback_question: str = "",
+        top_k: Optional[int] = None,
+        token_budget: Optional[int] = None,
+    ) -> str:
+        """
+        Portfolio context for a question: pinned chunks, then the top_k best
+        BM25 matches, in rank order while they fit in token_budget.
+
+        fallback_question (typically the previous user message) is used when
+        the question matches nothing, e.g. for follow-ups like "tell me more".
+        Returns "" if no index is available.
+        """
+        top_k = settings.ai_retrieval_top_k if top_k is None else top_k
+        token_budget = settings.ai_retrieval_token_budget if token_budget is None else token_budget
+        index = await self.get_index(lang)
+        if index is None:
+            return ""
+
+        _, hits = index.search(question, top_k)
+        if not hits and fallback_question:
+            _, hits = index.search(fallback_question, top_k)
+        pinned = [chunk for chunk in index.documents if chunk["type"] in PINNED_TYPES]
+        candidates = list({chunk["doc"]: chunk for chunk in pinned + [hit.document for hit in hits]}.values())
+
+        # Rank order; a chunk that does not fit leaves room for smaller, lower-ranked ones
+        parts, tokens = [], 0
+        for chunk in candidates:
+            text = self.format_chunk(chunk)
+            cost = estimate_tokens(text)
+            if tokens + cost > token_budget:
+                continue
+            parts.append(text)
+            tokens += cost
+        chat_context_tokens.observe(tokens)
+        logger.debug("chat_context_retrieved", lang=lang, hits=len(hits), chunks=len(parts), tokens=tokens)
+        return "\n\n".join(parts)
+
+
+# Global knowledge service instance
+knowledge_service = KnowledgeService()
+
+
+if __name__ == "__main__":
+    # Build the chunk indexes ahead of time (e.g. in a Docker build step)
+    for language in SUPPORTED_LANGUAGES:
+        built = knowledge_service.load_or_build(language)
+        print(f"{language}: {built.n_docs} chunks, {built.n_terms} terms -> {built.path}")
+        built.close()
@@ -0,0 +1,413 @@
+"""
+Pool of LLM backends with health-aware routing.
+
+Each backend (an API key / model pair) has its own circuit breaker and
+latency history. Calls go to the healthiest backend, fail over to the next
+one on errors, and can be hedged: if the first backend has not answered
+(or, when streaming, produced its first token) within a high percentile of
+its recent latency, a second backend is raced against it.
+
+The pool is itself a chat model, so the LangGraph agent and token
+streaming work unchanged.
+"""
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set
+import asyncio
+import time
+import structlog
+from langchain_core.language_models import BaseChatModel
+from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_core.messages import AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import ConfigDict
+
+from config import settings
+from utils.metrics import llm_backend_requests_total, llm_hedged_requests_total
+
+logger = structlog.get_logger()
+
+# Backend calls run without the caller's callbacks: only the pool reports
+# tokens, so hedged or failed-over attempts never leak into the stream
+_ISOLATED = {"callbacks": []}
+
+
+class NoBackendAvailable(RuntimeError):
+    """Every backend's circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed -> open after `failure_threshold` failures in a row; open ->
+    half-open after `reset_timeout` seconds, letting one probe call through;
+    the probe's outcome closes or re-opens the circuit.
+    """
+
+    CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+    STATE_CODES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}  # For the circuit-state gauge
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def available(self, now: float) -> bool:
+        """Whether a call may be sent now (without claiming the probe slot)."""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            return now - self.opened_at >= self.reset_timeout
+        return not self._probing
+
+    def acquire(self, now: float):
+        """Claim a call slot; in half-open state only one probe runs at a time."""
+        if self.state == self.OPEN and now - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            self._probing = True
+
+    def record_success(self):
+        self.failures = 0
+        self.state = self.CLOSED
+        self._probing = False
+
+    def record_failure(self, now: float):
+        self.failures += 1
+        self._probing = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = now
+
+    def release(self):
+        """Give back a probe slot without an outcome (the call was cancelled)."""
+        self._probing = False
+
+
+class LLMBackend:
+    """One chat model in the pool, with its health state."""
+
+    def __init__(
+        self,
+        name: str,
+        llm: BaseChatModel,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        latency_window: int = 200,
+    ):
+        self.name = name
+        self.llm = llm
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.in_flight = 0
+        # Recent full-response latencies (invoke) and times to first token (stream)
+        self.latencies: Dict[str, Deque[float]] = {
+            "invoke": deque(maxlen=latency_window),
+            "stream": deque(maxlen=latency_window),
+        }
+        self.ewma_latency: Optional[float] = None
+
+    def score(self, default_latency: float) -> float:
+        """Expected wait: smoothed latency scaled by current load. Lower is better."""
+        latency = self.ewma_latency if self.ewma_latency is not None else default_latency
+        return latency * (1 + self.in_flight)
+
+    def latency_percentile(self, percentile: float, mode: str) -> Optional[float]:
+        if len(self.latencies[mode]) < 20:
+            return None
+        ordered = sorted(self.latencies[mode])
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percentile / 100))]
+
+    def _start(self):
+        self.breaker.acquire(time.monotonic())
+        self.in_flight += 1
+        return time.perf_counter()
+
+    def _observe(self, mode: str, started: float):
+        latency = time.perf_counter() - started
+        self.latencies[mode].append(latency)
+        self.ewma_latency = latency if self.ewma_latency is None else 0.8 * self.ewma_latency + 0.2 * latency
+
+    def _succeeded(self):
+        self._set_state(self.breaker.record_success)
+        llm_backend_requests_total.labels(self.name, "success").inc()
+
+    def _failed(self, error: Exception):
+        self._set_state(lambda: self.breaker.record_failure(time.monotonic()))
+        llm_backend_requests_total.labels(self.name, "error").inc()
+        logger.warning(
+            "llm_backend_failed",
+            backend=self.name,
+            error=str(error),
+            error_type=type(error).__name__,
+            circuit=self.breaker.state,
+        )
+
+    def _cancelled(self):
+        self.breaker.release()
+        llm_backend_requests_total.labels(self.name, "cancelled").inc()
+
+    def _set_state(self, update):
+        before = self.breaker.state
+        update()
+        if self.breaker.state != before:
+            logger.info("llm_circuit_changed", backend=self.name, state=self.breaker.state)
+
+    async def ainvoke(self, messages: List[BaseMessage], stop: Optional[List[str]] = None):
+        started = self._start()
+        try:
+            response = await self.llm.ainvoke(messages, config=_ISOLATED, stop=stop)
+        except asyncio.CancelledError:
+            self._cancelled()
+            raise
+        except Exception as e:
+            self._failed(e)
+            raise
+        finally:
+            self.in_flight -= 1
+        self._observe("invoke", started)
+        self._succeeded()
+        return response
+
+    async def astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None) -> AsyncIterator[AIMessageChunk]:
+        started = self._start()
+        first = True
+        try:
+            async for chunk in self.llm.astream(messages, config=_ISOLATED, stop=stop):
+                if first:
+                    self._observe("stream", started)
+                    first = False
+                yield chunk
+        except (asyncio.CancelledError, GeneratorExit):
+            self._cancelled()
+            raise
+        except Exception as e:
+            self._failed(e)
+            raise
+        else:
+            self._succeeded()
+        finally:
+            self.in_flight -= 1
+
+
+class LLMPool(BaseChatModel):
+    """Chat model that routes each call across a pool of backends."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    backends: List[Any]
+    hedge_enabled: bool = False
+    hedge_percentile: float = 95.0
+    hedge_min_delay: float = 0.5  # Seconds
+    hedge_max_delay: float = 5.0  # Also used until a backend has latency history
+
+    @property
+    def _llm_type(self) -> str:
+        return "llm-pool"
+
+    def _candidates(self, exclude: Set[str]) -> List[LLMBackend]:
+        """Available backends, best first."""
+        now = time.monotonic()
+        available = [b for b in self.backends if b.name not in exclude and b.breaker.available(now)]
+        return sorted(available, key=lambda b: b.score(self.hedge_max_delay))
+
+    def _next_backend(self, tried: Set[str]) -> Optional[LLMBackend]:
+        candidates = self._candidates(tried)
+        if not candidates:
+            return None
+        tried.add(candidates[0].name)
+        return candidates[0]
+
+    def _hedge_delay(self, backend: LLMBackend, tried: Set[str], mode: str) -> Optional[float]:
+        """Seconds to wait before hedging, or None when hedging does not apply."""
+        if not self.hedge_enabled or not self._candidates(tried):
+            return None
+        delay = backend.latency_percentile(self.hedge_percentile, mode)
+        if delay is None:
+            return self.hedge_max_delay
+        return min(self.hedge_max_delay, max(self.hedge_min_delay, delay))
+
+    async def _race(self, start, first_backend: LLMBackend, tried: Set[str], mode: str):
+        """
+        Run start(backend) with hedging and failover until one attempt succeeds.
+
+        Returns (backend, result) of the winner; losing attempts are cancelled.
+        """
+        attempts: Dict[asyncio.Task, LLMBackend] = {}
+        errors: List[Exception] = []
+
+        def launch(backend: LLMBackend):
+            attempts[asyncio.create_task(start(backend))] = backend
+
+        launch(first_backend)
+        hedge_delay = self._hedge_delay(first_backend, tried, mode)
+        try:
+            while attempts:
+                done, _ = await asyncio.wait(attempts, timeout=hedge_delay, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # First attempt is slower than usual: race a second backend
+                    hedge_delay = None
+                    backup = self._next_backend(tried)
+                    if backup is not None:
+                        llm_hedged_requests_total.labels("started").inc()
+                        launch(backup)
+                    continue
+                for task in done:
+                    backend = attempts.pop(task)
+                    if task.exception() is None:
+                        if backend is not first_backend:
+                            llm_hedged_requests_total.labels("won").inc()
+                        return backend, task.result()
+                    errors.append(task.exception())
+                if not attempts:
+                    # Fail over to the next healthy backend
+                    backup = self._next_backend(tried)
+                    if backup is not None:
+                        launch(backup)
+        finally:
+            for task in attempts:
+                task.cancel()
+            if attempts:
+                await asyncio.gather(*attempts, return_exceptions=True)
+        raise errors[-1]
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        tried: Set[str] = set()
+        first = self._next_backend(tried)
+        if first is None:
+            raise NoBackendAvailable("All LLM backends are unavailable")
+        _, response = await self._race(lambda backend: backend.ainvoke(messages, stop), first, tried, "invoke")
+        return ChatResult(generations=[ChatGeneration(message=response)])
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        tried: Set[str] = set()
+        first = self._next_backend(tried)
+        if first is None:
+            raise NoBackendAvailable("All LLM backends are unavailable")
+        streams: Dict[str, AsyncIterator[AIMessageChunk]] = {}
+
+        async def first_chunk(backend: LLMBackend):
+            stream = streams[backend.name] = backend.astream(messages, stop)
+            chunk = await anext(stream, None)
+            if chunk is None:
+                return AIMessageChunk(content="")
+            return chunk
+
+        # Hedging and failover apply until the first token; after that the winner streams alone
+        winner, chunk = await self._race(first_chunk, first, tried, "stream")
+        stream = streams.pop(winner.name)
+        try:
+            for other in streams.values():
+                await other.aclose()
+            yield ChatGenerationChunk(message=chunk)
+            async for chunk in stream:
+                yield ChatGenerationChunk(message=chunk)
+        finally:
+            await stream.aclose()
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        # Sync callers get plain failover, without hedging
+        tried: Set[str] = set()
+        error: Optional[Exception] = None
+        while (backend := self._next_backend(tried)) is not None:
+            try:
+                response = backend.llm.invoke(messages, config=_ISOLATED, stop=stop)
+            except Exception as e:
+                backend._failed(e)
+                error = e
+                continue
+            return ChatResult(generations=[ChatGeneration(message=response)])
+        raise error or NoBackendAvailable("All LLM backends are unavailable")
+
+    def get_stats(self) -> List[Dict]:
+        """Per-backend health for observability."""
+        return [
+            {
+                "backend": backend.name,
+                "circuit": backend.breaker.state,
+                "in_flight": backend.in_flight,
+                "ewma_latency_ms": round(backend.ewma_latency * 1000, 1) if backend.ewma_latency else None,
+            }
+            for backend in self.backends
+        ]
+
+
+def _split(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def create_llm_pool(api_key: str) -> LLMPool:
+    """Build the Gemini backend pool from settings: every configured key with every configured model."""
+    keys = [api_key] + [key for key in _split(settings.gemini_extra_api_keys) if key != api_key]
+    models = [settings.gemini_model] + [m for m in _split(settings.gemini_fallback_models) if m != settings.gemini_model]
+    backends = []
+    # Primary model first on each key, so routing prefers it while healthy
+    for model in models:
+        for index, key in enumerate(keys):
+            llm = ChatGoogleGenerativeAI(
+                model=model,
+                google_api_key=key,
+                temperature=settings.ai_temperature,
+                max_output_tokens=settings.ai_max_tokens,
+            )
+            backends.append(_backend(f"{model}#{index}", llm))
+    return _pool(backends)
+
+
+def create_fake_llm_pool() -> LLMPool:
+    """Build a pool of simulated backends (AI_PROVIDER=fake) for offline load tests."""
+    from services.fake_llm import FakeChatModel
+
+    backends = [
+        _backend(
+            f"fake#{index}",
+            FakeChatModel(
+                latency_seconds=settings.fake_llm_latency_ms / 1000,
+                latency_distribution=settings.fake_llm_latency_distribution,
+                latency_spread=settings.fake_llm_latency_spread,
+                tokens_per_second=settings.fake_llm_tokens_per_second,
+                error_rate=settings.fake_llm_error_rate,
+            ),
+        )
+        for index in range(max(1, settings.fake_llm_backends))
+    ]
+    return _pool(backends)
+
+
+def _backend(name: str, llm: BaseChatModel) -> LLMBackend:
+    return LLMBackend(
+        name,
+        llm,
+        failure_threshold=settings.ai_circuit_failure_threshold,
+        reset_timeout=settings.ai_circuit_reset_seconds,
+    )
+
+
+def _pool(backends: List[LLMBackend]) -> LLMPool:
+    return LLMPool(
+        backends=backends,
+        hedge_enabled=settings.ai_hedge_enabled,
+        hedge_percentile=settings.ai_hedge_percentile,
+        hedge_min_delay=settings.ai_hedge_min_delay_ms / 1000,
+        hedge_max_delay=settings.ai_hedge_max_delay_ms / 1000,
+    )
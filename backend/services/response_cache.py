@@ -0,0 +1,110 @@
+"""
+Response cache for AI chat.
+In-memory LRU cache with TTL expiry, keyed on language, model and
+normalized user message. Only opening questions of a conversation are
+cached; follow-ups depend on earlier turns and always reach the LLM.
+"""
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import hashlib
+import re
+import time
+import structlog
+from config import settings
+
+logger = structlog.get_logger()
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCT_RE = re.compile(r"[\s?!.,;:؟،]+$")
+
+
+class ResponseCache:
+    """Bounded LRU cache of chat responses with per-entry TTL."""
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 3600, enabled: bool = True):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled and max_entries > 0
+        # key -> (expires_at, response); order is least -> most recently used
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def normalize_message(message: str) -> str:
+        """Normalize a user message so trivially different phrasings share a key."""
+        message = _WHITESPACE_RE.sub(" ", message.casefold()).strip()
+        return _TRAILING_PUNCT_RE.sub("", message)
+
+    def make_key(self, language: str, model: str, user_message: str) -> str:
+        """
+        Build the cache key for a chat request.
+
+        Only opening questions are cached (their answer does not depend on
+        earlier turns), so the key has no conversation component.
+        """
+        raw = "\x1f".join((language or "", model or "", self.normalize_message(user_message)))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return cached response for key, or None on miss/expiry."""
+        if not self.enabled:
+            return None
+
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, response = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return response
+
+    def set(self, key: str, response: str):
+        """Store a response, evicting the least recently used entries if full."""
+        if not self.enabled:
+            return
+
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, response)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop all cached entries."""
+        self._entries.clear()
+
+    @property
+    def hit_ratio(self) -> float:
+        """Fraction of lookups served from cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get_stats(self) -> Dict:
+        """Cache counters for observability."""
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hit_ratio, 4),
+        }
+
+
+# Global response cache instance
+response_cache = ResponseCache(
+    max_entries=settings.ai_cache_max_entries,
+    ttl_seconds=settings.ai_cache_ttl_seconds,
+    enabled=settings.ai_cache_enabled,
+)
@@ -0,0 +1,286 @@
+"""
+On-disk BM25 search index.
+
+One file per language, read through mmap so that a query only touches the
+lexicon entries and posting lists of its own terms:
+
+    header    magic, version, counts, average document length, section offsets
+    lexicon   n_terms x (term offset, term length, first posting, document frequency),
+              sorted by term bytes for binary search
+    terms     UTF-8 term strings
+    postings  per term: (document, weighted term frequency, BM25 impact) records
+    metadata  JSON: documents (title, url, text for snippets, fingerprint) and source versions
+
+BM25 impacts are precomputed at build time, so scoring a query is a sum over
+its posting lists. Term frequencies are kept as well, which lets a rebuild
+reuse the analysis of unchanged documents (IndexBuilder).
+"""
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+import hashlib
+import heapq
+import html
+import json
+import math
+import mmap
+import os
+import struct
+
+from utils.text_analysis import analyze, analyze_with_spans
+
+MAGIC = b"BM25IDX1"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sIIIdQQQQQ")  # magic, version, n_docs, n_terms, avgdl, 5 section offsets/lengths
+LEXICON_ENTRY = struct.Struct("<IIII")
+POSTING = struct.Struct("<IIf")
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+# Title terms count this many times towards a document's term frequencies
+TITLE_WEIGHT = 3
+
+SNIPPET_CHARS = 180
+
+
+@dataclass
+class SearchDocument:
+    """A searchable unit (blog post, project) as extracted from the site content."""
+    id: str
+    type: str
+    title: str
+    url: str
+    text: str
+    date: str = ""
+
+    @property
+    def fingerprint(self) -> str:
+        """Changes whenever the indexed text does."""
+        return hashlib.sha256(f"{self.title}\0{self.text}".encode("utf-8")).hexdigest()[:16]
+
+
+def document_terms(document: SearchDocument) -> Counter:
+    """Weighted term frequencies of a document (title terms count TITLE_WEIGHT times)."""
+    counts = Counter(analyze(document.text))
+    for term in analyze(document.title):
+        counts[term] += TITLE_WEIGHT
+    return counts
+
+
+@dataclass
+class SearchHit:
+    document: Dict
+    score: float
+    terms: List[str] = field(default_factory=list)
+
+
+class SearchIndex:
+    """Read-only view of an index file; lexicon and postings stay in the page cache via mmap."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty file
+            self._file.close()
+            raise ValueError(f"{path}: not a search index")
+        (magic, version, self.n_docs, self.n_terms, self.avgdl,
+         self._lexicon_at, self._terms_at, self._postings_at, meta_at, meta_len) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"{path}: unsupported search index format")
+        meta = json.loads(self._mm[meta_at:meta_at + meta_len].decode("utf-8"))
+        self.documents: List[Dict] = meta["documents"]
+        self.sources: Dict[str, List[int]] = meta["sources"]
+        self.digest: str = meta["digest"]
+        # Snippet spans are computed on demand and kept per document
+        self._spans: Dict[int, List[Tuple[str, int, int]]] = {}
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def _term_at(self, i: int) -> Tuple[bytes, int, int]:
+        offset, length, first, df = LEXICON_ENTRY.unpack_from(self._mm, self._lexicon_at + i * LEXICON_ENTRY.size)
+        start = self._terms_at + offset
+        return self._mm[start:start + length], first, df
+
+    def lookup(self, term: str) -> Optional[Tuple[int, int]]:
+        """(first posting, document frequency) for a term, by binary search over the lexicon."""
+        key = term.encode("utf-8")
+        lo, hi = 0, self.n_terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            value, first, df = self._term_at(mid)
+            if value < key:
+                lo = mid + 1
+            elif value > key:
+                hi = mid
+            else:
+                return first, df
+        return None
+
+    def postings(self, term: str) -> Iterable[Tuple[int, int, float]]:
+        """(document, term frequency, impact) records for a term."""
+        entry = self.lookup(term)
+        if entry is None:
+            return ()
+        first, df = entry
+        start = self._postings_at + first * POSTING.size
+        return POSTING.iter_unpack(self._mm[start:start + df * POSTING.size])
+
+    def term_frequencies(self) -> Dict[int, Counter]:
+        """Invert the postings back into per-document term frequencies (used by rebuilds)."""
+        frequencies: Dict[int, Counter] = {}
+        for i in range(self.n_terms):
+            value, first, df = self._term_at(i)
+            term = value.decode("utf-8")
+            start = self._postings_at + first * POSTING.size
+            for doc, tf, _ in POSTING.iter_unpack(self._mm[start:start + df * POSTING.size]):
+                frequencies.setdefault(doc, Counter())[term] = tf
+        return frequencies
+
+    def search(self, query: str, limit: int = 10) -> Tuple[int, List[SearchHit]]:
+        """Top documents for a query as (number of matching documents, hits by descending score)."""
+        terms = list(dict.fromkeys(analyze(query)))
+        scores: Dict[int, float] = {}
+        matched: Dict[int, List[str]] = {}
+        for term in terms:
+            for doc, _, impact in self.postings(term):
+                scores[doc] = scores.get(doc, 0.0) + impact
+                matched.setdefault(doc, []).append(term)
+        top = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+        return len(scores), [
+            SearchHit(document=self.documents[doc], score=score, terms=matched[doc]) for doc, score in top
+        ]
+
+    def _document_spans(self, doc: int) -> List[Tuple[str, int, int]]:
+        spans = self._spans.get(doc)
+        if spans is None:
+            spans = self._spans[doc] = list(analyze_with_spans(self.documents[doc]["text"]))
+        return spans
+
+    def snippet(self, hit: SearchHit, max_chars: int = SNIPPET_CHARS) -> str:
+        """
+        Excerpt around the densest cluster of matched terms, HTML-escaped,
+        with matches wrapped in <mark>.
+        """
+        doc, text = hit.document["doc"], hit.document["text"]
+        wanted = set(hit.terms)
+        matches = [(start, end) for term, start, end in self._document_spans(doc) if term in wanted]
+        if not matches:
+            matches = [(0, 0)]
+
+        # Window of max_chars containing the most matches (two pointers over match offsets)
+        best, best_count, j = 0, 0, 0
+        for i in range(len(matches)):
+            while j < i and matches[i][1] - matches[j][0] > max_chars:
+                j += 1
+            if i - j + 1 > best_count:
+                best, best_count = j, i - j + 1
+        first_start = matches[best][0]
+        last_end = matches[best + best_count - 1][1]
+        # A little context before the matches, the rest after; then snap to word boundaries
+        slack = max(0, max_chars - (last_end - first_start))
+        start = max(0, first_start - slack // 3)
+        end = min(len(text), start + max_chars)
+        if start > 0:
+            space = text.find(" ", start, first_start)
+            start = space + 1 if space != -1 else start
+        if end < len(text):
+            space = text.rfind(" ", last_end, end)
+            end = space if space != -1 else end
+
+        parts = ["…" if start > 0 else ""]
+        pos = start
+        for match_start, match_end in matches:
+            if match_start < start or match_end > end or match_start == match_end:
+                continue
+            parts.append(html.escape(text[pos:match_start]))
+            parts.append(f"<mark>{html.escape(text[match_start:match_end])}</mark>")
+            pos = match_end
+        parts.append(html.escape(text[pos:end]))
+        parts.append("…" if end < len(text) else "")
+        return "".join(parts)
+
+
+class IndexBuilder:
+    """Computes BM25 impacts for a set of documents and writes an index file."""
+
+    def __init__(self):
+        self.documents: List[SearchDocument] = []
+        self.frequencies: List[Counter] = []
+
+    def add(self, document: SearchDocument, frequencies: Optional[Counter] = None):
+        """Add a document; pass frequencies to reuse an earlier analysis of the same text."""
+        self.documents.append(document)
+        self.frequencies.append(frequencies if frequencies is not None else document_terms(document))
+
+    def write(self, path: str, sources: Dict[str, List[int]]) -> str:
+        """Write the index atomically; returns its digest."""
+        n_docs = len(self.documents)
+        lengths = [sum(counts.values()) for counts in self.frequencies]
+        avgdl = (sum(lengths) / n_docs) if n_docs else 0.0
+
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        for doc, counts in enumerate(self.frequencies):
+            for term, tf in counts.items():
+                postings.setdefault(term, []).append((doc, tf))
+
+        lexicon = bytearray()
+        term_blob = bytearray()
+        posting_blob = bytearray()
+        count = 0
+        for term in sorted(postings, key=lambda t: t.encode("utf-8")):
+            entries = postings[term]
+            encoded = term.encode("utf-8")
+            lexicon += LEXICON_ENTRY.pack(len(term_blob), len(encoded), count, len(entries))
+            term_blob += encoded
+            idf = math.log(1 + (n_docs - len(entries) + 0.5) / (len(entries) + 0.5))
+            for doc, tf in entries:
+                norm = K1 * (1 - B + B * lengths[doc] / avgdl) if avgdl else K1
+                posting_blob += POSTING.pack(doc, tf, idf * tf * (K1 + 1) / (tf + norm))
+            count += len(entries)
+
+        documents = [
+            {
+                "doc": i,
+                "id": d.id,
+                "type": d.type,
+                "title": d.title,
+                "url": d.url,
+                "date": d.date,
+                "text": d.text,
+                "fingerprint": d.fingerprint,
+                "length": lengths[i],
+            }
+            for i, d in enumerate(self.documents)
+        ]
+        # Everything a result shows (title, url, date, type, text), not just the fingerprints
+        digest = hashlib.sha256(
+            json.dumps(documents, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        ).hexdigest()[:16]
+        meta = json.dumps(
+            {"documents": documents, "sources": sources, "digest": digest},
+            ensure_ascii=False, separators=(",", ":"),
+        ).encode("utf-8")
+
+        lexicon_at = HEADER.size
+        terms_at = lexicon_at + len(lexicon)
+        postings_at = terms_at + len(term_blob)
+        meta_at = postings_at + len(posting_blob)
+        header = HEADER.pack(
+            MAGIC, FORMAT_VERSION, n_docs, len(postings), avgdl,
+            lexicon_at, terms_at, postings_at, meta_at, len(meta),
+        )
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(header)
+            f.write(lexicon)
+            f.write(term_blob)
+            f.write(posting_blob)
+            f.write(meta)
+        os.replace(tmp, path)
+        return digest
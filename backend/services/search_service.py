@@ -0,0 +1,233 @@
+"""
+Site search service.
+Indexes blog posts (data/blogs/*.md) and the blog and projects sections of
+content.{lang}.json into one BM25 index file per language (see
+services/search_index.py). Indexes are built at startup, or ahead of time with
+`python -m services.search_service`, and rebuilt when a source file changes;
+a rebuild only re-analyzes documents whose text has changed.
+"""
+from collections import Counter
+from typing import Dict, List, Optional
+import asyncio
+import os
+import re
+import time
+import structlog
+
+from config import settings
+from services.blog_service import SLUG_PATTERN, parse_frontmatter
+from services.content_service import SUPPORTED_LANGUAGES, content_service, get_content_dir
+from services.search_index import IndexBuilder, SearchDocument, SearchIndex
+
+logger = structlog.get_logger()
+
+# Markdown syntax removed before indexing (fenced code is not useful search text)
+_MARKDOWN_PATTERNS = [
+    (re.compile(r"^(```|~~~).*?^\1", re.DOTALL | re.MULTILINE), " "),
+    (re.compile(r"!\[[^\]]*\]\([^)]*\)"), " "),
+    (re.compile(r"\[([^\]]*)\]\([^)]*\)"), r"\1"),
+    (re.compile(r"^\s{0,3}(#{1,6}|>|[-*+]|\d+\.)\s+", re.MULTILINE), ""),
+    (re.compile(r"^\s*([-*_]\s*){3,}$|\*{1,3}|`+|~~|\|", re.MULTILINE), " "),
+    (re.compile(r"\s+"), " "),
+]
+
+
+def markdown_to_text(text: str) -> str:
+    """Plain text of a markdown document, for indexing and snippets."""
+    for pattern, replacement in _MARKDOWN_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text.strip()
+
+
+class SearchService:
+    """Owns one SearchIndex per language and keeps it in step with the source files."""
+
+    # Index files are named {index_name}-{lang}.idx
+    index_name = "search"
+
+    def __init__(self, content_dir: Optional[str] = None, index_dir: Optional[str] = None):
+        self.content_dir = content_dir or get_content_dir()
+        self.index_dir = index_dir or settings.search_index_dir
+        self._indexes: Dict[str, SearchIndex] = {}
+        self._checked: Dict[str, float] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def _index_path(self, lang: str) -> str:
+        return os.path.join(self.index_dir, f"{self.index_name}-{lang}.idx")
+
+    def _blog_files(self, lang: str) -> Dict[str, str]:
+        """slug -> markdown file for a language (slug.{lang}.md preferred over slug.md)."""
+        files: Dict[str, str] = {}
+        blogs_dir = os.path.join(self.content_dir, "blogs")
+        try:
+            names = sorted(os.listdir(blogs_dir))
+        except OSError:
+            return files
+        for name in names:
+            if not name.endswith(".md"):
+                continue
+            stem = name[:-3]
+            slug, _, suffix = stem.rpartition(".")
+            if not slug or suffix not in SUPPORTED_LANGUAGES:
+                slug, suffix = stem, ""
+            if not SLUG_PATTERN.match(slug) or suffix not in ("", lang):
+                continue
+            if suffix or slug not in files:
+                files[slug] = os.path.join("blogs", name)
+        return files
+
+    def _source_versions(self, lang: str) -> Dict[str, List[int]]:
+        """Source file (relative to the content directory) -> [mtime_ns, size]."""
+        versions = {}
+        for rel in [f"content.{lang}.json", *self._blog_files(lang).values()]:
+            try:
+                stat = os.stat(os.path.join(self.content_dir, rel))
+            except OSError:
+                continue
+            versions[rel] = [stat.st_mtime_ns, stat.st_size]
+        return versions
+
+    def _documents(self, lang: str) -> List[SearchDocument]:
+        data = content_service.get_data(lang)
+        blog_files = self._blog_files(lang)
+        documents = []
+
+        entries = {}
+        for entry in data.get("blog", []):
+            slug = entry.get("slug") or entry.get("link", "").partition("?slug=")[2]
+            entries[slug or entry.get("title", "")] = entry
+        for slug in sorted(set(entries) | set(blog_files)):
+            entry = entries.get(slug, {})
+            frontmatter, body = {}, ""
+            if slug in blog_files:
+                with open(os.path.join(self.content_dir, blog_files[slug]), "r", encoding="utf-8") as f:
+                    frontmatter, body = parse_frontmatter(f.read())
+            # A translated post's frontmatter wins; a shared post's (slug.md) only fills gaps
+            # in the language's own entry, so e.g. Arabic results keep their Arabic titles
+            primary, secondary = (
+                (frontmatter, entry) if blog_files.get(slug, "").endswith(f".{lang}.md") else (entry, frontmatter)
+            )
+            title = primary.get("title") or secondary.get("title") or slug
+            excerpts = [primary.get("excerpt"), secondary.get("excerpt"), frontmatter.get("description")]
+            extra = [secondary.get("title")] if secondary.get("title") != title else []
+            text_parts = list(dict.fromkeys(filter(None, excerpts + extra + [markdown_to_text(body)])))
+            documents.append(SearchDocument(
+                id=f"blog:{slug}",
+                type="blog",
+                title=title,
+                url=entry.get("link") or f"blog.html?slug={slug}",
+                date=primary.get("date") or secondary.get("date", ""),
+                text=" ".join(text_parts),
+            ))
+
+        for number, project in enumerate(data.get("projects", []), start=1):
+            link = project.get("link") if project.get("link") not in ("", "#") else project.get("github")
+            documents.append(SearchDocument(
+                id=f"project:{number}",
+                type="project",
+                title=project.get("title", ""),
+                url=link or "index.html#projects",
+                text=" ".join(filter(None, [
+                    project.get("description", ""),
+                    " ".join(project.get("techStack", [])),
+                    project.get("metrics", ""),
+                ])),
+            ))
+        return documents
+
+    def load_or_build(self, lang: str, current: Optional[SearchIndex] = None) -> SearchIndex:
+        """
+        Index for a language, rebuilt if any source file changed since it was written.
+        Blocking; the async API runs it in a worker thread.
+        """
+        index = current
+        if index is None:
+            try:
+                index = SearchIndex(self._index_path(lang))
+            except (OSError, ValueError):
+                index = None
+        versions = self._source_versions(lang)
+        if index is not None and index.sources == versions:
+            return index
+
+        started = time.perf_counter()
+        documents = self._documents(lang)
+        reuse: Dict[str, Counter] = {}
+        if index is not None:
+            # Unchanged documents keep their analyzed term frequencies
+            previous = {d["fingerprint"]: d["doc"] for d in index.documents}
+            if any(d.fingerprint in previous for d in documents):
+                frequencies = index.term_frequencies()
+                reuse = {fp: frequencies.get(doc, Counter()) for fp, doc in previous.items()}
+        builder = IndexBuilder()
+        for document in documents:
+            builder.add(document, reuse.get(document.fingerprint))
+
+        os.makedirs(self.index_dir, exist_ok=True)
+        builder.write(self._index_path(lang), versions)
+        if index is not None and index is not current:
+            index.close()
+        rebuilt = SearchIndex(self._index_path(lang))
+        logger.info(
+            "search_index_built",
+            index=self.index_name,
+            lang=lang,
+            documents=rebuilt.n_docs,
+            terms=rebuilt.n_terms,
+            reanalyzed=sum(1 for d in documents if d.fingerprint not in reuse),
+            duration_ms=round((time.perf_counter() - started) * 1000, 2),
+        )
+        return rebuilt
+
+    async def get_index(self, lang: str) -> Optional[SearchIndex]:
+        """
+        Current index for a language.
+
+        Source files are checked at most every search_refresh_seconds; while a
+        rebuild runs, searches keep using the previous index.
+        """
+        index = self._indexes.get(lang)
+        if index is not None and time.monotonic() - self._checked.get(lang, 0) < settings.search_refresh_seconds:
+            return index
+        lock = self._locks.setdefault(lang, asyncio.Lock())
+        if index is not None and lock.locked():
+            return index
+        async with lock:
+            index = self._indexes.get(lang)
+            if index is not None and time.monotonic() - self._checked.get(lang, 0) < settings.search_refresh_seconds:
+                return index
+            try:
+                fresh = await asyncio.to_thread(self.load_or_build, lang, index)
+            except Exception as e:
+                logger.error("search_index_build_failed", index=self.index_name, lang=lang, error=str(e), exc_info=True)
+                fresh = index
+            self._checked[lang] = time.monotonic()
+            if fresh is not index:
+                self._indexes[lang] = fresh
+                # Searches run on the event loop, so none is using the old index now
+                if index is not None:
+                    index.close()
+            return fresh
+
+    async def start(self):
+        """Load or build every language's index."""
+        for lang in SUPPORTED_LANGUAGES:
+            await self.get_index(lang)
+
+    async def close(self):
+        for index in self._indexes.values():
+            index.close()
+        self._indexes.clear()
+        self._checked.clear()
+
+
+# Global search service instance
+search_service = SearchService()
+
+
+if __name__ == "__main__":
+    # Build the indexes ahead of time (e.g. in a Docker build step)
+    for language in SUPPORTED_LANGUAGES:
+        built = search_service.load_or_build(language)
+        print(f"{language}: {built.n_docs} documents, {built.n_terms} terms -> {built.path}")
+        built.close()
@@ -1,111 +1,139 @@
 """
 Session manager for chat conversations.
-Stores conversation history in memory (can be extended to use database).
+Applies session lifecycle rules on top of a pluggable SessionStore
+(in-memory by default, SQL-backed when SESSION_STORE=sql). Messages are not
+kept here: the conversation state in the AI service's checkpointer is the
+single record of a chat, and is dropped when its session is removed.
 """
-from typing import Dict, List, Optional
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
 from datetime import datetime, timedelta
+import asyncio
 import uuid
 import structlog
 
+from config import settings
+from services.ai_service import ai_service
+from services.session_store import SessionStore, InMemorySessionStore, create_session_store
+from utils.metrics import chat_sessions_created_total, chat_sessions_removed_total
+
 logger = structlog.get_logger()
 
 
 class SessionManager:
-    """Manages chat sessions and conversation history."""
-    
-    def __init__(self, session_timeout_minutes: int = 30):
-        self.sessions: Dict[str, Dict] = {}
+    """Manages chat session lifecycle (creation, activity, expiry and eviction)."""
+
+    def __init__(
+        self,
+        store: Optional[SessionStore] = None,
+        session_timeout_minutes: int = 30,
+        max_sessions: int = 0,
+        sweep_interval_seconds: float = 60,
+        on_sessions_removed: Optional[Callable[[Iterable[str]], Awaitable[None]]] = None,
+    ):
+        self.store = store or InMemorySessionStore()
         self.session_timeout = timedelta(minutes=session_timeout_minutes)
-    
-    def create_session(self) -> str:
+        self.max_sessions = max_sessions  # 0 disables the hard cap
+        self.sweep_interval_seconds = sweep_interval_seconds
+        # Releases state kept elsewhere for removed sessions (conversation checkpoints)
+        self.on_sessions_removed = on_sessions_removed
+        self._sweeper_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start the underlying store and the expiry sweeper."""
+        await self.store.start()
+        if self.sweep_interval_seconds > 0 and self._sweeper_task is None:
+            self._sweeper_task = asyncio.create_task(self._sweep_loop())
+
+    async def close(self):
+        """Stop the sweeper, then flush and close the underlying store."""
+        if self._sweeper_task is not None:
+            self._sweeper_task.cancel()
+            try:
+                await self._sweeper_task
+            except asyncio.CancelledError:
+                pass
+            self._sweeper_task = None
+        await self.store.close()
+
+    async def _sweep_loop(self):
+        """Periodically evict expired sessions."""
+        while True:
+            await asyncio.sleep(self.sweep_interval_seconds)
+            try:
+                await self.cleanup_expired_sessions()
+            except Exception as e:
+                logger.error("session_sweep_failed", error=str(e), exc_info=True)
+
+    async def _sessions_removed(self, session_ids: List[str]):
+        if self.on_sessions_removed is not None and session_ids:
+            await self.on_sessions_removed(session_ids)
+
+    async def create_session(self) -> str:
         """Create a new chat session and return session ID."""
+        if self.max_sessions > 0:
+            overflow = await self.store.count() - self.max_sessions + 1
+            if overflow > 0:
+                evicted = await self.store.evict_oldest(overflow)
+                await self._sessions_removed(evicted)
+                chat_sessions_removed_total.labels("capacity").inc(len(evicted))
+                logger.warning("sessions_evicted_at_capacity", count=len(evicted), max_sessions=self.max_sessions)
+
         session_id = str(uuid.uuid4())
-        self.sessions[session_id] = {
-            "created_at": datetime.now(),
-            "last_activity": datetime.now(),
-            "messages": [],
+        now = datetime.now()
+        await self.store.create(session_id, {
+            "created_at": now,
+            "last_activity": now,
             "language": "en",
-        }
+        })
+        chat_sessions_created_total.inc()
         logger.info("session_created", session_id=session_id)
         return session_id
-    
-    def get_session(self, session_id: str) -> Optional[Dict]:
+
+    async def get_session(self, session_id: str) -> Optional[Dict]:
         """Get session data by session ID."""
-        session = self.sessions.get(session_id)
-        
+        session = await self.store.load(session_id)
+
         if not session:
             return None
-        
+
         # Check if session has expired
         if datetime.now() - session["last_activity"] > self.session_timeout:
             logger.info("session_expired", session_id=session_id)
-            del self.sessions[session_id]
+            await self.store.delete(session_id)
+            await self._sessions_removed([session_id])
+            chat_sessions_removed_total.labels("expired").inc()
             return None
-        
+
         return session
-    
-    def update_session_activity(self, session_id: str):
+
+    async def update_session_activity(self, session_id: str):
         """Update last activity timestamp for session."""
-        if session_id in self.sessions:
-            self.sessions[session_id]["last_activity"] = datetime.now()
-    
-    def add_message_to_session(
-        self,
-        session_id: str,
-        role: str,
-        content: str,
-    ):
-        """Add message to session conversation history."""
-        if session_id not in self.sessions:
-            return
-        
-        self.sessions[session_id]["messages"].append({
-            "role": role,
-            "content": content,
-            "timestamp": datetime.now().isoformat(),
-        })
-        
-        # Keep only last 20 messages to prevent memory issues
-        if len(self.sessions[session_id]["messages"]) > 20:
-            self.sessions[session_id]["messages"] = self.sessions[session_id]["messages"][-20:]
-        
-        self.update_session_activity(session_id)
-    
-    def get_conversation_history(self, session_id: str) -> List[Dict[str, str]]:
-        """Get conversation history for session."""
-        session = self.get_session(session_id)
-        if not session:
-            return []
-        
-        # Return messages in format expected by AI service
-        return [
-            {"role": msg["role"], "content": msg["content"]}
-            for msg in session["messages"][:-1]  # Exclude last message (current user message)
-        ]
-    
-    def set_session_language(self, session_id: str, language: str):
+        await self.store.update(session_id, last_activity=datetime.now())
+
+    async def set_session_language(self, session_id: str, language: str):
         """Set language preference for session."""
-        if session_id in self.sessions:
-            self.sessions[session_id]["language"] = language
-    
-    def cleanup_expired_sessions(self):
+        await self.store.update(session_id, language=language)
+
+    async def cleanup_expired_sessions(self) -> int:
         """Remove expired sessions."""
-        now = datetime.now()
-        expired_sessions = [
-            session_id
-            for session_id, session in self.sessions.items()
-            if now - session["last_activity"] > self.session_timeout
-        ]
-        
-        for session_id in expired_sessions:
-            del self.sessions[session_id]
-            logger.info("session_cleaned_up", session_id=session_id)
-    
-    def get_session_count(self) -> int:
+        expired_sessions = await self.store.delete_expired(datetime.now() - self.session_timeout)
+        await self._sessions_removed(expired_sessions)
+
+        if expired_sessions:
+            chat_sessions_removed_total.labels("expired").inc(len(expired_sessions))
+            logger.info("sessions_cleaned_up", count=len(expired_sessions))
+        return len(expired_sessions)
+
+    async def get_session_count(self) -> int:
         """Get current number of active sessions."""
-        return len(self.sessions)
+        return await self.store.count()
 
 
 # Global session manager instance
-session_manager = SessionManager()
-
+session_manager = SessionManager(
+    store=create_session_store(),
+    session_timeout_minutes=settings.session_timeout_minutes,
+    max_sessions=settings.session_max_count,
+    sweep_interval_seconds=settings.session_sweep_interval_seconds,
+    on_sessions_removed=ai_service.delete_conversations,
+)
@@ -0,0 +1,368 @@
+"""
+Pluggable storage backends for chat sessions.
+The in-memory store keeps sessions in a process-local dict; the SQL store
+persists them through SQLAlchemy so they survive restarts and can be
+shared across workers. Sessions hold lifecycle metadata only (activity,
+language); their messages live in the AI service's conversation checkpoints.
+"""
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import time
+import structlog
+from sqlalchemy import bindparam, delete, func, insert, select, update
+
+from config import settings
+from models.tables import chat_sessions
+
+logger = structlog.get_logger()
+
+
+class SessionStore(ABC):
+    """Interface for chat session storage."""
+
+    async def start(self):
+        """Prepare the store (called on application startup)."""
+
+    async def close(self):
+        """Flush pending work and release resources (called on shutdown)."""
+
+    @abstractmethod
+    async def create(self, session_id: str, session: Dict):
+        """Persist a new session."""
+
+    @abstractmethod
+    async def load(self, session_id: str) -> Optional[Dict]:
+        """Load a session, or None."""
+
+    @abstractmethod
+    async def update(self, session_id: str, **fields):
+        """Update session fields (language, last_activity)."""
+
+    @abstractmethod
+    async def delete(self, session_id: str):
+        """Delete a session."""
+
+    @abstractmethod
+    async def delete_expired(self, cutoff: datetime) -> List[str]:
+        """Delete sessions idle since before cutoff and return their IDs."""
+
+    @abstractmethod
+    async def evict_oldest(self, n: int) -> List[str]:
+        """Delete the n least recently active sessions and return their IDs."""
+
+    @abstractmethod
+    async def count(self) -> int:
+        """Number of stored sessions."""
+
+
+class InMemorySessionStore(SessionStore):
+    """
+    Process-local session storage.
+
+    Sessions are kept in an OrderedDict ordered by last activity (every
+    touch moves a session to the end). With a uniform timeout this is also
+    expiry order, so sweeps and evictions only visit the sessions they remove.
+    """
+
+    def __init__(self):
+        self.sessions: "OrderedDict[str, Dict]" = OrderedDict()
+
+    async def create(self, session_id: str, session: Dict):
+        self.sessions[session_id] = session
+        self.sessions.move_to_end(session_id)
+
+    async def load(self, session_id: str) -> Optional[Dict]:
+        return self.sessions.get(session_id)
+
+    async def update(self, session_id: str, **fields):
+        session = self.sessions.get(session_id)
+        if session is not None:
+            session.update(fields)
+            if "last_activity" in fields:
+                self.sessions.move_to_end(session_id)
+
+    async def delete(self, session_id: str):
+        self.sessions.pop(session_id, None)
+
+    async def delete_expired(self, cutoff: datetime) -> List[str]:
+        expired = []
+        # Oldest activity first: stop at the first session that is still live
+        for session_id, session in self.sessions.items():
+            if session["last_activity"] >= cutoff:
+                break
+            expired.append(session_id)
+        for session_id in expired:
+            del self.sessions[session_id]
+        return expired
+
+    async def evict_oldest(self, n: int) -> List[str]:
+        evicted = []
+        while self.sessions and len(evicted) < n:
+            session_id, _ = self.sessions.popitem(last=False)
+            evicted.append(session_id)
+        return evicted
+
+    async def count(self) -> int:
+        return len(self.sessions)
+
+
+class SQLSessionStore(SessionStore):
+    """
+    SQLAlchemy-backed session storage.
+
+    - Reads go through an LRU cache of hot sessions with a short TTL, so
+      other workers' writes become visible after at most `cache_ttl` seconds.
+    - Field updates (activity, language) are buffered and flushed in one
+      transaction per batch (write-behind), either every `flush_interval`
+      seconds or as soon as `batch_size` writes are pending.
+    """
+
+    def __init__(
+        self,
+        database_url: str = "",
+        batch_size: int = 50,
+        flush_interval: float = 0.2,
+        cache_size: int = 1000,
+        cache_ttl: float = 5.0,
+    ):
+        self.database_url = database_url
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+
+        self._engine = None
+        self._ready = False
+        self._init_lock = asyncio.Lock()
+        # session_id -> (loaded_at, session); least -> most recently used
+        self._cache: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._pending_updates: Dict[str, Dict] = {}
+        self._pending_ids: set = set()
+        self._flush_lock = asyncio.Lock()
+        self._flush_wakeup = asyncio.Event()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def _ensure_ready(self):
+        """Create the engine and tables on first use."""
+        if self._ready:
+            return
+        async with self._init_lock:
+            if self._ready:
+                return
+            from services.database import get_engine, init_models
+
+            self._engine = get_engine(self.database_url)
+            await init_models(self._engine)
+            self._ready = True
+            logger.info("session_store_ready", backend="sql")
+
+    def _ensure_flusher(self):
+        """Start the background flush task if it is not running."""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def start(self):
+        await self._ensure_ready()
+        self._ensure_flusher()
+
+    async def close(self):
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        if self._ready:
+            await self.flush()
+
+    # Read-through cache
+
+    def _cache_get(self, session_id: str) -> Optional[Dict]:
+        entry = self._cache.get(session_id)
+        if entry is None:
+            return None
+        loaded_at, session = entry
+        if time.monotonic() - loaded_at > self.cache_ttl and session_id not in self._pending_ids:
+            del self._cache[session_id]
+            return None
+        self._cache.move_to_end(session_id)
+        return session
+
+    def _cache_put(self, session_id: str, session: Dict):
+        self._cache[session_id] = (time.monotonic(), session)
+        self._cache.move_to_end(session_id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    # Write-behind buffer
+
+    def _schedule_write(self):
+        self._ensure_flusher()
+        if len(self._pending_updates) >= self.batch_size:
+            self._flush_wakeup.set()
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_wakeup.clear()
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("session_flush_failed", error=str(e), exc_info=True)
+
+    async def flush(self):
+        """Write all buffered updates in one transaction."""
+        async with self._flush_lock:
+            if not self._pending_updates:
+                return
+            updates, self._pending_updates = self._pending_updates, {}
+            pending_ids, self._pending_ids = self._pending_ids, set()
+
+            await self._ensure_ready()
+            activity_rows = [
+                {"b_id": sid, "last_activity": fields["last_activity"]}
+                for sid, fields in updates.items()
+                if "last_activity" in fields
+            ]
+            language_rows = [
+                {"b_id": sid, "language": fields["language"]}
+                for sid, fields in updates.items()
+                if "language" in fields
+            ]
+            try:
+                async with self._engine.begin() as conn:
+                    if activity_rows:
+                        await conn.execute(
+                            update(chat_sessions)
+                            .where(chat_sessions.c.id == bindparam("b_id"))
+                            .values(last_activity=bindparam("last_activity")),
+                            activity_rows,
+                        )
+                    if language_rows:
+                        await conn.execute(
+                            update(chat_sessions)
+                            .where(chat_sessions.c.id == bindparam("b_id"))
+                            .values(language=bindparam("language")),
+                            language_rows,
+                        )
+            except Exception:
+                # Put the batch back so the next flush retries it
+                for sid, fields in updates.items():
+                    self._pending_updates[sid] = {**fields, **self._pending_updates.get(sid, {})}
+                self._pending_ids |= pending_ids
+                raise
+
+            logger.debug("session_store_flushed", updates=len(updates))
+
+    # SessionStore interface
+
+    async def create(self, session_id: str, session: Dict):
+        await self._ensure_ready()
+        async with self._engine.begin() as conn:
+            await conn.execute(
+                insert(chat_sessions).values(
+                    id=session_id,
+                    created_at=session["created_at"],
+                    last_activity=session["last_activity"],
+                    language=session["language"],
+                )
+            )
+        self._cache_put(session_id, session)
+
+    async def load(self, session_id: str) -> Optional[Dict]:
+        session = self._cache_get(session_id)
+        if session is not None:
+            return session
+
+        await self._ensure_ready()
+        if session_id in self._pending_ids:
+            await self.flush()
+
+        async with self._engine.connect() as conn:
+            row = (
+                await conn.execute(select(chat_sessions).where(chat_sessions.c.id == session_id))
+            ).first()
+        if row is None:
+            return None
+
+        session = {
+            "created_at": row.created_at,
+            "last_activity": row.last_activity,
+            "language": row.language,
+        }
+        self._cache_put(session_id, session)
+        return session
+
+    async def update(self, session_id: str, **fields):
+        session = self._cache_get(session_id)
+        if session is not None:
+            session.update(fields)
+        self._pending_updates.setdefault(session_id, {}).update(fields)
+        self._pending_ids.add(session_id)
+        self._schedule_write()
+
+    async def delete(self, session_id: str):
+        await self._ensure_ready()
+        self._cache.pop(session_id, None)
+        self._pending_updates.pop(session_id, None)
+        self._pending_ids.discard(session_id)
+        async with self._engine.begin() as conn:
+            await conn.execute(delete(chat_sessions).where(chat_sessions.c.id == session_id))
+
+    async def delete_expired(self, cutoff: datetime) -> List[str]:
+        await self._ensure_ready()
+        # Pending activity may make a session fresh again
+        await self.flush()
+        async with self._engine.begin() as conn:
+            expired = (
+                await conn.execute(
+                    select(chat_sessions.c.id).where(chat_sessions.c.last_activity < cutoff)
+                )
+            ).scalars().all()
+            if expired:
+                await conn.execute(delete(chat_sessions).where(chat_sessions.c.id.in_(expired)))
+        for session_id in expired:
+            self._cache.pop(session_id, None)
+        return list(expired)
+
+    async def evict_oldest(self, n: int) -> List[str]:
+        await self._ensure_ready()
+        await self.flush()
+        async with self._engine.begin() as conn:
+            evicted = (
+                await conn.execute(
+                    select(chat_sessions.c.id).order_by(chat_sessions.c.last_activity).limit(n)
+                )
+            ).scalars().all()
+            if evicted:
+                await conn.execute(delete(chat_sessions).where(chat_sessions.c.id.in_(evicted)))
+        for session_id in evicted:
+            self._cache.pop(session_id, None)
+        return list(evicted)
+
+    async def count(self) -> int:
+        await self._ensure_ready()
+        async with self._engine.connect() as conn:
+            return (await conn.execute(select(func.count()).select_from(chat_sessions))).scalar_one()
+
+
+def create_session_store() -> SessionStore:
+    """Build the session store selected by settings."""
+    if settings.session_store == "sql":
+        return SQLSessionStore(
+            database_url=settings.database_url,
+            batch_size=settings.session_write_batch_size,
+            flush_interval=settings.session_flush_interval_ms / 1000,
+            cache_size=settings.session_cache_size,
+            cache_ttl=settings.session_cache_ttl_seconds,
+        )
+    return InMemorySessionStore()
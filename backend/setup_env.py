@@ -30,26 +30,55 @@ HOST=0.0.0.0
 PORT=8000
 CORS_ORIGINS=http://localhost:3000,http://127.0.0.1:5500,file://
 
+# AI Provider ("fake" runs offline with a simulated model, for load tests)
+AI_PROVIDER=gemini
+
 # AI/Google Gemini Configuration
 GEMINI_API_KEY=
 GEMINI_MODEL=gemini-2.0-flash-exp
 AI_TEMPERATURE=0.7
 AI_MAX_TOKENS=500
+AI_MAX_CONCURRENCY=16
+AI_SYNC_EXECUTOR_WORKERS=4
+GEMINI_EXTRA_API_KEYS=
+GEMINI_FALLBACK_MODELS=
+AI_CIRCUIT_FAILURE_THRESHOLD=5
+AI_HEDGE_ENABLED=False
+AI_CACHE_ENABLED=True
+AI_CACHE_MAX_ENTRIES=512
+AI_CACHE_TTL_SECONDS=3600
 
 # Rate Limiting
 RATE_LIMIT_ENABLED=True
 RATE_LIMIT_PER_MINUTE=10
 RATE_LIMIT_PER_HOUR=60
+RATE_LIMIT_BACKEND=memory
 
 # Database (Optional)
 DATABASE_URL=
 
+# Contact Submissions
+CONTACT_PERSIST_ENABLED=True
+CONTACT_WEBHOOK_URL=
+
+# Chat Sessions (SESSION_STORE=sql persists sessions via DATABASE_URL, SQLite by default)
+SESSION_STORE=memory
+SESSION_TIMEOUT_MINUTES=30
+SESSION_MAX_COUNT=0
+SESSION_SWEEP_INTERVAL_SECONDS=60
+AI_CHECKPOINTER=
+HISTORY_TOKEN_BUDGET=1500
+HISTORY_SUMMARY_ENABLED=True
+
 # Security
 SECRET_KEY=change-this-secret-key-in-production
 ALLOWED_ORIGINS=http://localhost:3000,http://127.0.0.1:5500
 
 # Logging
 LOG_LEVEL=INFO
+LOG_ASYNC=True
+LOG_QUEUE_SIZE=10000
+LOG_SAMPLE_RATES=request_received@/api/health=0.01,request_completed@/api/health=0.01
 """)
         print(f"Created basic {env_file} file.")
         print("Please edit .env and configure your settings.")
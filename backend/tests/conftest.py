@@ -0,0 +1,44 @@
+"""
+Test configuration: offline fake LLM, no rate limiting, quiet logs.
+Settings are read at import time, so the environment is set before any app module loads.
+"""
+import os
+import sys
+
+os.environ.setdefault("ENVIRONMENT", "test")
+os.environ.setdefault("AI_PROVIDER", "fake")
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+from config import settings  # noqa: E402
+from services.response_cache import response_cache  # noqa: E402
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """
+    Instant, deterministic fake model for AIService tests, without the response
+    cache or retrieval. Tests that need latency set fake_llm_* on the returned settings.
+    """
+    monkeypatch.setattr(settings, "fake_llm_latency_ms", 0)
+    monkeypatch.setattr(settings, "fake_llm_latency_distribution", "fixed")
+    monkeypatch.setattr(settings, "fake_llm_tokens_per_second", 0)
+    monkeypatch.setattr(settings, "fake_llm_error_rate", 0)
+    monkeypatch.setattr(settings, "fake_llm_backends", 1)
+    monkeypatch.setattr(settings, "ai_retrieval_enabled", False)
+    monkeypatch.setattr(response_cache, "enabled", False)
+    return settings
+
+
+@pytest.fixture
+def client():
+    """Test client for the app, with startup and shutdown run around the test."""
+    from fastapi.testclient import TestClient
+
+    from app import app
+
+    with TestClient(app) as test_client:
+        yield test_client
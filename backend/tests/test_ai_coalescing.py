@@ -0,0 +1,133 @@
+"""
+Coalescing of identical in-flight opening questions.
+"""
+import asyncio
+
+import pytest
+
+from services.ai_service import AIService
+from services.fake_llm import DEFAULT_FAKE_RESPONSE, FakeChatModel
+
+QUESTION = "What do you work on?"
+
+
+@pytest.fixture
+def llm_calls(fake_llm, monkeypatch):
+    """Slow enough fake model for requests to overlap; returns the list of LLM calls made."""
+    monkeypatch.setattr(fake_llm, "fake_llm_latency_ms", 100)
+    monkeypatch.setattr(fake_llm, "fake_llm_tokens_per_second", 200)
+    calls = []
+    original_agenerate, original_astream = FakeChatModel._agenerate, FakeChatModel._astream
+
+    async def agenerate(self, *args, **kwargs):
+        calls.append("invoke")
+        return await original_agenerate(self, *args, **kwargs)
+
+    def astream(self, *args, **kwargs):
+        calls.append("stream")
+        return original_astream(self, *args, **kwargs)
+
+    monkeypatch.setattr(FakeChatModel, "_agenerate", agenerate)
+    monkeypatch.setattr(FakeChatModel, "_astream", astream)
+    return calls
+
+
+async def _stream(service: AIService, session_id: str, received: list = None) -> str:
+    parts = received if received is not None else []
+    async for part in service.stream_chat_response(QUESTION, session_id, "en"):
+        parts.append(part)
+    return "".join(parts)
+
+
+async def _history(service: AIService, session_id: str) -> list:
+    return [message["role"] for message in await service.get_conversation(session_id)]
+
+
+def test_identical_opening_questions_share_one_llm_call(llm_calls):
+    async def run():
+        service = AIService()
+        replies = await asyncio.gather(*(
+            service.get_chat_response(QUESTION, f"session-{number}", "en") for number in range(5)
+        ))
+        histories = [await _history(service, f"session-{number}") for number in range(5)]
+        coalesced = service.coalesced
+        await service.close()
+        return replies, histories, coalesced
+
+    replies, histories, coalesced = asyncio.run(run())
+    assert replies == [DEFAULT_FAKE_RESPONSE] * 5
+    assert len(llm_calls) == 1
+    assert coalesced == 4
+    # Every session records the exchange, not just the leader's
+    assert histories == [["user", "assistant"]] * 5
+
+
+def test_streamed_waiters_replay_the_shared_tokens(llm_calls):
+    async def run():
+        service = AIService()
+        replies = await asyncio.gather(*(_stream(service, f"session-{number}") for number in range(3)))
+        await service.close()
+        return replies
+
+    assert asyncio.run(run()) == [DEFAULT_FAKE_RESPONSE] * 3
+    assert len(llm_calls) == 1
+
+
+def test_follow_up_questions_are_not_coalesced(llm_calls):
+    async def run():
+        service = AIService()
+        await service.get_chat_response(QUESTION, "first", "en")
+        await service.get_chat_response(QUESTION, "second", "en")
+        # Same text, but a follow-up in "first": its answer depends on the conversation
+        await asyncio.gather(
+            service.get_chat_response(QUESTION, "first", "en"),
+            service.get_chat_response(QUESTION, "second", "en"),
+        )
+        await service.close()
+
+    asyncio.run(run())
+    # Two opening questions run one after the other, then two independent follow-ups
+    assert len(llm_calls) == 4
+
+
+def test_cancelling_the_leader_does_not_cancel_the_shared_call(llm_calls):
+    async def run():
+        service = AIService()
+        leader_parts = []
+        leader = asyncio.create_task(_stream(service, "leader", leader_parts))
+        while not leader_parts:
+            await asyncio.sleep(0.01)
+        follower = asyncio.create_task(_stream(service, "follower"))
+        await asyncio.sleep(0.02)
+
+        # The leader's client disconnects mid-stream
+        leader.cancel()
+        reply = await follower
+        histories = await _history(service, "leader"), await _history(service, "follower")
+        await service.close()
+        return leader.cancelled(), reply, histories
+
+    leader_cancelled, reply, histories = asyncio.run(run())
+    assert leader_cancelled
+    assert reply == DEFAULT_FAKE_RESPONSE
+    assert len(llm_calls) == 1
+    assert histories == (["user", "assistant"], ["user", "assistant"])
+
+
+def test_cancelling_a_waiter_leaves_the_others_served(llm_calls):
+    async def run():
+        service = AIService()
+        waiters = [
+            asyncio.create_task(service.get_chat_response(QUESTION, f"session-{number}", "en"))
+            for number in range(3)
+        ]
+        await asyncio.sleep(0.02)
+        waiters[1].cancel()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        await service.close()
+        return results
+
+    first, cancelled, last = asyncio.run(run())
+    assert isinstance(cancelled, asyncio.CancelledError)
+    assert first == last == DEFAULT_FAKE_RESPONSE
+    assert len(llm_calls) == 1
@@ -0,0 +1,28 @@
+"""
+Streaming chat responses.
+"""
+import asyncio
+
+from services.ai_service import AIService
+from services.fake_llm import DEFAULT_FAKE_RESPONSE
+
+
+def test_stream_excludes_background_summary_tokens(fake_llm, monkeypatch):
+    """Summary refreshes started during a turn must not leak into any streamed reply."""
+    monkeypatch.setattr(fake_llm, "history_max_recent_messages", 4)
+
+    async def run():
+        service = AIService()
+        replies = []
+        for turn in range(8):
+            parts = [part async for part in service.stream_chat_response(f"question {turn}", "session", "en")]
+            replies.append("".join(parts))
+            # Let the summary refresh started by this turn run, as it would between messages
+            await asyncio.sleep(0.05)
+        state = await service.agent.aget_state({"configurable": {"thread_id": "session"}})
+        await service.close()
+        return replies, state.values.get("summary")
+
+    replies, summary = asyncio.run(run())
+    assert summary, "no turn triggered a summary refresh"
+    assert replies == [DEFAULT_FAKE_RESPONSE] * len(replies)
@@ -0,0 +1,20 @@
+"""
+Chat history endpoint.
+"""
+from services.fake_llm import DEFAULT_FAKE_RESPONSE
+
+# Exempts the requests from the shared rate limiter
+HEADERS = {"x-test-mode": "true"}
+
+
+def test_history_serves_the_conversation_state(client):
+    """History lists both sides of every turn, as the AI service keeps them."""
+    first = client.post("/api/chat", json={"message": "hello"}, headers=HEADERS).json()
+    session_id = first["session_id"]
+    client.post("/api/chat", json={"message": "tell me more", "session_id": session_id}, headers=HEADERS)
+
+    history = client.get(f"/api/chat/history/{session_id}", headers=HEADERS).json()
+
+    assert history["message_count"] == 4
+    assert [m["content"] for m in history["messages"] if m["role"] == "user"] == ["hello", "tell me more"]
+    assert history["messages"][-1] == {"role": "assistant", "content": DEFAULT_FAKE_RESPONSE}
@@ -0,0 +1,86 @@
+"""
+Chat WebSocket (/api/chat/ws): turns, heartbeats, idle timeout and capacity.
+"""
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from config import settings
+
+WS_PATH = "/api/chat/ws"
+
+
+@pytest.fixture
+def fast_timers(monkeypatch):
+    monkeypatch.setattr(settings, "chat_ws_heartbeat_seconds", 0.05)
+    monkeypatch.setattr(settings, "chat_ws_idle_timeout_seconds", 10.0)
+    return settings
+
+
+def _receive_until_closed(ws, answer_pings: bool):
+    """Frame types received until the server closes the connection, and the close."""
+    frames = []
+    while True:
+        try:
+            frame = ws.receive_json()
+        except WebSocketDisconnect as closed:
+            return frames, closed
+        frames.append(frame["type"])
+        if answer_pings and frame["type"] == "ping":
+            ws.send_json({"type": "pong"})
+
+
+def test_message_is_answered_with_tokens_and_done(client):
+    with client.websocket_connect(WS_PATH) as ws:
+        session = ws.receive_json()
+        assert session["type"] == "session" and session["session_id"]
+
+        ws.send_json({"type": "message", "message": "Hello"})
+        tokens = []
+        while (frame := ws.receive_json())["type"] == "token":
+            tokens.append(frame["token"])
+        assert frame["type"] == "done" and frame["session_id"] == session["session_id"]
+        assert "".join(tokens)
+
+        ws.send_json({"type": "ping"})
+        assert ws.receive_json()["type"] == "pong"
+        ws.send_text("not json")
+        assert ws.receive_json()["type"] == "error"
+
+
+def test_silent_client_is_pinged_then_closed(client, fast_timers):
+    with client.websocket_connect(WS_PATH) as ws:
+        assert ws.receive_json()["type"] == "session"
+        frames, closed = _receive_until_closed(ws, answer_pings=False)
+
+    assert frames and set(frames) == {"ping"}
+    assert closed.code == 1001
+
+
+def test_idle_connection_is_closed_even_when_answering_pings(client, fast_timers, monkeypatch):
+    monkeypatch.setattr(settings, "chat_ws_idle_timeout_seconds", 0.3)
+    with client.websocket_connect(WS_PATH) as ws:
+        assert ws.receive_json()["type"] == "session"
+        frames, closed = _receive_until_closed(ws, answer_pings=True)
+
+    # Pongs kept the heartbeat alive; only the missing chat messages closed it
+    assert len(frames) >= 3 and set(frames) == {"ping"}
+    assert closed.code == 1000
+    assert closed.reason == "Idle timeout"
+
+
+def test_connections_over_capacity_are_closed_with_1013(client, monkeypatch):
+    monkeypatch.setattr(settings, "chat_ws_max_connections", 1)
+    with client.websocket_connect(WS_PATH) as first:
+        assert first.receive_json()["type"] == "session"
+        with client.websocket_connect(WS_PATH) as second:
+            with pytest.raises(WebSocketDisconnect) as closed:
+                second.receive_json()
+        assert closed.value.code == 1013
+
+        # The open connection is unaffected
+        first.send_json({"type": "ping"})
+        assert first.receive_json()["type"] == "pong"
+
+    # Its slot is released on close
+    with client.websocket_connect(WS_PATH) as ws:
+        assert ws.receive_json()["type"] == "session"
@@ -0,0 +1,35 @@
+"""
+Checkpointer selection.
+"""
+import asyncio
+
+import pytest
+
+from config import settings
+from services.checkpointer import LatestInMemorySaver, close_checkpointer, create_checkpointer
+
+
+def test_shared_sessions_default_to_the_sqlite_checkpointer(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "session_store", "sql")
+    monkeypatch.setattr(settings, "ai_checkpointer", "")
+    monkeypatch.setattr(settings, "ai_checkpoint_sqlite_path", str(tmp_path / "checkpoints.sqlite3"))
+
+    async def run():
+        checkpointer = await create_checkpointer()
+        await close_checkpointer(checkpointer)
+        return checkpointer
+
+    assert not isinstance(asyncio.run(run()), LatestInMemorySaver)
+
+
+def test_shared_sessions_refuse_in_memory_checkpoints(monkeypatch):
+    monkeypatch.setattr(settings, "session_store", "sql")
+    monkeypatch.setattr(settings, "ai_checkpointer", "memory")
+    with pytest.raises(RuntimeError):
+        asyncio.run(create_checkpointer())
+
+
+def test_local_sessions_keep_in_memory_checkpoints(monkeypatch):
+    monkeypatch.setattr(settings, "session_store", "memory")
+    monkeypatch.setattr(settings, "ai_checkpointer", "")
+    assert isinstance(asyncio.run(create_checkpointer()), LatestInMemorySaver)
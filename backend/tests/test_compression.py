@@ -0,0 +1,18 @@
+"""
+Content-encoding negotiation.
+"""
+from utils import compression
+from utils.compression import choose_encoding
+
+
+def test_wildcard_does_not_override_a_refusal(monkeypatch):
+    monkeypatch.setattr(compression, "SUPPORTED_ENCODINGS", ("gzip",))
+    assert choose_encoding("gzip;q=0, *") is None
+    assert choose_encoding("*") == "gzip"
+
+
+def test_wildcard_picks_the_next_encoding_not_refused(monkeypatch):
+    monkeypatch.setattr(compression, "SUPPORTED_ENCODINGS", ("br", "gzip"))
+    assert choose_encoding("br;q=0, *") == "gzip"
+    assert choose_encoding("br;q=0, gzip;q=0, *") is None
+    assert choose_encoding("br;q=0, gzip") == "gzip"
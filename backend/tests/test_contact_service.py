@@ -0,0 +1,93 @@
+"""
+Contact submission pipeline.
+"""
+import asyncio
+
+import httpx
+
+from services.contact_service import ContactPipeline, build_submission
+
+
+def _run_pipeline(failures: int, store_max_retries: int = 1):
+    """Queue one submission with _persist failing `failures` times; returns the attempted batches."""
+    attempts = []
+
+    async def run():
+        pipeline = ContactPipeline(workers=1, batch_linger=0, store_max_retries=store_max_retries)
+
+        async def persist(batch):
+            attempts.append(batch)
+            if len(attempts) <= failures:
+                raise ConnectionError("database unavailable")
+
+        pipeline._persist = persist
+        pipeline.enqueue(build_submission("Ada", "ada@example.com", "Hi", "Hello", None))
+        await pipeline.close()
+
+    asyncio.run(run())
+    return attempts
+
+
+def test_batch_is_retried_after_a_store_failure():
+    attempts = _run_pipeline(failures=1)
+    assert len(attempts) == 2
+    assert attempts[0] == attempts[1]
+
+
+def test_batch_is_dropped_after_the_last_retry():
+    assert len(_run_pipeline(failures=10)) == 2
+
+
+def test_worker_survives_a_failing_batch():
+    delivered = []
+
+    async def run():
+        pipeline = ContactPipeline(workers=1, batch_size=1, batch_linger=0, persist=False, webhook_url="http://hook")
+
+        async def deliver(submission):
+            if submission["name"] == "bad":
+                raise RuntimeError("unexpected")
+            delivered.append(submission["name"])
+
+        pipeline._deliver = deliver
+        pipeline.enqueue(build_submission("bad", "bad@example.com", "Hi", "Hello", None))
+        pipeline.enqueue(build_submission("good", "good@example.com", "Hi", "Hello", None))
+        await pipeline.close(timeout=2)
+
+    asyncio.run(run())
+    assert delivered == ["good"]
+
+
+def _deliver_via(monkeypatch, handler):
+    """Deliver one submission through a mock webhook transport; returns the requested paths."""
+    requests = []
+
+    def record(request):
+        requests.append(request.url.path)
+        return handler(request)
+
+    client_class = httpx.AsyncClient
+    monkeypatch.setattr(
+        httpx, "AsyncClient", lambda **kwargs: client_class(transport=httpx.MockTransport(record), **kwargs)
+    )
+
+    async def run():
+        pipeline = ContactPipeline(webhook_url="http://hook/contact", webhook_max_retries=1)
+        await pipeline._deliver(build_submission("Ada", "ada@example.com", "Hi", "Hello", None))
+        await pipeline.close()
+
+    asyncio.run(run())
+    return requests
+
+
+def test_webhook_redirects_are_followed(monkeypatch):
+    def handler(request):
+        if request.url.path == "/contact":
+            return httpx.Response(308, headers={"Location": "/v2/contact"})
+        return httpx.Response(200 if request.method == "POST" else 405)
+
+    assert _deliver_via(monkeypatch, handler) == ["/contact", "/v2/contact"]
+
+
+def test_webhook_client_errors_are_not_retried(monkeypatch):
+    assert _deliver_via(monkeypatch, lambda request: httpx.Response(404)) == ["/contact"]
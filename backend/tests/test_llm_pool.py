@@ -0,0 +1,104 @@
+"""
+LLM backend pool: circuit breakers, failover and hedging.
+"""
+import asyncio
+import time
+
+from langchain_core.messages import HumanMessage
+
+from services.fake_llm import FakeChatModel
+from services.llm_pool import CircuitBreaker, LLMBackend, LLMPool
+
+MESSAGES = [HumanMessage(content="Hello")]
+
+
+def _backend(name: str, latency: float = 0.0, error_rate: float = 0.0, failure_threshold: int = 5) -> LLMBackend:
+    llm = FakeChatModel(response=f"from {name}", latency_seconds=latency, error_rate=error_rate)
+    return LLMBackend(name, llm, failure_threshold=failure_threshold, reset_timeout=30.0)
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30.0)
+    breaker.record_failure(now=100.0)
+    breaker.record_success()
+    for _ in range(2):
+        breaker.record_failure(now=100.0)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure(now=100.0)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.available(now=129.9)
+    assert breaker.available(now=130.0)
+
+
+def test_half_open_breaker_lets_one_probe_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30.0)
+    breaker.record_failure(now=100.0)
+
+    breaker.acquire(now=130.0)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.available(now=130.0)
+
+    # A cancelled probe frees the slot without deciding anything
+    breaker.release()
+    assert breaker.available(now=130.0)
+
+    # A failed probe re-opens the circuit for another reset_timeout
+    breaker.acquire(now=131.0)
+    breaker.record_failure(now=131.0)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.available(now=160.0)
+
+    breaker.acquire(now=161.0)
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.available(now=161.0)
+
+
+def test_pool_fails_over_and_skips_an_open_backend():
+    failing, healthy = _backend("failing", error_rate=1.0, failure_threshold=2), _backend("healthy")
+    # Rank the failing backend first, so only its open circuit keeps it from being picked
+    failing.ewma_latency, healthy.ewma_latency = 0.001, 1.0
+    pool = LLMPool(backends=[failing, healthy])
+
+    async def run():
+        return [(await pool.ainvoke(MESSAGES)).content for _ in range(4)]
+
+    assert asyncio.run(run()) == ["from healthy"] * 4
+    assert failing.breaker.state == CircuitBreaker.OPEN
+    # Tried until its circuit opened, then skipped
+    assert failing.breaker.failures == 2
+
+
+def test_slow_backend_is_hedged():
+    slow, fast = _backend("slow", latency=2.0), _backend("fast", latency=0.01)
+    pool = LLMPool(backends=[slow, fast], hedge_enabled=True, hedge_min_delay=0.05, hedge_max_delay=0.05)
+
+    async def run():
+        started = time.monotonic()
+        response = await pool.ainvoke(MESSAGES)
+        return response.content, time.monotonic() - started
+
+    content, elapsed = asyncio.run(run())
+    assert content == "from fast"
+    assert elapsed < 1.0
+    # The losing attempt was cancelled: no call left running, and no failure recorded
+    assert slow.in_flight == 0
+    assert slow.breaker.failures == 0
+
+
+def test_streaming_is_hedged_until_the_first_token():
+    slow, fast = _backend("slow", latency=2.0), _backend("fast", latency=0.01)
+    pool = LLMPool(backends=[slow, fast], hedge_enabled=True, hedge_min_delay=0.05, hedge_max_delay=0.05)
+
+    async def run():
+        return "".join([chunk.content async for chunk in pool.astream(MESSAGES)])
+
+    assert asyncio.run(run()) == "from fast"
+    assert slow.in_flight == fast.in_flight == 0
+
+
+def test_without_hedging_the_first_backend_answers():
+    slow, fast = _backend("slow", latency=0.2), _backend("fast", latency=0.01)
+    pool = LLMPool(backends=[slow, fast], hedge_enabled=False)
+    assert asyncio.run(pool.ainvoke(MESSAGES)).content == "from slow"
@@ -0,0 +1,36 @@
+"""
+Async log sink lifecycle.
+"""
+import io
+import sys
+
+import structlog
+
+from config import settings
+from utils.logging_config import setup_logging, shutdown_logging
+
+
+def test_logging_resumes_after_shutdown(monkeypatch):
+    """A second setup_logging() restarts the writer, also for loggers cached before shutdown."""
+    monkeypatch.setattr(settings, "log_async", True)
+    monkeypatch.setattr(settings, "log_sample_rates", "")
+    stream = io.StringIO()
+    monkeypatch.setattr(sys, "stdout", stream)
+    try:
+        setup_logging()
+        logger = structlog.get_logger()
+        logger.error("before_shutdown")
+        shutdown_logging()
+
+        setup_logging()
+        logger.error("after_restart")
+        structlog.get_logger().error("new_logger_after_restart")
+        shutdown_logging()
+    finally:
+        monkeypatch.undo()
+        setup_logging()
+
+    output = stream.getvalue()
+    assert "before_shutdown" in output
+    assert "after_restart" in output
+    assert "new_logger_after_restart" in output
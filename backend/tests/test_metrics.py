@@ -0,0 +1,29 @@
+"""
+In-process metrics.
+"""
+import threading
+
+from utils.metrics import MetricsRegistry
+
+
+def test_updates_from_threads_are_not_lost():
+    registry = MetricsRegistry()
+    counter = registry.counter("test_events_total", "Events", ["kind"])
+    histogram = registry.histogram("test_latency_seconds", "Latency")
+    threads, per_thread = 8, 20000
+
+    def work():
+        for _ in range(per_thread):
+            counter.labels("a").inc()
+            histogram.observe(0.01)
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    output = registry.render()
+    assert f'test_events_total{{kind="a"}} {threads * per_thread}' in output
+    assert f"test_latency_seconds_count {threads * per_thread}" in output
+    assert f'test_latency_seconds_bucket{{le="+Inf"}} {threads * per_thread}' in output
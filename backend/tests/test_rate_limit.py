@@ -0,0 +1,114 @@
+"""
+Rate-limit backends.
+"""
+import sqlite3
+import time
+
+import pytest
+
+from middleware.rate_limit import (
+    HOUR_LIMIT_MESSAGE,
+    MINUTE_LIMIT_MESSAGE,
+    GCRARateLimiter,
+    SQLiteRateLimitBackend,
+)
+
+
+def test_gcra_allows_a_full_burst_then_refills_one_request_per_interval():
+    limiter = GCRARateLimiter(per_minute=6, per_hour=1000)
+    assert [limiter.check("client", now=0.0)[0] for _ in range(6)] == [False] * 6
+
+    is_limited, message, retry_after = limiter.check("client", now=0.0)
+    assert (is_limited, message) == (True, MINUTE_LIMIT_MESSAGE)
+    assert retry_after == 10.0  # One emission interval (60 s / 6)
+
+    assert limiter.check("client", now=9.9)[0] is True
+    assert limiter.check("client", now=10.0)[0] is False
+    assert limiter.check("client", now=10.0)[0] is True
+    # A full period of silence restores the whole burst
+    assert [limiter.check("client", now=80.0)[0] for _ in range(6)] == [False] * 6
+
+
+def test_gcra_rejections_do_not_consume_budget_and_clients_are_independent():
+    limiter = GCRARateLimiter(per_minute=2, per_hour=1000)
+    limiter.check("a", now=0.0)
+    limiter.check("a", now=0.0)
+    for _ in range(10):
+        assert limiter.check("a", now=0.0)[0] is True
+    assert limiter.check("a", now=30.0)[0] is False
+    assert limiter.check("b", now=0.0)[0] is False
+
+
+def test_gcra_hour_limit():
+    limiter = GCRARateLimiter(per_minute=100, per_hour=3)
+    for _ in range(3):
+        assert limiter.check("client", now=0.0)[0] is False
+    is_limited, message, retry_after = limiter.check("client", now=0.0)
+    assert (is_limited, message, retry_after) == (True, HOUR_LIMIT_MESSAGE, 1200.0)
+
+
+def test_gcra_drops_fully_decayed_clients():
+    limiter = GCRARateLimiter(per_minute=60, per_hour=3600)
+    for number in range(100):
+        limiter.check(f"client-{number}", now=0.0)
+    for _ in range(60):
+        limiter.check("recent", now=10_000.0)
+    assert list(limiter.clients) == ["recent"]
+
+
+def test_sqlite_backend_fails_open_while_another_worker_holds_the_lock(tmp_path):
+    path = str(tmp_path / "rate_limits.sqlite3")
+    backend = SQLiteRateLimitBackend(per_minute=1, per_hour=100, path=path)
+    assert backend.check("client", now=1000.0)[0] is False
+    assert backend.check("client", now=1000.0)[0] is True
+
+    other_worker = sqlite3.connect(path, isolation_level=None)
+    other_worker.execute("BEGIN IMMEDIATE")
+    try:
+        started = time.monotonic()
+        is_limited, _, _ = backend.check("client", now=1000.0)
+        waited = time.monotonic() - started
+    finally:
+        other_worker.execute("ROLLBACK")
+        other_worker.close()
+        backend.close()
+
+    assert is_limited is False
+    assert waited < 1.0
+
+
+def test_sqlite_backend_shares_one_budget_between_workers(tmp_path):
+    """Two backends on one file stand in for two worker processes with their own connections."""
+    path = str(tmp_path / "rate_limits.sqlite3")
+    first = SQLiteRateLimitBackend(per_minute=4, per_hour=1000, path=path)
+    second = SQLiteRateLimitBackend(per_minute=4, per_hour=1000, path=path)
+    try:
+        results = [backend.check("client", now=1000.0)[0] for backend in (first, second, first, second)]
+        assert results == [False] * 4
+
+        is_limited, message, retry_after = second.check("client", now=1000.0)
+        assert (is_limited, message) == (True, MINUTE_LIMIT_MESSAGE)
+        assert retry_after == 15.0
+        assert first.check("client", now=1000.0)[0] is True
+
+        # Refill is visible to both, and a request admitted by one is charged to the other
+        assert first.check("client", now=1015.0)[0] is False
+        assert second.check("client", now=1015.0)[0] is True
+        assert second.check("other", now=1000.0)[0] is False
+    finally:
+        first.close()
+        second.close()
+
+
+def test_sqlite_backend_matches_the_in_memory_limiter(tmp_path):
+    memory = GCRARateLimiter(per_minute=5, per_hour=20)
+    shared = SQLiteRateLimitBackend(per_minute=5, per_hour=20, path=str(tmp_path / "rate_limits.sqlite3"))
+    try:
+        for step in range(120):
+            now = 1000.0 + step * 3.7
+            expected_limited, expected_message, expected_retry = memory.check("client", now=now)
+            is_limited, message, retry_after = shared.check("client", now=now)
+            assert (is_limited, message) == (expected_limited, expected_message)
+            assert retry_after == pytest.approx(expected_retry)
+    finally:
+        shared.close()
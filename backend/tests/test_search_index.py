@@ -0,0 +1,20 @@
+"""
+Search index files.
+"""
+from services.search_index import IndexBuilder, SearchDocument
+
+
+def _digest(tmp_path, **overrides) -> str:
+    fields = {"id": "blog:rag", "type": "blog", "title": "RAG", "url": "blog.html?slug=rag", "text": "Retrieval"}
+    builder = IndexBuilder()
+    builder.add(SearchDocument(**{**fields, **overrides}))
+    return builder.write(str(tmp_path / "index.bin"), {})
+
+
+def test_digest_changes_with_result_metadata(tmp_path):
+    """Search ETags derive from the digest, so any field shown in results must change it."""
+    digest = _digest(tmp_path)
+    assert _digest(tmp_path) == digest
+    assert _digest(tmp_path, url="blog.html?slug=rag-systems") != digest
+    assert _digest(tmp_path, date="2025-01-15") != digest
+    assert _digest(tmp_path, type="project") != digest
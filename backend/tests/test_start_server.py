@@ -0,0 +1,129 @@
+"""
+Static site server (start-server.py): conditional requests and byte ranges.
+"""
+import functools
+import gzip
+import http.client
+import http.server
+import importlib.util
+import threading
+from pathlib import Path
+
+import pytest
+
+SCRIPT = Path(__file__).resolve().parents[2] / "start-server.py"
+
+_spec = importlib.util.spec_from_file_location("start_server", SCRIPT)
+start_server = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(start_server)
+
+PAGE = b"<html>" + b"portfolio " * 300 + b"</html>"
+IMAGE = bytes(range(256)) * 2048  # 512 KB: above the memory cache limit, sent with sendfile
+
+
+@pytest.fixture
+def server(tmp_path):
+    """Serve a small site from tmp_path; yields a function making one request."""
+    (tmp_path / "index.html").write_bytes(PAGE)
+    (tmp_path / "index.html.gz").write_bytes(gzip.compress(PAGE))
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "assets" / "photo.jpg").write_bytes(IMAGE)
+
+    handler = functools.partial(start_server.MyHTTPRequestHandler, directory=str(tmp_path))
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+
+    def request(path: str, headers: dict = None, method: str = "GET"):
+        conn = http.client.HTTPConnection("127.0.0.1", httpd.server_address[1], timeout=5)
+        conn.request(method, path, headers=headers or {})
+        response = conn.getresponse()
+        body = response.read()
+        conn.close()
+        return response, body
+
+    yield request
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_etag_revalidation_returns_304(server):
+    response, body = server("/index.html")
+    assert response.status == 200 and body == PAGE
+    assert response.getheader("Cache-Control") == "no-cache"
+    etag = response.getheader("ETag")
+
+    response, body = server("/index.html", {"If-None-Match": etag})
+    assert response.status == 304 and body == b""
+    assert response.getheader("ETag") == etag
+
+    response, _ = server("/index.html", {"If-None-Match": f'W/{etag}, "other"'})
+    assert response.status == 304
+    response, _ = server("/index.html", {"If-None-Match": '"stale"'})
+    assert response.status == 200
+
+
+def test_if_modified_since_returns_304(server):
+    last_modified = server("/index.html")[0].getheader("Last-Modified")
+    assert server("/index.html", {"If-Modified-Since": last_modified})[0].status == 304
+    assert server("/index.html", {"If-Modified-Since": "Thu, 01 Jan 1970 00:00:00 GMT"})[0].status == 200
+
+
+def test_precompressed_variant_has_its_own_etag(server):
+    plain = server("/index.html")[0]
+    response, body = server("/index.html", {"Accept-Encoding": "gzip"})
+    assert response.getheader("Content-Encoding") == "gzip"
+    assert gzip.decompress(body) == PAGE
+    assert response.getheader("Vary") == "Accept-Encoding"
+    assert response.getheader("ETag") != plain.getheader("ETag")
+    assert server("/index.html", {"Accept-Encoding": "gzip;q=0"})[0].getheader("Content-Encoding") is None
+
+
+@pytest.mark.parametrize("path, content", [("/index.html", PAGE), ("/assets/photo.jpg", IMAGE)])
+def test_byte_ranges(server, path, content):
+    response, body = server(path, {"Range": "bytes=10-19"})
+    assert response.status == 206 and body == content[10:20]
+    assert response.getheader("Content-Range") == f"bytes 10-19/{len(content)}"
+
+    response, body = server(path, {"Range": "bytes=-5"})
+    assert response.status == 206 and body == content[-5:]
+
+    response, body = server(path, {"Range": f"bytes={len(content) - 3}-"})
+    assert response.status == 206 and body == content[-3:]
+
+
+def test_unsatisfiable_and_invalid_ranges(server):
+    size = len(PAGE)
+    response, body = server("/index.html", {"Range": f"bytes={size}-"})
+    assert response.status == 416 and body == b""
+    assert response.getheader("Content-Range") == f"bytes */{size}"
+
+    # Invalid or unsupported ranges are ignored: the full file is served
+    for header in ("bytes=5-2", "bytes=0-1,5-6", "items=0-1"):
+        response, body = server("/index.html", {"Range": header})
+        assert response.status == 200 and body == PAGE
+
+
+def test_if_range_serves_the_range_only_for_the_current_version(server):
+    etag = server("/assets/photo.jpg")[0].getheader("ETag")
+    response, body = server("/assets/photo.jpg", {"Range": "bytes=0-3", "If-Range": etag})
+    assert response.status == 206 and body == IMAGE[:4]
+
+    response, body = server("/assets/photo.jpg", {"Range": "bytes=0-3", "If-Range": '"old"'})
+    assert response.status == 200 and body == IMAGE
+
+
+def test_head_sends_headers_without_a_body(server):
+    response, body = server("/assets/photo.jpg", method="HEAD")
+    assert response.status == 200 and body == b""
+    assert response.getheader("Content-Length") == str(len(IMAGE))
+    assert response.getheader("Cache-Control") == "public, max-age=604800"
+
+
+def test_parse_range():
+    assert start_server.parse_range("bytes=0-4", 10) == (0, 4)
+    assert start_server.parse_range("bytes=3-100", 10) == (3, 9)
+    assert start_server.parse_range("bytes=-3", 10) == (7, 9)
+    assert start_server.parse_range("bytes=5-2", 10) is None
+    assert start_server.parse_range("bytes=10-", 10) == "unsatisfiable"
+    assert start_server.parse_range("bytes=-0", 10) == "unsatisfiable"
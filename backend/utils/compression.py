@@ -0,0 +1,79 @@
+"""
+HTTP response compression helpers (gzip, and brotli when installed).
+"""
+from typing import Optional
+import gzip
+import zlib
+
+try:
+    import brotli
+except ImportError:  # Optional dependency; gzip only without it
+    brotli = None
+
+# Preferred encoding first
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Best supported encoding the client accepts, or None for identity."""
+    accepted, refused = set(), set()
+    for item in accept_encoding.lower().split(","):
+        token, _, params = item.strip().partition(";")
+        token = token.strip()
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    # Explicitly refused, even if "*" accepts everything else
+                    refused.add(token)
+                    continue
+            except ValueError:
+                continue
+        accepted.add(token)
+    for encoding in SUPPORTED_ENCODINGS:
+        if encoding in accepted or ("*" in accepted and encoding not in refused):
+            return encoding
+    return None
+
+
+def compress(data: bytes, encoding: str, level: int = 6) -> bytes:
+    """
+    Compress a complete body.
+
+    level follows gzip's 1-9 scale; for brotli it is mapped onto quality 0-11.
+    """
+    if encoding == "br":
+        return brotli.compress(data, quality=brotli_quality(level))
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def brotli_quality(level: int) -> int:
+    """Map a gzip-scale level (1-9) onto brotli quality (0-11)."""
+    return min(11, round(level * 11 / 9))
+
+
+class StreamCompressor:
+    """
+    Incremental compressor for bodies sent in several chunks.
+
+    Every compress() call returns its input flushed to a byte boundary, so the
+    client can decode each chunk (e.g. a server-sent event) as soon as it arrives.
+    """
+
+    def __init__(self, encoding: str, level: int = 6):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality(level))
+        else:
+            # wbits 16 + MAX_WBITS: gzip container
+            self._zlib = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.finish()
+        return self._zlib.flush(zlib.Z_FINISH)
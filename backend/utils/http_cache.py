@@ -0,0 +1,9 @@
+"""
+Conditional request helpers (ETag validation).
+"""
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak If-None-Match comparison against a strong ETag (W/ prefixes are ignored)."""
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
@@ -1,36 +1,257 @@
 """
 Structured logging configuration using structlog.
+
+Log events are enriched on the calling thread, then handed to a bounded
+queue; a background thread renders and writes them in batches, so a slow
+stdout never blocks the event loop. When the queue is full, events are
+dropped and counted instead of applying backpressure to requests.
 """
+import atexit
+import queue
+import random
 import structlog
 import logging
 import sys
+import threading
+from typing import Dict, List, Optional, TextIO, Tuple
 from config import settings
 
+# Rendered lines written per stream.write() call
+WRITE_BATCH_SIZE = 256
+
+_STOP = object()
+
+
+class QueueLogSink:
+    """Bounded queue of event dicts drained by a background writer thread."""
+
+    def __init__(self, render_processors: List, stream: TextIO, max_size: int = 10000):
+        # Final processors (exception formatting, renderer) run on the writer
+        self.render_processors = render_processors
+        self.stream = stream
+        self.queue: "queue.Queue" = queue.Queue(maxsize=max_size)
+        self.dropped = 0
+        self._reported_dropped = 0
+        self._thread: Optional[threading.Thread] = None
+        self.start()
+
+    def start(self):
+        """Start the writer thread if it is not running (again, after close())."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, event_dict: Dict):
+        """Enqueue an event without blocking; count it as dropped if full."""
+        try:
+            self.queue.put_nowait(event_dict)
+        except queue.Full:
+            self.dropped += 1
+
+    def _render(self, event_dict: Dict) -> str:
+        method_name = event_dict.get("level", "info")
+        try:
+            for processor in self.render_processors:
+                event_dict = processor(None, method_name, event_dict)
+            return event_dict
+        except Exception as e:
+            return f"log_render_failed error={e!r} event={event_dict!r}"
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = _STOP in batch
+            lines = [self._render(event) for event in batch if event is not _STOP]
+
+            # Report drops from the writer itself; the queue may be full
+            if self.dropped != self._reported_dropped:
+                lines.append(self._render({
+                    "event": "log_events_dropped",
+                    "level": "warning",
+                    "dropped_total": self.dropped,
+                    "dropped_since_last_report": self.dropped - self._reported_dropped,
+                }))
+                self._reported_dropped = self.dropped
+
+            if lines:
+                try:
+                    self.stream.write("\n".join(lines) + "\n")
+                    self.stream.flush()
+                except Exception:
+                    pass
+            if stop:
+                return
+
+    def close(self, timeout: float = 2.0):
+        """Flush queued events and stop the writer thread."""
+        if not self._thread.is_alive():
+            return
+        try:
+            self.queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "queued": self.queue.qsize(),
+            "max_size": self.queue.maxsize,
+            "dropped": self.dropped,
+        }
+
+
+class QueueLogger:
+    """structlog logger that forwards the processed event dict to a sink."""
+
+    def __init__(self, sink: QueueLogSink):
+        self._sink = sink
+
+    def msg(self, **event_dict):
+        self._sink.put(event_dict)
+
+    log = debug = info = warn = warning = msg
+    fatal = failure = err = error = critical = exception = msg
+
+
+class QueueLoggerFactory:
+    """structlog logger factory returning QueueLoggers bound to one sink."""
+
+    def __init__(self, sink: QueueLogSink):
+        self._sink = sink
+
+    def __call__(self, *args) -> QueueLogger:
+        return QueueLogger(self._sink)
+
+
+class EventSampler:
+    """
+    structlog processor that keeps only a fraction of high-volume events.
+
+    Rules are "event=rate" or "event@path=rate" (rate in [0, 1]). Events at
+    warning level or above, and request events with a 4xx/5xx status, are
+    always kept.
+    """
+
+    ALWAYS_KEEP_LEVELS = frozenset(["warning", "error", "critical", "exception"])
+
+    def __init__(self, rules: Dict[Tuple[str, Optional[str]], float]):
+        self.rules = rules
+        self.events = frozenset(event for event, _ in rules)
+
+    @classmethod
+    def from_string(cls, spec: str) -> "EventSampler":
+        rules = {}
+        for item in spec.split(","):
+            item = item.strip()
+            if not item or "=" not in item:
+                continue
+            key, rate = item.rsplit("=", 1)
+            event, _, path = key.strip().partition("@")
+            rules[(event, path or None)] = min(max(float(rate), 0.0), 1.0)
+        return cls(rules)
+
+    def __call__(self, logger, method_name: str, event_dict: Dict) -> Dict:
+        event = event_dict.get("event")
+        if event not in self.events:
+            return event_dict
+        if event_dict.get("level", method_name) in self.ALWAYS_KEEP_LEVELS:
+            return event_dict
+        if event_dict.get("status_code", 0) >= 400:
+            return event_dict
+
+        rate = self.rules.get((event, event_dict.get("path")))
+        if rate is None:
+            rate = self.rules.get((event, None))
+        if rate is not None and random.random() >= rate:
+            raise structlog.DropEvent
+        return event_dict
+
+
+def capture_exc_info(logger, method_name: str, event_dict: Dict) -> Dict:
+    """Resolve exc_info=True to the active exception before leaving this thread."""
+    exc_info = event_dict.get("exc_info")
+    if exc_info is True:
+        exc_info = sys.exc_info()
+        event_dict["exc_info"] = exc_info if exc_info[0] is not None else False
+    elif isinstance(exc_info, BaseException):
+        event_dict["exc_info"] = (type(exc_info), exc_info, exc_info.__traceback__)
+    return event_dict
+
+
+_sink: Optional[QueueLogSink] = None
+
 
 def setup_logging():
     """Configure structured logging for the application."""
+    global _sink
+
     # Configure standard library logging
     logging.basicConfig(
         format="%(message)s",
         stream=sys.stdout,
         level=getattr(logging, settings.log_level.upper(), logging.INFO),
     )
-    
+
+    if settings.debug:
+        render_processors = [structlog.dev.ConsoleRenderer()]
+    else:
+        render_processors = [structlog.processors.format_exc_info, structlog.processors.JSONRenderer()]
+
+    processors: List = [
+        structlog.contextvars.merge_contextvars,
+        structlog.processors.add_log_level,
+    ]
+    if settings.log_sample_rates:
+        processors.append(EventSampler.from_string(settings.log_sample_rates))
+    processors += [
+        structlog.processors.StackInfoRenderer(),
+        structlog.dev.set_exc_info,
+        capture_exc_info,
+        structlog.processors.TimeStamper(fmt="iso"),
+    ]
+
+    if settings.log_async:
+        if _sink is None:
+            _sink = QueueLogSink(render_processors, sys.stdout, max_size=settings.log_queue_size)
+            atexit.register(_sink.close)
+        else:
+            # Reuse the sink: loggers cached on first use still hold it.
+            # Its writer is restarted if shutdown_logging() stopped it.
+            _sink.render_processors = render_processors
+            _sink.stream = sys.stdout
+            _sink.start()
+        logger_factory = QueueLoggerFactory(_sink)
+    else:
+        processors += render_processors
+        logger_factory = structlog.PrintLoggerFactory()
+
     # Configure structlog
     structlog.configure(
-        processors=[
-            structlog.contextvars.merge_contextvars,
-            structlog.processors.add_log_level,
-            structlog.processors.StackInfoRenderer(),
-            structlog.dev.set_exc_info,
-            structlog.processors.TimeStamper(fmt="iso"),
-            structlog.dev.ConsoleRenderer() if settings.debug else structlog.processors.JSONRenderer(),
-        ],
+        processors=processors,
         wrapper_class=structlog.make_filtering_bound_logger(
             getattr(logging, settings.log_level.upper(), logging.INFO)
         ),
         context_class=dict,
-        logger_factory=structlog.PrintLoggerFactory(),
+        logger_factory=logger_factory,
         cache_logger_on_first_use=True,
     )
 
+
+def shutdown_logging():
+    """Flush pending log events (application shutdown)."""
+    if _sink is not None:
+        _sink.close()
+
+
+def get_log_stats() -> Dict[str, int]:
+    """Queue depth and drop counter of the async log sink."""
+    if _sink is None:
+        return {"queued": 0, "max_size": 0, "dropped": 0}
+    return _sink.get_stats()
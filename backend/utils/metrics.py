@@ -0,0 +1,293 @@
+"""
+Minimal in-process metrics with Prometheus text exposition.
+
+Metric children are created once per label combination and cached, so
+recording a value is a dict lookup plus integer/float updates under an
+uncontended per-metric lock, with no per-request metric objects. The lock
+is needed because some updates come from worker threads (e.g. sync LLM
+calls run in an executor), not only from the event loop.
+"""
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+import threading
+
+# Latency buckets in seconds, from fast API calls to slow LLM completions
+DEFAULT_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+SIZE_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        # Shared by the children: guards their updates and the creation of new ones
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        """Get (or create) the child for a label combination."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._new_child()
+                    self._children[values] = child
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def collect(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        with self._lock:
+            children = [(values, child.snapshot()) for values, child in self._children.items()]
+        for values, child in children:
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def _render_child(self, values, child) -> List[str]:
+        raise NotImplementedError
+
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self, lock: threading.Lock):
+        self.value = 0.0
+        self._lock = lock
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def set(self, value: float):
+        self.value = value
+
+    def snapshot(self) -> "_Value":
+        copy = _Value(self._lock)
+        copy.value = self.value
+        return copy
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    type_name = "counter"
+
+    def _new_child(self):
+        return _Value(self._lock)
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def _render_child(self, values, child) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"]
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    type_name = "gauge"
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+
+class _HistogramValue:
+    __slots__ = ("upper_bounds", "counts", "sum", "count", "_lock")
+
+    def __init__(self, upper_bounds: Tuple[float, ...], lock: threading.Lock):
+        self.upper_bounds = upper_bounds
+        self.counts = [0] * (len(upper_bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = lock
+
+    def observe(self, value: float):
+        bucket = bisect_left(self.upper_bounds, value)
+        with self._lock:
+            self.counts[bucket] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self) -> "_HistogramValue":
+        """Consistent copy for rendering (buckets, sum and count from the same moment)."""
+        copy = _HistogramValue(self.upper_bounds, self._lock)
+        copy.counts = list(self.counts)
+        copy.sum = self.sum
+        copy.count = self.count
+        return copy
+
+
+class Histogram(_Metric):
+    """Distribution of observations in fixed buckets."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.upper_bounds = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramValue(self.upper_bounds, self._lock)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def _render_child(self, values, child) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.upper_bounds + (float("inf"),), child.counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, values, f'le="{_format_value(float(bound))}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+        lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them in Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], None]):
+        """Register a callback that refreshes gauges right before rendering."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            collector()
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+# Global registry and application metrics
+registry = MetricsRegistry()
+
+http_requests_total = registry.counter(
+    "http_requests_total", "HTTP requests by method, route and status.", ("method", "route", "status")
+)
+http_request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency in seconds.", ("method", "route")
+)
+llm_request_duration_seconds = registry.histogram(
+    "llm_request_duration_seconds", "LLM call latency in seconds.", ("model",)
+)
+llm_errors_total = registry.counter(
+    "llm_errors_total", "Failed LLM calls by error type.", ("model", "error_type")
+)
+llm_output_chars = registry.histogram(
+    "llm_output_chars", "Size of LLM responses in characters.", ("model",), buckets=SIZE_BUCKETS
+)
+llm_backend_requests_total = registry.counter(
+    "llm_backend_requests_total", "LLM pool backend calls by outcome.", ("backend", "outcome")
+)
+llm_backend_circuit_state = registry.gauge(
+    "llm_backend_circuit_state", "LLM pool backend circuit (0 closed, 1 half-open, 2 open).", ("backend",)
+)
+llm_hedged_requests_total = registry.counter(
+    "llm_hedged_requests_total", "Hedged LLM calls started and won by the backup backend.", ("outcome",)
+)
+llm_in_flight = registry.gauge("llm_in_flight", "LLM calls currently running.")
+llm_waiting = registry.gauge("llm_waiting", "LLM calls waiting for a concurrency slot.")
+http_compressed_responses_total = registry.counter(
+    "http_compressed_responses_total", "Responses compressed by the compression middleware.", ("encoding",)
+)
+http_compression_saved_bytes_total = registry.counter(
+    "http_compression_saved_bytes_total", "Response bytes saved by compression.", ("encoding",)
+)
+rate_limit_rejections_total = registry.counter(
+    "rate_limit_rejections_total", "Requests rejected by the rate limiter.", ("limit",)
+)
+chat_active_sessions = registry.gauge("chat_active_sessions", "Stored chat sessions.")
+chat_sessions_created_total = registry.counter("chat_sessions_created_total", "Chat sessions created.")
+chat_websocket_connections = registry.gauge("chat_websocket_connections", "Open chat WebSocket connections.")
+chat_websocket_closed_total = registry.counter(
+    "chat_websocket_closed_total", "Chat WebSocket connections closed by reason.", ("reason",)
+)
+chat_sessions_removed_total = registry.counter(
+    "chat_sessions_removed_total", "Chat sessions removed by reason.", ("reason",)
+)
+chat_history_tokens = registry.histogram(
+    "chat_history_tokens", "Estimated history tokens sent per chat turn.", buckets=SIZE_BUCKETS
+)
+chat_context_tokens = registry.histogram(
+    "chat_context_tokens", "Estimated retrieved portfolio context tokens sent per chat turn.", buckets=SIZE_BUCKETS
+)
+chat_history_summaries_total = registry.counter(
+    "chat_history_summaries_total", "Rolling history summary refreshes by outcome.", ("outcome",)
+)
+ai_cache_hits_total = registry.counter("ai_cache_hits_total", "AI response cache hits.")
+ai_cache_misses_total = registry.counter("ai_cache_misses_total", "AI response cache misses.")
+ai_cache_hit_ratio = registry.gauge("ai_cache_hit_ratio", "AI response cache hit ratio.")
+ai_requests_coalesced_total = registry.counter(
+    "ai_requests_coalesced_total", "Chat requests served by joining an identical in-flight LLM call."
+)
+contact_submissions_total = registry.counter(
+    "contact_submissions_total", "Contact submissions by pipeline outcome.", ("outcome",)
+)
+contact_queue_depth = registry.gauge("contact_queue_depth", "Contact submissions waiting to be processed.")
+log_events_dropped_total = registry.counter(
+    "log_events_dropped_total", "Log events dropped because the log queue was full."
+)
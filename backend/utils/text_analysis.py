@@ -0,0 +1,95 @@
+"""
+Text analysis for search: tokenization, normalization and light stemming
+of English and Arabic text (mixed-script text is handled token by token).
+"""
+from typing import Iterator, List, Tuple
+import re
+import unicodedata
+
+# Arabic diacritics, Quranic annotation marks and tatweel: written inside words
+# but not part of their spelling, so they are kept in tokens and then removed
+_ARABIC_MARKS = "\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640"
+TOKEN_PATTERN = re.compile(rf"[\w{_ARABIC_MARKS}]+")
+_ARABIC_MARKS_PATTERN = re.compile(f"[{_ARABIC_MARKS}]")
+_ARABIC_LETTER = re.compile(r"[\u0620-\u064a\u0671-\u06d3]")
+
+# Letter variants that are commonly written interchangeably, and Arabic-Indic digits
+_ARABIC_NORMALIZATION = str.maketrans({
+    "أ": "ا",  # alef with hamza above -> alef
+    "إ": "ا",  # alef with hamza below -> alef
+    "آ": "ا",  # alef with madda -> alef
+    "ٱ": "ا",  # alef wasla -> alef
+    "ى": "ي",  # alef maksura -> yeh
+    "ة": "ه",  # teh marbuta -> heh
+    **{chr(0x0660 + d): str(d) for d in range(10)},
+    **{chr(0x06F0 + d): str(d) for d in range(10)},
+})
+
+# Light stemming (after Larkey et al.'s "light10"): strip the definite article
+# and attached conjunctions/prepositions, then common plural and pronoun suffixes
+_ARABIC_PREFIXES = ("وال", "بال", "كال", "فال", "لل", "ال")
+_ARABIC_SUFFIXES = ("ها", "ان", "ات", "ون", "ين", "يه", "ه", "ي")
+
+ENGLISH_STOPWORDS = frozenset("""
+a an and are as at be but by for from has have how i in into is it its of on or our
+so than that the their then there these they this to was we were what when which who
+will with you your
+""".split())
+
+# Normalized spellings (e.g. "إلى" -> "الي")
+ARABIC_STOPWORDS = frozenset("""
+في من علي الي عن مع هذا هذه ذلك تلك التي الذي الذين ان او ثم قد لا ما لم لن هو هي هم
+كان كانت كل بين بعد قبل عند حتي اذا اي ليس غير و ف ب ل ك
+""".split())
+
+
+def _stem_arabic(word: str) -> str:
+    if len(word) > 3 and word.startswith("و"):
+        word = word[1:]
+    for prefix in _ARABIC_PREFIXES:
+        if word.startswith(prefix) and len(word) - len(prefix) >= 2:
+            word = word[len(prefix):]
+            break
+    for suffix in _ARABIC_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 2:
+            word = word[:-len(suffix)]
+    return word
+
+
+def _stem_english(word: str) -> str:
+    """Plural stripping (Harman's S-stemmer): conservative, so matches stay predictable."""
+    if len(word) > 3:
+        if word.endswith("ies") and not word.endswith(("eies", "aies")):
+            return word[:-3] + "y"
+        if word.endswith("es") and not word.endswith(("aes", "ees", "oes")):
+            return word[:-1]
+        if word.endswith("s") and not word.endswith(("us", "ss")):
+            return word[:-1]
+    return word
+
+
+def normalize_token(token: str) -> str:
+    """Index term for a raw token, or "" for stopwords."""
+    token = unicodedata.normalize("NFKC", token).casefold()
+    if _ARABIC_LETTER.search(token):
+        token = _ARABIC_MARKS_PATTERN.sub("", token).translate(_ARABIC_NORMALIZATION)
+        if token in ARABIC_STOPWORDS:
+            return ""
+        return _stem_arabic(token)
+    token = token.translate(_ARABIC_NORMALIZATION)
+    if token in ENGLISH_STOPWORDS:
+        return ""
+    return _stem_english(token)
+
+
+def analyze_with_spans(text: str) -> Iterator[Tuple[str, int, int]]:
+    """Yield (term, start, end) for each indexable token; offsets refer to the original text."""
+    for match in TOKEN_PATTERN.finditer(text):
+        term = normalize_token(match.group())
+        if term:
+            yield term, match.start(), match.end()
+
+
+def analyze(text: str) -> List[str]:
+    """Index terms of a text, in order (stopwords removed)."""
+    return [term for term, _, _ in analyze_with_spans(text)]
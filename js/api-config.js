@@ -13,8 +13,13 @@ const API_BASE_URL = (typeof window !== 'undefined' && window.API_BASE_URL) || '
 const API_ENDPOINTS = {
   contact: `${API_BASE_URL}/api/contact`,
   chat: `${API_BASE_URL}/api/chat`,
+  chatStream: `${API_BASE_URL}/api/chat/stream`,
+  chatSocket: (sessionId, lang = 'en') => `${API_BASE_URL.replace(/^http/, 'ws')}/api/chat/ws?session_id=${encodeURIComponent(sessionId || '')}&language=${lang}`,
   chatHistory: (sessionId) => `${API_BASE_URL}/api/chat/history/${sessionId}`,
   health: `${API_BASE_URL}/api/health`,
+  content: (lang, section = '') => `${API_BASE_URL}/api/content/${lang}${section ? `?section=${encodeURIComponent(section)}` : ''}`,
+  blog: (slug, lang = 'en') => `${API_BASE_URL}/api/blog/${encodeURIComponent(slug)}?lang=${lang}`,
+  search: (query, lang = 'en') => `${API_BASE_URL}/api/search?q=${encodeURIComponent(query)}&lang=${lang}`,
 };
 
 // Helper function to get API endpoint
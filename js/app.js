@@ -116,7 +116,7 @@ function renderProjects(projects) {
     cardWrapper.style.animationDelay = `${index * 0.1}s`;
     
     const imageHtml = project.image 
-      ? `<img src="${project.image}" alt="${project.title}" class="w-full h-48 object-cover group-hover:scale-110 transition-smooth duration-300" />`
+      ? responsiveImage(project.image, project.title, "w-full h-48 object-cover group-hover:scale-110 transition-smooth duration-300", { sizes: "(min-width: 1024px) 33vw, (min-width: 768px) 50vw, 100vw" })
       : `<div class="w-full h-48 bg-gradient-to-br from-blue-400 to-purple-500 flex items-center justify-center">
            <i class="fas fa-project-diagram text-white text-6xl"></i>
          </div>`;
@@ -188,7 +188,7 @@ function renderTestimonials(testimonials) {
       </p>
       <div class="flex items-center gap-4">
         ${testimonial.avatar ? `
-          <img src="${testimonial.avatar}" alt="${testimonial.author}" class="w-12 h-12 rounded-full" />
+          ${responsiveImage(testimonial.avatar, testimonial.author, "w-12 h-12 rounded-full object-cover", { sizes: "48px" })}
         ` : `
           <div class="w-12 h-12 rounded-full bg-gradient-to-br from-blue-400 to-purple-500 flex items-center justify-center">
             <i class="fas fa-user text-white"></i>
@@ -224,7 +224,7 @@ function renderBlog(articles) {
     const formattedDate = date.toLocaleDateString('en-US', { year: 'numeric', month: 'long', day: 'numeric' });
     
     const imageHtml = article.image 
-      ? `<img src="${article.image}" alt="${article.title}" class="w-full h-48 object-cover group-hover:scale-110 transition-smooth duration-300" />`
+      ? responsiveImage(article.image, article.title, "w-full h-48 object-cover group-hover:scale-110 transition-smooth duration-300", { sizes: "(min-width: 1024px) 33vw, (min-width: 768px) 50vw, 100vw" })
       : `<div class="w-full h-48 bg-gradient-to-br from-blue-400 to-purple-500 flex items-center justify-center">
            <i class="fas fa-newspaper text-white text-6xl"></i>
          </div>`;
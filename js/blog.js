@@ -23,59 +23,77 @@ function getBlogSlug() {
 }
 
 /**
- * Load blog metadata from JSON
+ * Load a rendered blog post (HTML, metadata and table of contents).
+ * Uses the blog API (rendered and cached on the server) and falls back to
+ * rendering the static markdown file in the browser when the backend is not reachable.
  */
-async function loadBlogMetadata(slug) {
-  try {
-    const lang = getCurrentLang();
-    const res = await fetch(`data/content.${lang}.json`);
-    
-    if (!res.ok) {
-      console.error(`Failed to fetch content.${lang}.json: HTTP ${res.status}`);
-      throw new Error(`Failed to load blog metadata: HTTP ${res.status}`);
-    }
-    
-    const data = await res.json();
-    
-    const blog = data.blog?.find(b => {
-      // Extract slug from link or generate from title
-      const blogSlug = b.slug || b.link?.split('?slug=')[1] || b.link?.split('?id=')[1] || 
-                       b.title.toLowerCase().replace(/\s+/g, '-').replace(/[^a-z0-9-]/g, '');
-      return blogSlug === slug;
-    });
-    
-    if (!blog) {
-      console.warn('Blog metadata not found for slug:', slug);
+async function fetchBlogPost(slug) {
+  const lang = getCurrentLang();
+  if (typeof API_ENDPOINTS !== 'undefined' && API_ENDPOINTS.blog) {
+    try {
+      const res = await fetch(getApiEndpoint(API_ENDPOINTS.blog, slug, lang));
+      if (res.ok) {
+        return await res.json();
+      }
+      console.warn(`Blog API returned HTTP ${res.status}, using static markdown file`);
+    } catch (error) {
+      console.warn('Blog API unreachable, using static markdown file:', error);
     }
-    
-    return blog || null;
-  } catch (error) {
-    console.error('Error loading blog metadata:', error);
-    throw error; // Re-throw to be caught by loadBlogPost
   }
+  
+  return await fetchStaticBlogPost(slug, lang);
+}
+
+/**
+ * Build the same post document as the API from data/blogs/{slug}.md and the blog entry
+ * in the content file. The translated file (slug.{lang}.md) is preferred when present.
+ */
+async function fetchStaticBlogPost(slug, lang) {
+  const [markdown, metadata] = await Promise.all([
+    loadMarkdownContent(slug, lang),
+    loadBlogMetadata(slug, lang),
+    loadMarked(),
+  ]);
+  const { frontmatter, content } = parseFrontmatter(markdown);
+  const html = marked.parse(content);
+  
+  // Frontmatter takes precedence over the content file, as on the server
+  return {
+    title: frontmatter.title || metadata.title || '',
+    date: frontmatter.date || metadata.date || '',
+    image: frontmatter.image || metadata.image || '',
+    excerpt: frontmatter.excerpt || frontmatter.description || metadata.excerpt || '',
+    html,
+    toc: generateTableOfContents(html),
+  };
 }
 
 /**
  * Load markdown content from file
  */
-async function loadMarkdownContent(slug) {
+async function loadMarkdownContent(slug, lang) {
+  const translated = await fetch(`data/blogs/${encodeURIComponent(slug)}.${lang}.md`);
+  if (translated.ok) {
+    return await translated.text();
+  }
+  
+  const res = await fetch(`data/blogs/${encodeURIComponent(slug)}.md`);
+  if (!res.ok) {
+    throw new Error(`Blog post not found (HTTP ${res.status})`);
+  }
+  return await res.text();
+}
+
+/**
+ * Blog entry for a slug from the site content; missing metadata is not an error
+ */
+async function loadBlogMetadata(slug, lang) {
   try {
-    const lang = getCurrentLang();
-    const res = await fetch(`data/blogs/${slug}.md`);
-    
-    if (!res.ok) {
-      // Try with language suffix
-      const resLang = await fetch(`data/blogs/${slug}.${lang}.md`);
-      if (resLang.ok) {
-        return await resLang.text();
-      }
-      throw new Error(`Markdown file not found: ${slug}.md (HTTP ${res.status})`);
-    }
-    
-    return await res.text();
+    const { blog = [] } = await getContent(lang, 'blog');
+    return blog.find(entry => (entry.slug || entry.link?.split('?slug=')[1]) === slug) || {};
   } catch (error) {
-    console.error('Error loading markdown:', error);
-    throw new Error(`Failed to load markdown file: ${error.message}`);
+    console.warn('Failed to load blog metadata, using frontmatter only:', error);
+    return {};
   }
 }
 
@@ -83,58 +101,102 @@ async function loadMarkdownContent(slug) {
  * Extract frontmatter from markdown
  */
 function parseFrontmatter(markdown) {
-  const frontmatterRegex = /^---\s*\n([\s\S]*?)\n---\s*\n([\s\S]*)$/;
-  const match = markdown.match(frontmatterRegex);
-  
-  if (match) {
-    const frontmatter = {};
-    const content = match[2];
-    
-    match[1].split('\n').forEach(line => {
-      const colonIndex = line.indexOf(':');
-      if (colonIndex > 0) {
-        const key = line.substring(0, colonIndex).trim();
-        const value = line.substring(colonIndex + 1).trim().replace(/^["']|["']$/g, '');
-        frontmatter[key] = value;
-      }
-    });
-    
-    return { frontmatter, content };
+  const match = markdown.match(/^---\s*\n([\s\S]*?)\n---\s*\n([\s\S]*)$/);
+  if (!match) {
+    return { frontmatter: {}, content: markdown };
   }
   
-  return { frontmatter: {}, content: markdown };
+  const frontmatter = {};
+  match[1].split('\n').forEach(line => {
+    const colonIndex = line.indexOf(':');
+    if (colonIndex > 0) {
+      const key = line.substring(0, colonIndex).trim();
+      frontmatter[key] = line.substring(colonIndex + 1).trim().replace(/^["']|["']$/g, '');
+    }
+  });
+  return { frontmatter, content: match[2] };
 }
 
 /**
- * Generate table of contents from markdown headings
+ * Heading ID from its text, keeping non-Latin letters (e.g. Arabic headings)
  */
-function generateTableOfContents(htmlContent) {
-  const tempDiv = document.createElement('div');
-  tempDiv.innerHTML = htmlContent;
-  
-  const headings = tempDiv.querySelectorAll('h1, h2, h3, h4, h5, h6');
-  const toc = [];
-  
-  headings.forEach((heading) => {
-    // Generate ID if not present
-    if (!heading.id) {
-      const text = heading.textContent.toLowerCase()
-        .replace(/[^\w\s-]/g, '') // Remove special characters
-        .replace(/\s+/g, '-')     // Replace spaces with hyphens
-        .replace(/-+/g, '-')       // Replace multiple hyphens with single
-        .replace(/^-|-$/g, '');    // Remove leading/trailing hyphens
-      heading.id = text || `heading-${Date.now()}`;
-    }
-    
-    const level = parseInt(heading.tagName.charAt(1));
-    toc.push({
+function slugifyHeading(text) {
+  return text.toLowerCase()
+    .replace(/[^\p{L}\p{N}\s-]/gu, '') // Remove special characters
+    .trim()
+    .replace(/\s+/g, '-')                // Replace spaces with hyphens
+    .replace(/-+/g, '-');                 // Replace multiple hyphens with single
+}
+
+/**
+ * Table of contents (id, text, level) from the headings of rendered HTML
+ */
+function generateTableOfContents(html) {
+  const container = document.createElement('div');
+  container.innerHTML = html;
+  return Array.from(container.querySelectorAll('h1, h2, h3, h4, h5, h6'))
+    .filter(heading => heading.id)
+    .map(heading => ({
       id: heading.id,
       text: heading.textContent,
-      level: level
+      level: parseInt(heading.tagName.charAt(1)),
+    }));
+}
+
+// marked.js is only needed when the API is unavailable, so it is loaded on first use
+let markedPromise = null;
+
+/**
+ * Load and configure marked.js from the CDN (once per page)
+ */
+function loadMarked() {
+  if (!markedPromise) {
+    markedPromise = new Promise((resolve, reject) => {
+      const script = document.createElement('script');
+      script.src = 'https://cdn.jsdelivr.net/npm/marked@11.1.1/marked.min.js';
+      script.onload = () => {
+        configureMarked();
+        resolve();
+      };
+      script.onerror = () => reject(new Error('Markdown parser (marked.js) failed to load'));
+      document.head.appendChild(script);
     });
+    // Don't cache failures
+    markedPromise.catch(() => { markedPromise = null; });
+  }
+  return markedPromise;
+}
+
+/**
+ * Configure marked.js to render like the server (heading IDs, classes, external links)
+ */
+function configureMarked() {
+  marked.setOptions({
+    breaks: true,
+    gfm: true,
   });
   
-  return toc;
+  const renderer = new marked.Renderer();
+  
+  renderer.heading = function(text, level, raw) {
+    return `<h${level} id="${slugifyHeading(raw)}" class="scroll-mt-24">${text}</h${level}>`;
+  };
+  
+  renderer.code = function(code, language) {
+    const escaped = code.replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;');
+    return `<pre class="bg-gray-100 dark:bg-gray-900 rounded-lg p-4 overflow-x-auto"><code class="language-${language || 'text'}">${escaped}</code></pre>`;
+  };
+  
+  renderer.blockquote = function(quote) {
+    return `<blockquote class="border-l-4 border-blue-500 pl-4 italic my-4 text-gray-700 dark:text-gray-300">${quote}</blockquote>`;
+  };
+  
+  renderer.link = function(href, title, text) {
+    const isExternal = href.startsWith('http');
+    return `<a href="${href}" ${isExternal ? 'target="_blank" rel="noopener noreferrer"' : ''} class="text-blue-600 dark:text-blue-400 hover:underline">${text}</a>`;
+  };
+  
+  marked.use({ renderer });
 }
 
 /**
@@ -227,61 +289,6 @@ if (typeof window !== 'undefined') {
   window.toggleMobileTOC = toggleMobileTOC;
 }
 
-/**
- * Configure marked.js for better rendering
- */
-function configureMarked() {
-  if (typeof marked === 'undefined') {
-    console.error('marked.js library is not loaded');
-    throw new Error('Markdown parser (marked.js) is not available');
-  }
-  
-  try {
-    // Configure marked options
-    marked.setOptions({
-      breaks: true,
-      gfm: true,
-      headerIds: true,
-      mangle: false
-    });
-    
-    // Add custom renderer for code blocks
-    const renderer = new marked.Renderer();
-    
-    // Custom heading renderer with IDs
-    renderer.heading = function(text, level) {
-      const escapedText = text.toLowerCase()
-        .replace(/[^\w\s-]/g, '') // Remove special characters
-        .replace(/\s+/g, '-')     // Replace spaces with hyphens
-        .replace(/-+/g, '-')       // Replace multiple hyphens with single
-        .replace(/^-|-$/g, '');    // Remove leading/trailing hyphens
-      return `<h${level} id="${escapedText}" class="scroll-mt-24">${text}</h${level}>`;
-    };
-    
-    // Custom code block renderer
-    renderer.code = function(code, language) {
-      const lang = language || 'text';
-      return `<pre class="bg-gray-100 dark:bg-gray-900 rounded-lg p-4 overflow-x-auto"><code class="language-${lang}">${code}</code></pre>`;
-    };
-    
-    // Custom blockquote renderer
-    renderer.blockquote = function(quote) {
-      return `<blockquote class="border-l-4 border-blue-500 pl-4 italic my-4 text-gray-700 dark:text-gray-300">${quote}</blockquote>`;
-    };
-    
-    // Custom link renderer
-    renderer.link = function(href, title, text) {
-      const isExternal = href.startsWith('http');
-      return `<a href="${href}" ${isExternal ? 'target="_blank" rel="noopener noreferrer"' : ''} class="text-blue-600 dark:text-blue-400 hover:underline">${text}</a>`;
-    };
-    
-    marked.use({ renderer });
-  } catch (error) {
-    console.error('Error configuring marked.js:', error);
-    // Continue with default configuration if custom renderer fails
-  }
-}
-
 /**
  * Load and render blog post
  */
@@ -296,34 +303,14 @@ async function loadBlogPost() {
       return;
     }
     
-    // Check if marked.js is loaded
-    if (typeof marked === 'undefined') {
-      console.error('marked.js is not loaded');
-      hideLoadingState();
-      showError('Markdown parser not available. Please refresh the page.');
-      return;
-    }
-    
-    // Load metadata from JSON
-    let metadata = null;
-    try {
-      metadata = await loadBlogMetadata(slug);
-    } catch (error) {
-      console.warn('Failed to load metadata, continuing with markdown file only:', error);
-      // Continue without metadata - we can extract from frontmatter
-    }
-    
-    // Load markdown content
-    const markdown = await loadMarkdownContent(slug);
-    
-    const { frontmatter, content } = parseFrontmatter(markdown);
+    // Rendered by the server, or in the browser when the API is unavailable
+    const [post] = await Promise.all([fetchBlogPost(slug), loadImageManifest()]);
     
-    // Merge frontmatter with metadata (frontmatter takes precedence)
     const blogData = {
-      title: frontmatter.title || metadata?.title || 'Untitled',
-      date: frontmatter.date || metadata?.date || new Date().toISOString().split('T')[0],
-      image: frontmatter.image || metadata?.image || '',
-      excerpt: frontmatter.excerpt || frontmatter.description || metadata?.excerpt || ''
+      title: post.title || 'Untitled',
+      date: post.date || new Date().toISOString().split('T')[0],
+      image: post.image || '',
+      excerpt: post.excerpt || ''
     };
     
     // Update page title
@@ -332,25 +319,19 @@ async function loadBlogPost() {
     // Render hero section
     renderBlogHero(blogData);
     
-    // Configure and parse markdown
-    configureMarked();
-    
-    const htmlContent = marked.parse(content);
-    
     // Render content
     const contentContainer = document.getElementById('blog-content');
     if (!contentContainer) {
       throw new Error('Blog content container not found');
     }
     
-    contentContainer.innerHTML = htmlContent;
+    contentContainer.innerHTML = post.html;
     
     // Add custom styling classes to markdown elements
     addMarkdownStyles(contentContainer);
     
-    // Generate and render table of contents
-    const toc = generateTableOfContents(htmlContent);
-    renderTableOfContents(toc);
+    // Render table of contents
+    renderTableOfContents(post.toc || []);
     
     // Show article, hide loading
     hideLoadingState();
@@ -414,7 +395,7 @@ function renderBlogHero(data) {
   }
   
   if (heroImageEl && data.image) {
-    heroImageEl.innerHTML = `<img src="${data.image}" alt="${data.title}" class="w-full h-full object-cover" />`;
+    heroImageEl.innerHTML = responsiveImage(data.image, data.title, "w-full h-full object-cover", { eager: true });
   }
 }
 
@@ -530,43 +511,13 @@ function updateLanguageText() {
   if (tocTitleMobile) tocTitleMobile.textContent = t.tocTitle;
 }
 
-// Wait for marked.js to load before initializing
-function initializeBlog() {
-  // Check if there was a load error
-  if (window.markedLoadError) {
-    console.error('marked.js failed to load from CDN');
-    showError('Failed to load markdown parser. Please check your internet connection and refresh the page.');
-    return;
-  }
-  
-  if (typeof marked === 'undefined') {
-    // Wait up to 5 seconds for marked.js to load
-    if (typeof window.markedLoadAttempts === 'undefined') {
-      window.markedLoadAttempts = 0;
-    }
-    window.markedLoadAttempts++;
-    
-    if (window.markedLoadAttempts < 50) { // 5 seconds max (50 * 100ms)
-      setTimeout(initializeBlog, 100);
-      return;
-    } else {
-      console.error('marked.js did not load after 5 seconds');
-      showError('Markdown parser failed to load. Please refresh the page.');
-      return;
-    }
-  }
-  
-  window.markedLoadAttempts = 0; // Reset counter
-  loadBlogPost();
-}
-
 // Initialize when page loads
 function startInitialization() {
   // Ensure DOM is ready
   if (document.readyState === 'loading') {
-    document.addEventListener('DOMContentLoaded', initializeBlog);
+    document.addEventListener('DOMContentLoaded', loadBlogPost);
   } else {
-    initializeBlog();
+    loadBlogPost();
   }
 }
 
@@ -590,12 +541,9 @@ window.addEventListener('languagechange', () => {
 // Also listen for custom events from i18n.js
 window.addEventListener('langchange', () => {
   updateLanguageText();
-  // Reload blog post with new language if needed
-  const slug = getBlogSlug();
-  if (slug) {
-    // Only reload if we need to fetch different language content
-    // For now, just update UI text
-    updateLanguageText();
+  // Reload the post in the new language (a cached request on the server)
+  if (getBlogSlug()) {
+    loadBlogPost();
   }
 });
 
@@ -10,6 +10,56 @@ if (typeof window !== 'undefined') {
   window.currentLang = currentLang;
 }
 
+// Content promises by "lang:sections", so each document is fetched and parsed once per page
+const contentCache = {};
+
+/**
+ * Get site content, optionally only some top-level sections (e.g. "chat" or "hero,about").
+ * Uses the content API (cached on the server, revalidated with ETags) and falls back
+ * to the static JSON file when the backend is not reachable.
+ */
+function getContent(lang, section = '') {
+  const key = `${lang}:${section}`;
+  if (!contentCache[key]) {
+    const full = contentCache[`${lang}:`];
+    contentCache[key] = (section && full)
+      ? full.then(data => pickSections(data, section))
+      : fetchContent(lang, section);
+    // Don't cache failures
+    contentCache[key].catch(() => delete contentCache[key]);
+  }
+  return contentCache[key];
+}
+
+function pickSections(data, section) {
+  const picked = {};
+  section.split(',').forEach(name => {
+    if (name in data) picked[name] = data[name];
+  });
+  return picked;
+}
+
+async function fetchContent(lang, section) {
+  if (typeof API_ENDPOINTS !== 'undefined' && API_ENDPOINTS.content) {
+    try {
+      const res = await fetch(getApiEndpoint(API_ENDPOINTS.content, lang, section));
+      if (res.ok) {
+        return await res.json();
+      }
+      console.warn(`Content API returned HTTP ${res.status}, using static content file`);
+    } catch (error) {
+      console.warn('Content API unreachable, using static content file:', error);
+    }
+  }
+  
+  const res = await fetch(`data/content.${lang}.json`);
+  if (!res.ok) {
+    throw new Error(`HTTP ${res.status}: ${res.statusText}`);
+  }
+  const data = await res.json();
+  return section ? pickSections(data, section) : data;
+}
+
 /**
  * Show loading state
  */
@@ -43,10 +93,8 @@ async function loadContent() {
   if (isChatPage) {
     // On chat page, load content and update chat-specific text
     try {
-      const res = await fetch(`data/content.${currentLang}.json`);
-      if (res.ok) {
-        const data = await res.json();
-        
+      const data = await getContent(currentLang, 'chat');
+      if (data) {
         // Update document language and direction
         document.documentElement.lang = currentLang;
         document.body.dir = currentLang === "ar" ? "rtl" : "ltr";
@@ -98,10 +146,8 @@ async function loadContent() {
   if (isBlogPage) {
     // On blog page, only update language-specific UI elements
     try {
-      const res = await fetch(`data/content.${currentLang}.json`);
-      if (res.ok) {
-        const data = await res.json();
-        
+      const data = await getContent(currentLang, 'chat');
+      if (data) {
         // Update document language and direction
         document.documentElement.lang = currentLang;
         document.body.dir = currentLang === "ar" ? "rtl" : "ltr";
@@ -139,9 +185,6 @@ async function loadContent() {
   showLoadingState();
   
   try {
-    // Use absolute path if opening from file://, otherwise use relative path
-    let contentUrl = `data/content.${currentLang}.json`;
-    
     // If opening from file:// protocol, we need to use a server
     if (window.location.protocol === 'file:') {
       // Try to detect if we're in a server environment
@@ -149,11 +192,11 @@ async function loadContent() {
       console.warn('Please use: python -m http.server 8080 (or similar)');
     }
     
-    const res = await fetch(contentUrl);
-    if (!res.ok) {
-      throw new Error(`HTTP ${res.status}: ${res.statusText}`);
-    }
-    const data = await res.json();
+    // The image manifest (for srcset) is fetched alongside the content
+    const [data] = await Promise.all([
+      getContent(currentLang),
+      typeof loadImageManifest === 'function' ? loadImageManifest() : null
+    ]);
 
     // Update document language and direction
     document.documentElement.lang = currentLang;
@@ -174,7 +217,9 @@ async function loadContent() {
     if (data.hero.image) {
       const heroImageContainer = document.getElementById("hero-image-container");
       if (heroImageContainer) {
-        heroImageContainer.innerHTML = `<img src="${data.hero.image}" alt="${data.hero.name}" class="w-full h-full object-cover" />`;
+        heroImageContainer.innerHTML = typeof responsiveImage === 'function'
+          ? responsiveImage(data.hero.image, data.hero.name, "w-full h-full object-cover", { sizes: "(min-width: 768px) 320px, 256px", eager: true })
+          : `<img src="${data.hero.image}" alt="${data.hero.name}" class="w-full h-full object-cover" />`;
       }
     }
 
@@ -424,10 +469,8 @@ async function handleContactSubmit(event) {
   };
   
   try {
-    const currentData = await fetch(`data/content.${currentLang}.json`).then(r => {
-      if (!r.ok) throw new Error(`HTTP ${r.status}`);
-      return r.json();
-    });
+    // Already loaded for the page render, so this is normally a cache hit
+    const currentData = await getContent(currentLang, 'contact');
     if (currentData.contact && currentData.contact.form) {
       formLabels = currentData.contact.form;
     }
@@ -0,0 +1,76 @@
+/**
+ * Responsive Images
+ * Builds <picture> markup from assets/images/manifest.json (written by tools/optimize_images.py)
+ */
+
+const IMAGE_MANIFEST_URL = 'assets/images/manifest.json';
+
+// Source image path -> {src, width, height, srcset: {avif, webp}}; empty until loaded
+let imageManifest = {};
+let imageManifestPromise = null;
+
+// Preferred format first
+const IMAGE_FORMATS = ['avif', 'webp'];
+
+/**
+ * Load the image manifest once per page. Resolves even when it is missing
+ * (e.g. the build step has not been run), in which case plain <img> tags are used.
+ */
+function loadImageManifest() {
+  if (!imageManifestPromise) {
+    imageManifestPromise = fetch(IMAGE_MANIFEST_URL)
+      .then(res => (res.ok ? res.json() : {}))
+      .then(manifest => {
+        imageManifest = manifest.images || {};
+        return imageManifest;
+      })
+      .catch(error => {
+        console.warn('Image manifest not available, using original images:', error);
+        return imageManifest;
+      });
+  }
+  return imageManifestPromise;
+}
+
+/**
+ * Manifest entry for an image path as written in the content JSON or frontmatter
+ */
+function getImageEntry(src) {
+  let key = (src || '').replace(/^\.?\//, '');
+  try {
+    key = decodeURI(key);
+  } catch (e) {
+    // Keep the path as written
+  }
+  return imageManifest[key] || null;
+}
+
+/**
+ * HTML for a responsive image.
+ * @param {string} src - Image path from the content
+ * @param {string} alt - Alternative text
+ * @param {string} className - Classes for the <img> element
+ * @param {Object} options - sizes (the rendered width, for srcset selection) and eager (above-the-fold images)
+ */
+function responsiveImage(src, alt, className = '', { sizes = '100vw', eager = false } = {}) {
+  const entry = getImageEntry(src);
+  const loading = eager ? 'fetchpriority="high"' : 'loading="lazy"';
+
+  if (!entry) {
+    return `<img src="${src}" alt="${alt}" class="${className}" ${loading} decoding="async" />`;
+  }
+
+  // Duplicates resolve to one canonical URL, so the browser caches a single copy
+  const sources = IMAGE_FORMATS
+    .filter(format => entry.srcset && entry.srcset[format])
+    .map(format => `<source type="image/${format}" srcset="${entry.srcset[format]}" sizes="${sizes}" />`)
+    .join('');
+
+  return `<picture class="contents">${sources}<img src="${encodeURI(entry.src)}" alt="${alt}" class="${className}" width="${entry.width}" height="${entry.height}" ${loading} decoding="async" /></picture>`;
+}
+
+// Make available globally
+if (typeof window !== 'undefined') {
+  window.loadImageManifest = loadImageManifest;
+  window.responsiveImage = responsiveImage;
+}
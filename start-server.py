@@ -1,18 +1,164 @@
 #!/usr/bin/env python3
 """
-Simple HTTP Server for Portfolio Website
+HTTP Server for Portfolio Website
 Serves static files on http://localhost:8080
+
+Handles connections concurrently (one thread each, with keep-alive) and
+supports conditional requests (ETag / Last-Modified -> 304), per-path
+Cache-Control, precompressed .br/.gz variants, byte ranges and zero-copy
+sendfile for large files such as images under assets/.
+
+Usage:
+    python start-server.py [--port 8080] [--precompress] [--no-browser]
+    python start-server.py --root dist   # the output of tools/build_assets.py
 """
 
+import argparse
+import email.utils
+import gzip
 import http.server
-import socketserver
 import os
+import threading
 import webbrowser
+from collections import OrderedDict
 from pathlib import Path
 
+try:
+    import brotli  # Optional: enables .br generation with --precompress
+except ImportError:
+    brotli = None
+
 PORT = 8080
 
+# Cache-Control by path: first matching (prefix, suffixes) wins; empty matches anything
+CACHE_RULES = [
+    ("", (".html",), "no-cache"),  # Always revalidate pages (cheap 304s via ETag)
+    ("data/", (), "no-cache"),  # Content JSON changes without a rename
+    ("assets/images/optimized/", (), "public, max-age=31536000, immutable"),  # Named by content hash
+    ("static/", (), "public, max-age=31536000, immutable"),  # Hashed bundles from tools/build_assets.py
+    ("assets/images/manifest.json", (), "no-cache"),
+    ("assets/", (), "public, max-age=604800"),
+    ("", (), "public, max-age=3600"),
+]
+
+# Types worth compressing, and the smallest file for which a variant pays off
+COMPRESSIBLE_SUFFIXES = {".html", ".css", ".js", ".json", ".svg", ".txt", ".md", ".xml", ".map"}
+COMPRESS_MIN_BYTES = 1024
+
+# Encodings tried in order of preference: (Accept-Encoding token, file suffix)
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+# Files up to this size are kept in memory; larger ones are sent with sendfile
+MEMORY_CACHE_MAX_FILE = 256 * 1024
+MEMORY_CACHE_MAX_TOTAL = 32 * 1024 * 1024
+
+
+class FileCache:
+    """Small LRU of file bodies, validated by mtime and size on every hit."""
+
+    def __init__(self, max_total: int = MEMORY_CACHE_MAX_TOTAL):
+        self.max_total = max_total
+        self.total = 0
+        self._entries = OrderedDict()  # path -> (mtime_ns, size, bytes)
+        self._lock = threading.Lock()
+
+    def get(self, path: str, stat: os.stat_result) -> bytes:
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                self._entries.move_to_end(path)
+                return entry[2]
+        with open(path, "rb") as f:
+            data = f.read()
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old:
+                self.total -= len(old[2])
+            self._entries[path] = (stat.st_mtime_ns, stat.st_size, data)
+            self.total += len(data)
+            while self.total > self.max_total and self._entries:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self.total -= len(evicted)
+        return data
+
+
+file_cache = FileCache()
+
+
+def cache_control_for(rel_path: str) -> str:
+    for prefix, suffixes, policy in CACHE_RULES:
+        if rel_path.startswith(prefix) and (not suffixes or rel_path.endswith(suffixes)):
+            return policy
+    return "no-cache"
+
+
+def make_etag(stat: os.stat_result, encoding: str = "") -> str:
+    tag = f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+    return f'"{tag}-{encoding}"' if encoding else f'"{tag}"'
+
+
+def parse_range(header: str, size: int):
+    """
+    Parse a single "bytes=" range into (start, end) inclusive.
+
+    Returns None when the header should be ignored (multiple or malformed
+    ranges, e.g. "bytes=5-2", served as a full 200) and "unsatisfiable"
+    for a 416 (a range starting at or beyond the end of the file).
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+            if last and end < start:
+                # Invalid rather than unsatisfiable (RFC 9110 14.1.1)
+                return None
+        else:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length == 0:
+                return "unsatisfiable"
+            start, end = max(0, size - length), size - 1
+    except ValueError:
+        return None
+    if start >= size:
+        return "unsatisfiable"
+    return start, min(end, size - 1)
+
+
+def precompress(root: Path):
+    """Write .gz (and .br when brotli is installed) next to compressible files, when missing or stale."""
+    written = 0
+    for path in root.rglob("*"):
+        if path.suffix not in COMPRESSIBLE_SUFFIXES or not path.is_file():
+            continue
+        if any(part.startswith(".") or part in ("backend", "__pycache__") for part in path.relative_to(root).parts):
+            continue
+        stat = path.stat()
+        if stat.st_size < COMPRESS_MIN_BYTES:
+            continue
+        data = None
+        for encoding, suffix in ENCODINGS:
+            if encoding == "br" and brotli is None:
+                continue
+            variant = path.with_name(path.name + suffix)
+            if variant.exists() and variant.stat().st_mtime_ns >= stat.st_mtime_ns:
+                continue
+            data = data if data is not None else path.read_bytes()
+            compressed = brotli.compress(data, quality=11) if encoding == "br" else gzip.compress(data, 9, mtime=0)
+            if len(compressed) < len(data):
+                variant.write_bytes(compressed)
+                written += 1
+    return written
+
+
 class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
+    # Keep-alive lets a browser reuse its connections for the page's assets
+    protocol_version = "HTTP/1.1"
+
     def end_headers(self):
         # Add CORS headers to allow API calls
         self.send_header('Access-Control-Allow-Origin', '*')
@@ -24,14 +170,178 @@ class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
         # Suppress default logging, or customize as needed
         pass
 
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def _serve(self, send_body: bool):
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            url_path = self.path.split("?", 1)[0].split("#", 1)[0]
+            if not url_path.endswith("/"):
+                self.send_response(301)
+                self.send_header("Location", url_path + "/")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            index = os.path.join(path, "index.html")
+            if not os.path.isfile(index):
+                # Directory listing, as before
+                listing = self.list_directory(path)
+                if listing and send_body:
+                    self.copyfile(listing, self.wfile)
+                return
+            path = index
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self.send_error(404, "File not found")
+            return
+        if not os.path.isfile(path) or self._is_variant(path):
+            self.send_error(404, "File not found")
+            return
+
+        rel_path = os.path.relpath(path, self.directory).replace(os.sep, "/")
+        content_type = self.guess_type(path)
+        compressible = os.path.splitext(path)[1] in COMPRESSIBLE_SUFFIXES
+        range_header = self.headers.get("Range")
+
+        # Choose a precompressed variant unless a byte range of the original was asked for
+        encoding, body_path, body_stat = "", path, stat
+        if compressible and not range_header:
+            accepted = self._accepted_encodings()
+            for token, suffix in ENCODINGS:
+                if token not in accepted:
+                    continue
+                try:
+                    variant_stat = os.stat(path + suffix)
+                except OSError:
+                    continue
+                if variant_stat.st_mtime_ns >= stat.st_mtime_ns:
+                    encoding, body_path, body_stat = token, path + suffix, variant_stat
+                    break
+
+        etag = make_etag(stat, encoding)
+        last_modified = email.utils.formatdate(stat.st_mtime, usegmt=True)
+
+        def common_headers():
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", last_modified)
+            self.send_header("Cache-Control", cache_control_for(rel_path))
+            if compressible:
+                self.send_header("Vary", "Accept-Encoding")
+
+        if self._not_modified(etag, stat):
+            self.send_response(304)
+            common_headers()
+            self.end_headers()
+            return
+
+        size = body_stat.st_size
+        start, end = 0, size - 1
+        status = 200
+        if range_header and self._range_applies(etag, stat):
+            requested = parse_range(range_header, size)
+            if requested == "unsatisfiable":
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if requested:
+                status = 206
+                start, end = requested
+
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Accept-Ranges", "bytes")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        common_headers()
+        self.end_headers()
+        if not send_body or size == 0:
+            return
+
+        if body_stat.st_size <= MEMORY_CACHE_MAX_FILE:
+            self.wfile.write(file_cache.get(body_path, body_stat)[start:end + 1])
+            return
+        # Large files (images, media): kernel-side copy from the page cache to the socket
+        self.wfile.flush()
+        with open(body_path, "rb") as f:
+            self.connection.sendfile(f, offset=start, count=end - start + 1)
+
+    @staticmethod
+    def _is_variant(path: str) -> bool:
+        """Precompressed files are only served through content negotiation on their original."""
+        for _, suffix in ENCODINGS:
+            if path.endswith(suffix) and os.path.isfile(path[: -len(suffix)]):
+                return True
+        return False
+
+    def _accepted_encodings(self):
+        accepted = set()
+        for item in self.headers.get("Accept-Encoding", "").split(","):
+            token, _, params = item.strip().partition(";")
+            if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+                continue
+            accepted.add(token.strip().lower())
+        return accepted
+
+    def _not_modified(self, etag: str, stat: os.stat_result) -> bool:
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            # Weak comparison: W/ prefixes are ignored
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            return "*" in tags or etag in tags
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(stat.st_mtime) <= since
+        return False
+
+    def _range_applies(self, etag: str, stat: os.stat_result) -> bool:
+        """If-Range: serve the range only if the client's copy is still current."""
+        if_range = self.headers.get("If-Range")
+        if not if_range:
+            return True
+        if if_range.startswith(('"', "W/")):
+            return if_range == etag
+        return if_range == email.utils.formatdate(stat.st_mtime, usegmt=True)
+
+
 def main():
-    # Change to the directory containing this script
-    os.chdir(Path(__file__).parent)
-    
+    parser = argparse.ArgumentParser(description="Portfolio website static server")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--bind", default="", help="Address to listen on (default: all interfaces)")
+    parser.add_argument("--root", default=None, help="Directory to serve (default: this script's directory)")
+    parser.add_argument("--precompress", action="store_true", help="Generate .gz/.br variants of text files first")
+    parser.add_argument("--no-browser", action="store_true", help="Don't open a browser window")
+    args = parser.parse_args()
+
+    # Serve the directory containing this script unless another root is given
+    root = Path(__file__).parent / args.root if args.root else Path(__file__).parent
+    if not root.is_dir():
+        parser.error(f"{root} is not a directory (run python tools/build_assets.py first?)")
+    os.chdir(root)
+
+    if args.precompress:
+        written = precompress(root.resolve())
+        print(f"Precompressed {written} file variant(s)" + ("" if brotli else " (install brotli for .br)"))
+
     Handler = MyHTTPRequestHandler
-    
-    with socketserver.TCPServer(("", PORT), Handler) as httpd:
-        url = f"http://localhost:{PORT}"
+
+    # One thread per connection; daemon threads don't block Ctrl+C
+    with http.server.ThreadingHTTPServer((args.bind, args.port), Handler) as httpd:
+        httpd.daemon_threads = True
+        url = f"http://localhost:{args.port}"
         print("=" * 60)
         print(f"Portfolio Website Server")
         print("=" * 60)
@@ -39,13 +349,14 @@ def main():
         print(f"Open in browser: {url}/index.html")
         print("\nPress Ctrl+C to stop the server")
         print("=" * 60)
-        
+
         # Try to open browser automatically
-        try:
-            webbrowser.open(f"{url}/index.html")
-        except:
-            pass
-        
+        if not args.no_browser:
+            try:
+                webbrowser.open(f"{url}/index.html")
+            except:
+                pass
+
         try:
             httpd.serve_forever()
         except KeyboardInterrupt:
@@ -53,4 +364,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
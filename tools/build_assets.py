@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+Static asset build step.
+
+Bundles and minifies each page's local scripts and stylesheets into
+content-hashed files and writes a deployable copy of the site to dist/:
+
+    dist/
+      index.html, blog.html, chat.html   # <script>/<link> tags rewritten to the bundles
+      static/<hash>.js, static/<hash>.css
+      assets/, data/                     # copied as-is
+      asset-manifest.json
+
+Consecutive local <script src> (or stylesheet <link>) tags, separated only by
+whitespace or comments, become one bundle. Pages that load the same files
+share the same bundle. Bundle names change whenever their content does, so
+start-server.py serves static/ with "Cache-Control: immutable".
+
+Rebuilds are incremental: source hashes are cached by mtime and size, and a
+bundle is only re-minified when one of its source files has changed.
+
+Usage (from the site root):
+    python tools/build_assets.py [--out dist] [--force]
+    python start-server.py --root dist
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+COPY_DIRS = ("assets", "data")
+MANIFEST_NAME = "asset-manifest.json"
+STATIC_DIR = "static"
+MANIFEST_VERSION = 1
+# Bump when the minifiers change, so existing bundles are rebuilt
+MINIFIER_VERSION = 1
+
+
+class BuildError(Exception):
+    """A source file could not be minified (e.g. an unterminated string)."""
+
+
+# --- JavaScript --------------------------------------------------------------
+
+JS_WHITESPACE = " \t\r\n\f\v\u00a0\ufeff\u2028\u2029"
+# A "/" after these starts a regex literal rather than a division
+REGEX_AFTER_PUNCT = set("(,=:[!&|?{};+-*%<>~^")
+REGEX_AFTER_WORDS = {
+    "return", "typeof", "instanceof", "in", "of", "new", "delete", "void",
+    "throw", "case", "do", "else", "yield", "await",
+}
+# A newline can be dropped after / before these without changing how the code
+# parses (no automatic semicolon insertion is possible there)
+NEWLINE_FREE_AFTER = set("{;,([=:&|?")
+NEWLINE_FREE_BEFORE = set(")]},;.?:=")
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch in "_$" or ord(ch) > 127
+
+
+def _line_of(source: str, index: int) -> int:
+    return source.count("\n", 0, index) + 1
+
+
+def _skip_quoted(source: str, i: int) -> int:
+    """Index after the string literal starting at i."""
+    quote, j = source[i], i + 1
+    while j < len(source):
+        ch = source[j]
+        if ch == "\\":
+            j += 2
+        elif ch == quote:
+            return j + 1
+        elif ch == "\n":
+            break
+        else:
+            j += 1
+    raise BuildError(f"unterminated string on line {_line_of(source, i)}")
+
+
+def _skip_template(source: str, j: int):
+    """Scan template literal text from j; returns (end index, whether it stopped at "${")."""
+    start = j
+    while j < len(source):
+        ch = source[j]
+        if ch == "\\":
+            j += 2
+        elif ch == "`":
+            return j + 1, False
+        elif source.startswith("${", j):
+            return j + 2, True
+        else:
+            j += 1
+    raise BuildError(f"unterminated template literal on line {_line_of(source, start)}")
+
+
+def _skip_regex(source: str, i: int) -> int:
+    """Index after the regex literal (including flags) starting at i."""
+    j, in_class = i + 1, False
+    while j < len(source):
+        ch = source[j]
+        if ch == "\\":
+            j += 2
+            continue
+        if ch == "\n":
+            break
+        if ch == "[":
+            in_class = True
+        elif ch == "]":
+            in_class = False
+        elif ch == "/" and not in_class:
+            j += 1
+            while j < len(source) and _is_word_char(source[j]):
+                j += 1
+            return j
+        j += 1
+    raise BuildError(f"unterminated regex on line {_line_of(source, i)}")
+
+
+def _js_tokens(source: str):
+    """
+    Split JavaScript into (kind, text) tokens: "word", "punct", "literal"
+    (strings, templates, regexes - copied verbatim) and "space"/"newline"
+    (whitespace and comments).
+    """
+    tokens = []
+    significant = None  # last non-whitespace token
+    templates = []  # open "${" nesting: brace depth inside each
+    i, n = 0, len(source)
+    while i < n:
+        ch = source[i]
+        if ch in JS_WHITESPACE:
+            j = i
+            while j < n and source[j] in JS_WHITESPACE:
+                j += 1
+            kind = "newline" if "\n" in source[i:j] else "space"
+        elif source.startswith("//", i):
+            j = source.find("\n", i)
+            j = n if j == -1 else j
+            kind = "space"
+        elif source.startswith("/*", i):
+            j = source.find("*/", i + 2)
+            if j == -1:
+                raise BuildError(f"unterminated comment on line {_line_of(source, i)}")
+            j += 2
+            kind = "newline" if "\n" in source[i:j] else "space"
+        elif ch in "'\"":
+            j, kind = _skip_quoted(source, i), "literal"
+        elif ch == "`" or (ch == "}" and templates and templates[-1] == 0):
+            if ch == "}":
+                templates.pop()
+            j, opened = _skip_template(source, i + 1)
+            if opened:
+                templates.append(0)
+            kind = "literal"
+        elif ch == "/" and (
+            significant is None
+            or (significant[0] == "punct" and significant[1] in REGEX_AFTER_PUNCT)
+            or (significant[0] == "word" and significant[1] in REGEX_AFTER_WORDS)
+        ):
+            j, kind = _skip_regex(source, i), "literal"
+        elif _is_word_char(ch):
+            j = i
+            while j < n and _is_word_char(source[j]):
+                j += 1
+            kind = "word"
+        else:
+            if templates and ch == "{":
+                templates[-1] += 1
+            elif templates and ch == "}":
+                templates[-1] -= 1
+            j, kind = i + 1, "punct"
+        text = source[i:j]
+        if kind in ("space", "newline"):
+            if tokens and tokens[-1][0] in ("space", "newline"):
+                # Merge runs of whitespace and comments
+                if kind == "newline":
+                    tokens[-1] = ("newline", "")
+            else:
+                tokens.append((kind, ""))
+        else:
+            tokens.append((kind, text))
+            significant = (kind, text)
+        i = j
+    return tokens
+
+
+def minify_js(source: str) -> str:
+    """
+    Conservative minification: removes comments, indentation and blank lines
+    and the spaces between tokens that don't need them. Literals are kept
+    verbatim and newlines are kept wherever automatic semicolon insertion
+    could depend on them, so the code parses exactly as before.
+    """
+    tokens = _js_tokens(source)
+    out = []
+    for index, (kind, text) in enumerate(tokens):
+        if kind not in ("space", "newline"):
+            out.append(text)
+            continue
+        if not out or index + 1 >= len(tokens):
+            continue
+        before, after = out[-1][-1], tokens[index + 1][1][0]
+        if kind == "newline" and before not in NEWLINE_FREE_AFTER and after not in NEWLINE_FREE_BEFORE:
+            out.append("\n")
+        elif (_is_word_char(before) and _is_word_char(after)) or (before == after and before in "+-/"):
+            out.append(" ")
+    return "".join(out).strip() + "\n"
+
+
+# --- CSS ---------------------------------------------------------------------
+
+CSS_TOKEN = re.compile(r"(\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*'|/\*.*?\*/)", re.DOTALL)
+
+
+def minify_css(source: str) -> str:
+    """Remove comments and insignificant whitespace; strings are kept verbatim."""
+    out, code = [], []
+
+    def flush():
+        part = re.sub(r"\s+", " ", "".join(code))
+        part = re.sub(r"\s*([{};,>])\s*", r"\1", part)
+        out.append(re.sub(r":\s+", ":", part))
+        code.clear()
+
+    for part in CSS_TOKEN.split(source):
+        if part.startswith(("'", '"')):
+            flush()
+            out.append(part)
+        else:
+            # Comments count as whitespace
+            code.append(" " if part.startswith("/*") else part)
+    flush()
+    css = "".join(out).replace(";}", "}")
+    return css.strip() + "\n"
+
+
+MINIFIERS = {".js": minify_js, ".css": minify_css}
+
+
+# --- HTML --------------------------------------------------------------------
+
+ASSET_TAG = re.compile(
+    r"<script\b[^>]*\bsrc=\"(?P<script>[^\"]+)\"[^>]*>\s*</script>"
+    r"|<link\b(?=[^>]*\brel=\"stylesheet\")[^>]*\bhref=\"(?P<style>[^\"]+)\"[^>]*>"
+)
+TAG_GAP = re.compile(r"(?:\s|<!--.*?-->)*", re.DOTALL)
+
+
+def _is_local(url: str) -> bool:
+    return not re.match(r"^(?:[a-z]+:)?//", url, re.IGNORECASE)
+
+
+def find_asset_groups(html: str):
+    """Runs of adjacent local script tags / stylesheet links: [(ext, [match, ...])]."""
+    groups = []
+    for match in ASSET_TAG.finditer(html):
+        url = match.group("script") or match.group("style")
+        ext = ".js" if match.group("script") else ".css"
+        if not _is_local(url) or Path(url.split("?")[0]).suffix != ext:
+            continue
+        if groups:
+            last_ext, matches = groups[-1]
+            if last_ext == ext and TAG_GAP.fullmatch(html, matches[-1].end(), match.start()):
+                matches.append(match)
+                continue
+        groups.append((ext, [match]))
+    return groups
+
+
+# --- Build -------------------------------------------------------------------
+
+def file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_if_changed(path: Path, data: bytes) -> bool:
+    """Write atomically unless the file already has this content (keeps mtime/ETag stable)."""
+    if path.exists() and path.read_bytes() == data:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return True
+
+
+def load_manifest(out_dir: Path) -> dict:
+    try:
+        with open(out_dir / MANIFEST_NAME, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if manifest.get("version") == MANIFEST_VERSION else {}
+
+
+class Builder:
+    def __init__(self, out_dir: Path, previous: dict, force: bool):
+        self.out_dir = out_dir
+        self.previous_sources = {} if force else previous.get("sources", {})
+        self.previous_inputs = {} if force else previous.get("inputs", {})
+        self.sources = {}
+        self.inputs = {}
+        self.bundles = {}
+        self.minified = 0
+
+    def source_hash(self, rel: str) -> str:
+        if rel in self.sources:
+            return self.sources[rel]["hash"]
+        path = ROOT / rel
+        try:
+            stat = path.stat()
+        except OSError:
+            raise BuildError(f"{rel} is referenced but does not exist")
+        cached = self.previous_sources.get(rel)
+        if cached and cached["mtime_ns"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+            self.sources[rel] = cached
+        else:
+            self.sources[rel] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "hash": file_hash(path)}
+        return self.sources[rel]["hash"]
+
+    def bundle(self, ext: str, rels) -> str:
+        """Site path of the bundle for these source files, building it if needed."""
+        key = hashlib.sha256(
+            json.dumps([MINIFIER_VERSION, [(rel, self.source_hash(rel)) for rel in rels]]).encode()
+        ).hexdigest()
+        name = self.inputs.get(key) or self.previous_inputs.get(key)
+        if name is None or not (self.out_dir / name).exists():
+            parts = []
+            for rel in rels:
+                try:
+                    parts.append(MINIFIERS[ext]((ROOT / rel).read_text(encoding="utf-8")))
+                except BuildError as exc:
+                    raise BuildError(f"{rel}: {exc}")
+            # ";" keeps a file that ends without one from running into the next
+            data = (";\n" if ext == ".js" else "").join(parts).encode("utf-8")
+            name = f"{STATIC_DIR}/{hashlib.sha256(data).hexdigest()[:16]}{ext}"
+            write_if_changed(self.out_dir / name, data)
+            self.minified += 1
+        self.inputs[key] = name
+        self.bundles[name] = {
+            "sources": list(rels),
+            "bytes": (self.out_dir / name).stat().st_size,
+            "source_bytes": sum(self.sources[rel]["size"] for rel in rels),
+        }
+        return name
+
+    def page(self, rel: str):
+        """Rewrite one HTML page; returns (bundle names, whether the output changed)."""
+        html = (ROOT / rel).read_text(encoding="utf-8")
+        base = Path(rel).parent
+        pieces, names, pos = [], [], 0
+        for ext, matches in find_asset_groups(html):
+            urls = [m.group("script") or m.group("style") for m in matches]
+            sources = [(base / url.split("?")[0]).as_posix() for url in urls]
+            name = self.bundle(ext, sources)
+            names.append(name)
+            first = matches[0]
+            url = os.path.relpath(name, base.as_posix() or ".").replace(os.sep, "/")
+            tag = first.group(0).replace(f'"{urls[0]}"', f'"{url}"', 1)
+            pieces += [html[pos:first.start()], tag]
+            pos = matches[-1].end()
+        pieces.append(html[pos:])
+        changed = write_if_changed(self.out_dir / rel, "".join(pieces).encode("utf-8"))
+        return names, changed
+
+
+def sync_tree(src: Path, dst: Path) -> int:
+    """Mirror src into dst, copying only new or modified files; returns the number copied."""
+    copied = 0
+    expected = set()
+    for path in src.rglob("*"):
+        rel = path.relative_to(src)
+        if any(part.startswith(".") for part in rel.parts) or not path.is_file():
+            continue
+        expected.add(rel)
+        target = dst / rel
+        stat = path.stat()
+        try:
+            target_stat = target.stat()
+            if target_stat.st_size == stat.st_size and target_stat.st_mtime_ns == stat.st_mtime_ns:
+                continue
+        except OSError:
+            target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(path, target)
+        copied += 1
+    if dst.exists():
+        for path in dst.rglob("*"):
+            if path.is_file() and path.relative_to(dst) not in expected:
+                path.unlink()
+    return copied
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bundle, minify and content-hash the site's JS/CSS")
+    parser.add_argument("--out", default="dist", help="Output directory, relative to the site root")
+    parser.add_argument("--force", action="store_true", help="Ignore cached hashes and rebuild every bundle")
+    args = parser.parse_args()
+
+    out_dir = (ROOT / args.out).resolve()
+    if out_dir == ROOT or ROOT.is_relative_to(out_dir):
+        sys.exit("--out must be a subdirectory of the site root")
+    previous = load_manifest(out_dir)
+    builder = Builder(out_dir, previous, args.force)
+
+    pages = {}
+    changed_pages = 0
+    try:
+        for path in sorted(ROOT.glob("*.html")):
+            rel = path.relative_to(ROOT).as_posix()
+            pages[rel], changed = builder.page(rel)
+            changed_pages += changed
+    except BuildError as exc:
+        sys.exit(f"Build failed: {exc}")
+
+    # Drop bundles no page uses any more
+    static_dir = out_dir / STATIC_DIR
+    removed = 0
+    for path in static_dir.iterdir() if static_dir.is_dir() else ():
+        if f"{STATIC_DIR}/{path.name}" not in builder.bundles:
+            path.unlink()
+            removed += 1
+
+    copied = sum(sync_tree(ROOT / name, out_dir / name) for name in COPY_DIRS if (ROOT / name).is_dir())
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "pages": pages,
+        "bundles": builder.bundles,
+        "inputs": builder.inputs,
+        "sources": builder.sources,
+    }
+    write_if_changed(out_dir / MANIFEST_NAME, (json.dumps(manifest, indent=2, sort_keys=True) + "\n").encode("utf-8"))
+
+    source_bytes = sum(info["source_bytes"] for info in builder.bundles.values())
+    bundle_bytes = sum(info["bytes"] for info in builder.bundles.values())
+    print(f"Pages: {len(pages)} ({changed_pages} changed), bundles: {len(builder.bundles)} "
+          f"({builder.minified} built, {removed} removed), files copied: {copied}")
+    print(f"Bundled {source_bytes // 1024} KB of JS/CSS into {bundle_bytes // 1024} KB")
+
+
+if __name__ == "__main__":
+    main()
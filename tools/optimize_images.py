@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Image optimization build step.
+
+Scans assets/images/, deduplicates files by content hash and writes
+resized WebP/AVIF variants at standard widths to assets/images/optimized/.
+Variants are named after the source's content hash, so identical copies
+share one set of files and unchanged images are never reprocessed.
+
+Writes assets/images/manifest.json, which the page renderers (js/images.js)
+use to build <picture>/srcset markup:
+
+    {
+      "images": {
+        "assets/images/blog/photo.jpg": {
+          "src": "assets/images/projects/photo.jpg",   # canonical copy
+          "width": 1280, "height": 726,
+          "srcset": {"avif": "... 320w, ... 640w", "webp": "..."}
+        }
+      },
+      "duplicates": {"assets/images/blog/photo.jpg": "assets/images/projects/photo.jpg"},
+      "sources": {...}                                  # mtime/size/hash cache for incremental runs
+    }
+
+Usage (from the site root):
+    python tools/optimize_images.py [--widths 320,640,960,1280,1920] [--quality N] [--force]
+
+Requires Pillow (AVIF needs Pillow >= 11.3 or the pillow-avif-plugin).
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+
+from PIL import Image, ImageOps, features
+
+ROOT = Path(__file__).resolve().parent.parent
+IMAGES_DIR = ROOT / "assets" / "images"
+OUTPUT_DIR = IMAGES_DIR / "optimized"
+MANIFEST_PATH = IMAGES_DIR / "manifest.json"
+
+SOURCE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
+DEFAULT_WIDTHS = (320, 640, 960, 1280, 1920)
+MANIFEST_VERSION = 1
+
+# Encoder settings per output format; AVIF reaches WebP's visual quality at a lower setting
+FORMAT_OPTIONS = {
+    "avif": {"format": "AVIF", "quality": 50, "speed": 6},
+    "webp": {"format": "WEBP", "quality": 75, "method": 6},
+}
+
+
+def site_path(path: Path) -> str:
+    """Path as referenced from the pages and content JSON."""
+    return path.relative_to(ROOT).as_posix()
+
+
+def file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def target_widths(width: int, widths) -> list:
+    """Standard widths below the original, plus the original width itself (never upscaled)."""
+    # Skip widths too close to the original to be worth a separate file
+    chosen = [w for w in widths if w < width * 0.9]
+    if width <= max(widths):
+        chosen.append(width)
+    return chosen or [width]
+
+
+def load_manifest() -> dict:
+    try:
+        with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if manifest.get("version") == MANIFEST_VERSION else {}
+
+
+def scan_sources(previous: dict, force: bool) -> dict:
+    """site path -> {"mtime_ns", "size", "hash"}; unchanged files reuse the cached hash."""
+    sources = {}
+    for path in sorted(IMAGES_DIR.rglob("*")):
+        if not path.is_file() or path.suffix.lower() not in SOURCE_SUFFIXES or OUTPUT_DIR in path.parents:
+            continue
+        stat = path.stat()
+        key = site_path(path)
+        cached = previous.get(key)
+        if not force and cached and cached["mtime_ns"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+            sources[key] = cached
+        else:
+            sources[key] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "hash": file_hash(path)}
+    return sources
+
+
+def build_variants(source: Path, content_hash: str, formats, widths, quality, force: bool):
+    """Write missing variants for one image; returns (width, height, {format: [(w, path, bytes)]}, written)."""
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info or image.mode in ("LA", "PA") else "RGB")
+        width, height = image.size
+        variants = {fmt: [] for fmt in formats}
+        written = 0
+        for target in target_widths(width, widths):
+            resized = None
+            for fmt in formats:
+                out = OUTPUT_DIR / f"{content_hash[:16]}-{target}.{fmt}"
+                if force or not out.exists():
+                    if resized is None:
+                        resized = image if target == width else image.resize(
+                            (target, max(1, round(height * target / width))), Image.LANCZOS
+                        )
+                    tmp = out.with_suffix(out.suffix + ".tmp")
+                    options = dict(FORMAT_OPTIONS[fmt])
+                    if quality is not None:
+                        options["quality"] = quality
+                    resized.save(tmp, **options)
+                    os.replace(tmp, out)
+                    written += 1
+                variants[fmt].append((target, out, out.stat().st_size))
+    return width, height, variants, written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deduplicate images and build responsive WebP/AVIF variants")
+    parser.add_argument("--widths", default=",".join(map(str, DEFAULT_WIDTHS)))
+    parser.add_argument("--quality", type=int, default=None, help="Encoder quality for all formats (default: per format)")
+    parser.add_argument("--formats", default="avif,webp", help="Output formats, most preferred first")
+    parser.add_argument("--force", action="store_true", help="Rehash and re-encode everything")
+    args = parser.parse_args()
+
+    widths = sorted({int(w) for w in args.widths.split(",") if w.strip()})
+    formats = []
+    for fmt in (f.strip() for f in args.formats.split(",") if f.strip()):
+        if fmt not in FORMAT_OPTIONS:
+            sys.exit(f"Unsupported format: {fmt}")
+        if not features.check(fmt):
+            print(f"Skipping {fmt}: not supported by this Pillow build")
+            continue
+        formats.append(fmt)
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    previous = load_manifest()
+    # Settings changes invalidate existing variants
+    settings = {"widths": widths, "formats": formats, "quality": args.quality}
+    force = args.force or previous.get("settings") != settings
+    sources = scan_sources(previous.get("sources", {}), force=args.force)
+
+    # Dedupe: the first path (sorted) with a given hash is the canonical copy
+    canonical = {}
+    duplicates = {}
+    for key, info in sources.items():
+        if info["hash"] in canonical:
+            duplicates[key] = canonical[info["hash"]]
+        else:
+            canonical[info["hash"]] = key
+
+    images = {}
+    by_hash = {}
+    keep = set()
+    written = 0
+    for content_hash, key in canonical.items():
+        width, height, variants, count = build_variants(
+            ROOT / key, content_hash, formats, widths, args.quality, force
+        )
+        written += count
+        by_hash[content_hash] = {
+            "src": key,
+            "width": width,
+            "height": height,
+            "srcset": {
+                fmt: ", ".join(f"{site_path(path)} {w}w" for w, path, _ in entries)
+                for fmt, entries in variants.items()
+            },
+            "bytes": {
+                "original": sources[key]["size"],
+                **{fmt: entries[-1][2] for fmt, entries in variants.items()},
+            },
+        }
+        keep.update(path.name for entries in variants.values() for _, path, _ in entries)
+    for key, info in sources.items():
+        images[key] = by_hash[info["hash"]]
+
+    # Drop variants of images that were changed or removed
+    removed = 0
+    for path in OUTPUT_DIR.iterdir():
+        if path.is_file() and path.name not in keep:
+            path.unlink()
+            removed += 1
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "settings": settings,
+        "images": images,
+        "duplicates": duplicates,
+        "sources": sources,
+    }
+    tmp = MANIFEST_PATH.with_suffix(".json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp, MANIFEST_PATH)
+
+    duplicate_bytes = sum(sources[key]["size"] for key in duplicates)
+    print(f"Images: {len(sources)} ({len(canonical)} unique, {len(duplicates)} duplicates, {duplicate_bytes // 1024} KB)")
+    print(f"Variants: {written} written, {removed} removed, formats: {', '.join(formats) or 'none'}")
+    for key in duplicates:
+        print(f"  duplicate: {key} -> {duplicates[key]}")
+
+
+if __name__ == "__main__":
+    main()